@@ -29,6 +29,15 @@ COMMAND_NAME = 'rosdoc2'
 VERBS_ENTRY_POINT = f'{COMMAND_NAME}.verbs'
 
 
+class LazyVersionAction(argparse.Action):
+    """Print the version and exit, only looking the version up when it is requested."""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        """Print the version of rosdoc2 and exit."""
+        version = importlib_metadata.version(COMMAND_NAME)
+        parser.exit(message=f'{COMMAND_NAME} {version}\n')
+
+
 def main(sysargs=None):
     """
     Entry point for the command-line interface.
@@ -42,8 +51,7 @@ def main(sysargs=None):
     parser = argparse.ArgumentParser(
         description=f'{COMMAND_NAME} builds documentation for ROS packages'
     )
-    version = importlib_metadata.version(COMMAND_NAME)
-    parser.add_argument('-v', '--version', action='version', version=f'{COMMAND_NAME} {version}')
+    parser.add_argument('-v', '--version', action=LazyVersionAction, nargs=0)
 
     # Generate a list of verbs available
     verbs = list_verbs(VERBS_ENTRY_POINT)
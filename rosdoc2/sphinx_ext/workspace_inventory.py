@@ -0,0 +1,216 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Resolve references to other packages from the workspace inventory of rosdoc2.
+
+The workspace inventory merges the objects.inv files of all the packages in the cross
+reference directory, so these packages do not need to be listed in intersphinx_mapping, and
+a reference is resolved with a single lookup. Packages which are not in the workspace
+inventory are resolved from the lookup map of their objects.inv, which is memory mapped when
+it is first needed, instead of being decompressed and parsed up front by intersphinx. It is
+configured with:
+
+- rosdoc2_workspace_inventory: path of the workspace inventory database,
+- rosdoc2_inventory_maps: dict of package name to a tuple of (URL of its Sphinx output, path
+  of its inventory map), for the packages which are not in the workspace inventory,
+- rosdoc2_base_url: URL which the documentation of each package is found under,
+- rosdoc2_package_name: the package being documented, whose entries are ignored,
+- rosdoc2_package_dependencies: the dependencies of the package being documented, whose
+  objects win over objects of the same name in other packages.
+"""
+
+import sqlite3
+
+from docutils import nodes
+from rosdoc2.verbs.build.inventory_map import InventoryMap
+from rosdoc2.verbs.build.workspace_inventory import lookup_rank, WorkspaceInventory
+from sphinx.util import logging
+
+logger = logging.getLogger(__name__)
+
+# The workspace inventory, shared by all the documents of a build.
+_workspace_inventory = None
+# Map of map path to its InventoryMap, shared by all the documents of a build.
+_inventory_maps = {}
+
+
+def _get_workspace_inventory(path):
+    global _workspace_inventory
+    if _workspace_inventory is None or _workspace_inventory.path != path:
+        _workspace_inventory = WorkspaceInventory(path)
+    return _workspace_inventory
+
+
+def _get_inventory_map(map_file):
+    if map_file not in _inventory_maps:
+        _inventory_maps[map_file] = InventoryMap(map_file)
+    return _inventory_maps[map_file]
+
+
+def _lookup_inventory_maps(config, objtypes, name, package):
+    """
+    Look up an object in the inventory maps.
+
+    :return: tuple of (rank, (package, package URL, project, version, uri, display name)),
+        or None
+    """
+    inventory_maps = config.rosdoc2_inventory_maps
+    best = None
+    for package_name in sorted(inventory_maps) if package is None else [package]:
+        if package_name not in inventory_maps:
+            continue
+        package_url, map_file = inventory_maps[package_name]
+        try:
+            inventory_map = _get_inventory_map(map_file)
+            for objtype in objtypes:
+                result = inventory_map.lookup(objtype, name)
+                if result is None:
+                    continue
+                rank = lookup_rank(
+                    objtypes, name, objtype, name, package_name,
+                    config.rosdoc2_package_dependencies)
+                if best is None or rank < best[0]:
+                    best = (rank, (
+                        package_name, package_url.rstrip('/'), inventory_map.project,
+                        inventory_map.version, *result))
+                break
+        except (OSError, RuntimeError) as e:
+            logger.warning(f'[rosdoc2] ignoring the inventory of {package_name}: {e}')
+            del inventory_maps[package_name]
+    return best
+
+
+def _domain_objtypes(domain, roles):
+    objtypes = list(roles)
+    # The same adjustments as sphinx.ext.intersphinx, for inventories of older Sphinx.
+    if domain.name == 'std' and 'cmdoption' in objtypes:
+        objtypes.append('option')
+    if domain.name == 'py' and 'attribute' in objtypes:
+        objtypes.append('method')
+    return [f'{domain.name}:{objtype}' for objtype in objtypes]
+
+
+def _candidate_domains(env, node):
+    # Yield tuples of (domain, inventory object types) which the reference may resolve to.
+    if node['reftype'] == 'any':
+        for domain in env.domains.values():
+            yield domain, _domain_objtypes(domain, domain.object_types)
+        return
+    domain_name = node.get('refdomain')
+    if not domain_name:
+        return
+    domain = env.get_domain(domain_name)
+    roles = domain.objtypes_for_role(node['reftype'])
+    if roles:
+        yield domain, _domain_objtypes(domain, roles)
+
+
+def _create_reference(package_name, project, version, uri, dispname, domain, node, contnode):
+    if version:
+        reftitle = f"(in {project} {'v' if version[0].isdigit() else ''}{version})"
+    else:
+        reftitle = f'(in {project})'
+    newnode = nodes.reference('', '', internal=False, refuri=uri, reftitle=reftitle)
+    if node.get('refexplicit'):
+        newnode.append(contnode)
+    elif dispname == '-' or (domain.name == 'std' and node['reftype'] == 'keyword'):
+        title = contnode.astext()
+        if title.startswith(package_name + ':'):
+            title = title[len(package_name) + 1:]
+            newnode.append(contnode.__class__(title, title))
+        else:
+            newnode.append(contnode)
+    else:
+        newnode.append(contnode.__class__(dispname, dispname))
+    return newnode
+
+
+def _lookup_workspace_inventory(config, objtypes, name, package):
+    if not config.rosdoc2_workspace_inventory:
+        return None
+    inventory = _get_workspace_inventory(config.rosdoc2_workspace_inventory)
+    try:
+        result = inventory.lookup(
+            objtypes, name, package=package, exclude_package=config.rosdoc2_package_name,
+            preferred_packages=config.rosdoc2_package_dependencies)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f'[rosdoc2] disabling the workspace inventory, lookup failed: {e}')
+        config.rosdoc2_workspace_inventory = None
+        return None
+    if result is None:
+        return None
+    rank, (package_name, relative_root, project, version, uri, dispname) = result
+    package_url = '/'.join(
+        part.strip('/')
+        for part in (config.rosdoc2_base_url, package_name, relative_root)
+        if part.strip('/'))
+    return rank, (package_name, package_url, project, version, uri, dispname)
+
+
+def _is_package(config, name):
+    if name in config.rosdoc2_inventory_maps:
+        return True
+    if not config.rosdoc2_workspace_inventory:
+        return False
+    try:
+        return _get_workspace_inventory(config.rosdoc2_workspace_inventory).has_package(name)
+    except (OSError, sqlite3.Error):
+        return False
+
+
+def missing_reference(app, env, node, contnode):
+    """Resolve a reference which Sphinx could not resolve within the package."""
+    config = app.config
+    if not config.rosdoc2_workspace_inventory and not config.rosdoc2_inventory_maps:
+        return None
+    target = node['reftarget']
+    package = None
+    # An explicit 'package:target' only looks in the entries of that package.
+    if ':' in target and _is_package(config, target.split(':', 1)[0]):
+        package, target = target.split(':', 1)
+    for domain, objtypes in _candidate_domains(env, node):
+        targets = [target]
+        full_qualified_name = domain.get_full_qualified_name(node)
+        if full_qualified_name and full_qualified_name != target:
+            targets.append(full_qualified_name)
+        for name in targets:
+            results = [
+                result for result in (
+                    _lookup_workspace_inventory(config, objtypes, name, package),
+                    _lookup_inventory_maps(config, objtypes, name, package))
+                if result is not None]
+            if not results:
+                continue
+            package_name, package_url, project, version, uri, dispname = min(results)[1]
+            return _create_reference(
+                package_name, project, version, f'{package_url}/{uri}', dispname, domain, node,
+                contnode)
+    return None
+
+
+def setup(app):
+    """Set up the extension."""
+    app.add_config_value('rosdoc2_workspace_inventory', None, 'env')
+    app.add_config_value('rosdoc2_inventory_maps', {}, 'env')
+    app.add_config_value('rosdoc2_base_url', '', 'env')
+    app.add_config_value('rosdoc2_package_name', None, 'env')
+    app.add_config_value('rosdoc2_package_dependencies', [], 'env')
+    # Run before sphinx.ext.intersphinx, which uses the default priority of 500.
+    app.connect('missing-reference', missing_reference, priority=400)
+    return {
+        'version': '1',
+        'parallel_read_safe': True,
+        'parallel_write_safe': True,
+    }
@@ -0,0 +1,132 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Publish the documentation of a package as a single archive instead of a directory.
+
+Archives are reproducible: entries are sorted, and their time stamps, owners and
+permissions are fixed, so that the same output gives the same bytes.
+"""
+
+import gzip
+import os
+import stat
+import tarfile
+
+OUTPUT_FORMATS = ('directory', 'tar', 'tar.gz', 'tar.zst')
+DEFAULT_OUTPUT_FORMAT = 'directory'
+ARCHIVE_FORMATS = OUTPUT_FORMATS[1:]
+# Time stamp of all archive entries, unless SOURCE_DATE_EPOCH is set.
+DEFAULT_ARCHIVE_MTIME = 0
+ZSTD_LEVEL = 10
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError(
+            "Error the 'tar.zst' output format requires the zstandard python package, "
+            "install it with 'pip install zstandard' or use another --output-format")
+    return zstandard
+
+
+def check_output_format(output_format):
+    """
+    Check that an output format can be written, before anything is built.
+
+    :raises RuntimeError: if the output format is unknown or its compressor is not installed
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise RuntimeError(f"Error unknown output format '{output_format}'")
+    if output_format == 'tar.zst':
+        _import_zstandard()
+
+
+def archive_path(output_directory, package_name, output_format):
+    """Return the path of the archive of a package in the output directory."""
+    return os.path.join(output_directory, f'{package_name}.{output_format}')
+
+
+def package_output_exists(output_directory, package_name):
+    """Return True if the output directory has the documentation of a package in any format."""
+    if os.path.isdir(os.path.join(output_directory, package_name)):
+        return True
+    return any(
+        os.path.isfile(archive_path(output_directory, package_name, output_format))
+        for output_format in ARCHIVE_FORMATS)
+
+
+def _sorted_tree(directory):
+    """Return the paths relative to directory of its subdirectories and files, sorted."""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        relroot = os.path.relpath(root, directory)
+        paths.extend(os.path.normpath(os.path.join(relroot, name)) for name in dirs + files)
+    return sorted(paths, key=lambda path: path.split(os.sep))
+
+
+def _tarinfo(tar, path, arcname, mtime):
+    info = tar.gettarinfo(path, arcname)
+    info.mtime = mtime
+    info.uid = info.gid = 0
+    info.uname = info.gname = ''
+    if info.isdir() or info.mode & stat.S_IXUSR:
+        info.mode = 0o755
+    else:
+        info.mode = 0o644
+    return info
+
+
+def write_package_archive(source_directory, path, package_name, output_format):
+    """
+    Stream a directory into an archive, with its files below a directory named after the package.
+
+    The archive is written next to path and renamed into place when it is complete.
+
+    :param str source_directory: the output staging directory of the package
+    :param str output_format: one of ARCHIVE_FORMATS
+    :return: the number of files in the archive
+    """
+    mtime = int(os.environ.get('SOURCE_DATE_EPOCH', DEFAULT_ARCHIVE_MTIME))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary_path = path + '.tmp'
+    number_of_files = 0
+    with open(temporary_path, 'wb') as f:
+        if output_format == 'tar.gz':
+            # The name and time stamp in the gzip header are fixed as well.
+            stream = gzip.GzipFile(filename='', mode='wb', fileobj=f, mtime=mtime)
+        elif output_format == 'tar.zst':
+            stream = _import_zstandard().ZstdCompressor(level=ZSTD_LEVEL).stream_writer(f)
+        else:
+            stream = None
+        try:
+            with tarfile.open(
+                    fileobj=stream or f, mode='w|', format=tarfile.GNU_FORMAT) as tar:
+                tar.addfile(_tarinfo(tar, source_directory, package_name, mtime))
+                for relpath in _sorted_tree(source_directory):
+                    source = os.path.join(source_directory, relpath)
+                    info = _tarinfo(
+                        tar, source, f'{package_name}/{relpath.replace(os.sep, "/")}', mtime)
+                    if info.isreg():
+                        with open(source, 'rb') as member:
+                            tar.addfile(info, member)
+                        number_of_files += 1
+                    else:
+                        tar.addfile(info)
+        finally:
+            if stream is not None:
+                stream.close()
+    os.replace(temporary_path, path)
+    return number_of_files
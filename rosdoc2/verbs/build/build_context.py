@@ -12,6 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+
+from .package_survey import PackageSurvey
+
+# Profiles of which files are published, see the output_profile setting.
+OUTPUT_PROFILES = ('full', 'lean')
+DEFAULT_OUTPUT_PROFILE = 'full'
+
 
 class BuildContext:
     """
@@ -35,3 +43,20 @@ class BuildContext:
         self.ament_cmake_python = False
         self.disable_breathe = False
         self.show_doxygen_html = False
+        self.breathe_member_limit = None
+        self.output_profile = DEFAULT_OUTPUT_PROFILE
+        self._package_survey = None
+
+    @property
+    def package_survey(self):
+        """Inventory of the package directory, surveyed on first use and then shared."""
+        if self._package_survey is None:
+            # Do not survey rosdoc2's own directories, if they are inside of the package.
+            self._package_survey = PackageSurvey(
+                os.path.dirname(self.package.filename),
+                excluded_paths=[
+                    self.tool_options.doc_build_directory,
+                    self.tool_options.output_directory,
+                    self.tool_options.cross_reference_directory,
+                ])
+        return self._package_survey
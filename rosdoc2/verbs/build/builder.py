@@ -18,6 +18,9 @@ import shutil
 
 logger = logging.getLogger('rosdoc2')
 
+# Depth of the directories whose size move_files() accounts for.
+SUBTREE_DEPTH = 2
+
 
 class Builder:
     """Base class for all builders, which just takes care of some boilerplate logic."""
@@ -64,19 +67,31 @@ class Builder:
         Move a directory of files into the output staging directory.
 
         May be overridden by downstream builders to selectively skip or rename files.
+
+        :return: dict with the number of 'files' and 'bytes' moved, and the 'subtrees' dict
+            of the bytes in each directory, up to SUBTREE_DEPTH levels below source
         """
         logger.info(
             f"Moving files for '{self.name} ({self.builder_type})' "
             f"from '{source}' into '{destination}'.")
         number_of_files_moved = 0
+        bytes_moved = 0
+        subtrees = {}
         for root, dirs, files in os.walk(source):
             for file in files:
                 file_to_copy = os.path.relpath(os.path.join(root, file), start=source)
+                size = os.lstat(os.path.join(source, file_to_copy)).st_size
                 self.move_file(
                     source=os.path.join(source, file_to_copy),
                     destination=os.path.join(destination, file_to_copy),
                     common_suffix=file_to_copy)
                 number_of_files_moved += 1
-        logger.info(f'Moved {number_of_files_moved} files.')
+                bytes_moved += size
+                parts = file_to_copy.split(os.sep)[:-1]
+                for depth in range(1, min(len(parts), SUBTREE_DEPTH) + 1):
+                    subtree = '/'.join(parts[:depth])
+                    subtrees[subtree] = subtrees.get(subtree, 0) + size
+        logger.info(f'Moved {number_of_files_moved} files, {bytes_moved} bytes.')
         # Remove temporary output.
         shutil.rmtree(source)
+        return {'files': number_of_files_moved, 'bytes': bytes_moved, 'subtrees': subtrees}
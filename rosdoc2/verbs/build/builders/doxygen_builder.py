@@ -16,12 +16,14 @@ import json
 import logging
 import os
 import shutil
-import subprocess
-import sys
 
 from ..builder import Builder
 from ..collect_tag_files import collect_tag_files
 from ..create_format_map_from_package import create_format_map_from_package
+from ..find_include_directory import count_headers, find_include_directory
+from ..metrics import record_metrics
+from ..prune_tag_file import prune_tag_file
+from ..run_subprocess import run_subprocess
 
 logger = logging.getLogger('rosdoc2')
 
@@ -90,6 +92,8 @@ class DoxygenBuilder(Builder):
         self.rosdoc2_doxyfile_statements = []
         self.doxyfile_content = None
         self.doxygen_input_dir = None
+        # Number of headers in the default Doxygen input directory, an estimate of the cost.
+        self.header_count = None
 
         # If the build type is not `ament_cmake/cmake`, there is no reason
         # to create a doxygen builder.
@@ -150,9 +154,10 @@ class DoxygenBuilder(Builder):
         self.template_variables = create_format_map_from_package(build_context.package)
 
         # If the user does not supply a Doxygen file, look for one in the package root.
+        package_survey = build_context.package_survey
         if self.doxyfile is None:
             package_doxyfile = os.path.join(package_directory, 'Doxyfile')
-            if os.path.exists(package_doxyfile):
+            if package_survey.isfile('Doxyfile'):
                 # In this case, use the package's Doxyfile, despite it not being
                 # explicitly specified in the configuration.
                 self.doxyfile = package_doxyfile
@@ -160,32 +165,22 @@ class DoxygenBuilder(Builder):
                     'No Doxyfile specified by user, but a Doxyfile was found in '
                     f"the package at '{package_doxyfile}' and will be used.")
             else:
-                include_dir = None
                 if self.doxygen_input_dir:
                     include_dir = self.doxygen_input_dir
                 else:
                     # Search for a valid include directory
-                    for candidate_dir in ('include', 'src', build_context.package.name):
-                        candidate_path = os.path.join(package_directory, candidate_dir)
-                        for root, _, files in os.walk(candidate_path):
-                            if '/test' in root:
-                                continue
-                            for file in files:
-                                ext = os.path.splitext(file)[1].lower()
-                                if ext in ['.h', '.hpp', '.hh', '.h++', '.hxx']:
-                                    include_dir = candidate_dir
-                                    logger.info(
-                                        f'Found C/C++ include file in {candidate_dir}, '
-                                        'using that path for Doxygen')
-                                    break
-                            if include_dir:
-                                break
-                        if include_dir:
-                            break
+                    include_dir = find_include_directory(
+                        package_survey, ('include', 'src', build_context.package.name))
+                    if include_dir:
+                        logger.info(
+                            f'Found C/C++ include file in {include_dir}, '
+                            'using that path for Doxygen')
                 if include_dir:
                     # If neither the doxyfile setting is set,
                     # nor is there a Doxyfile in the package root,
                     # but there is a standard 'include' directory, then generate a default.
+                    self.header_count = count_headers(package_survey, include_dir)
+                    logger.info(f"Found {self.header_count} C/C++ headers in '{include_dir}'")
                     self.template_variables['include_dir'] = include_dir
                     self.doxyfile_content = DEFAULT_DOXYFILE.format_map(
                         self.template_variables)
@@ -228,6 +223,11 @@ class DoxygenBuilder(Builder):
                 'failure to find code to automatically document.')
             return None  # Explicitly generated no documentation.
 
+        if self.header_count is not None:
+            record_metrics(
+                self.build_context.tool_options, self.build_context.package.name,
+                'doxygen_input', {'headers': self.header_count})
+
         # Create a temporary output directory for doxygen.
         logger.info('Trying to run doxygen')
         doxygen_output_dir = os.path.abspath(os.path.join(doc_build_folder, 'doxygen_output'))
@@ -287,10 +287,10 @@ class DoxygenBuilder(Builder):
         logger.info(
             f"Running Doxygen: '{' '.join(cmd)}' in '{working_directory}'"
         )
-        completed_process = subprocess.run(
-            cmd, cwd=working_directory, stdout=sys.stdout, stderr=sys.stderr)
-        logger.info(
-            f"Doxygen exited with return code '{completed_process.returncode}'")
+        returncode = run_subprocess(
+            cmd, cwd=working_directory, phase='Doxygen',
+            timeout=self.build_context.tool_options.doxygen_timeout)
+        logger.info(f"Doxygen exited with return code '{returncode}'")
 
         # Copy the tag file into the cross-reference directory, but also leave it in the output.
         destination = os.path.join(
@@ -312,6 +312,15 @@ class DoxygenBuilder(Builder):
         }
         with open(os.path.abspath(destination) + '.location.json', 'w+') as f:
             f.write(json.dumps(data))
+
+        # Downstream packages use a pruned copy of the tag file, which Doxygen parses faster.
+        try:
+            kept, total = prune_tag_file(os.path.abspath(destination))
+            logger.info(
+                f'Pruned tag file keeps {kept} of {total} compounds for other packages')
+        except RuntimeError as e:
+            # Other packages fall back to the full tag file.
+            logger.warning(str(e))
         # Put it with the doxygen generated content as well.
         with open(os.path.abspath(tag_file_name) + '.location.json', 'w+') as f:
             f.write(json.dumps(data))
@@ -12,29 +12,34 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from importlib import resources
 import json
 import logging
 import os
 from pathlib import Path
 import shutil
-import subprocess
-import sys
-
-from jinja2 import Template
-import rosdistro
-import setuptools
+import sqlite3
 
 from ..builder import Builder
 from ..collect_inventory_files import collect_inventory_files
 from ..create_format_map_from_package import create_format_map_from_package
 from ..doxygen_toc_template import doxygen_toc_template
+from ..doxygen_xml_statistics import doxygen_xml_statistics
+from ..find_modules_to_mock import find_modules_to_mock
 from ..generate_interface_docs import generate_interface_docs
 from ..generate_ros_package_dependencies import generate_ros_package_dependencies
 from ..include_links import include_links
 from ..include_user_docs import include_user_docs
+from ..inventory_map import write_inventory_map
+from ..jinja_environment import jinja_environment
+from ..metrics import record_metrics
+from ..package_dependencies import package_dependencies
 from ..package_repo_url import package_repo_url
+from ..rosdistro_cache import get_distribution_file
+from ..run_subprocess import run_subprocess
+from ..stage_directory import stage_directory, unstage_file
 from ..standard_documents import generate_standard_document_files, locate_standard_documents
+from ..watch import keep_unchanged_mtimes, watch_state_directory
+from ..workspace_inventory import sync_workspace_inventory, workspace_inventory_path
 
 logger = logging.getLogger('rosdoc2')
 
@@ -108,6 +113,11 @@ exhale_args = {{}}
 breathe_projects = {{}}
 master_doc = 'index'
 intersphinx_mapping = {{ {intersphinx_mapping_extensions} }}
+rosdoc2_workspace_inventory = '{workspace_inventory}'
+rosdoc2_inventory_maps = {{ {inventory_map_extensions} }}
+rosdoc2_base_url = '{base_url}'
+rosdoc2_package_name = '{package.name}'
+rosdoc2_package_dependencies = {package_dependencies}
 
 source_suffix = {{
     '.rst': 'restructuredtext',
@@ -269,14 +279,8 @@ if rosdoc2_settings.get('enable_autodoc', True):
     print('[rosdoc2] enabling autodoc')
     extensions.append('sphinx.ext.autodoc')
 
-    import importlib
-    for exec_depend in {exec_depends}:
-        try:
-            # Some python dependencies may be dist packages.
-            exec_depend = exec_depend.split("python3-")[-1].split("-pip")[0].replace('-', '_')
-            importlib.import_module(exec_depend)
-        except ImportError:
-            pkgs_to_mock.append(exec_depend)
+    ## Dependencies from package.xml which rosdoc2 could not locate, and so must be mocked.
+    pkgs_to_mock.extend({modules_to_mock})
 
     autodoc_mock_imports.extend(pkgs_to_mock)
 
@@ -287,6 +291,10 @@ if rosdoc2_settings.get('enable_autodoc', True):
 if rosdoc2_settings.get('enable_intersphinx', True):
     print('[rosdoc2] enabling intersphinx')
     extensions.append('sphinx.ext.intersphinx')
+    if rosdoc2_workspace_inventory or rosdoc2_inventory_maps:
+        ## Resolves references to the packages in the workspace inventory, or with a lookup
+        ## map of their inventory.
+        extensions.append('rosdoc2.sphinx_ext.workspace_inventory')
 
 build_type = '{build_type}'
 always_run_doxygen = {always_run_doxygen}
@@ -387,6 +395,12 @@ if rosdoc2_settings.get('support_markdown', True):
 
 if {show_doxygen_html} and {has_cpp}:
     templates_path.append('__doxy_template')
+
+if '{output_profile}' == 'lean':
+    ## The lean output profile does not publish copies of the sources.
+    print('[rosdoc2] lean output profile, not copying sources')
+    html_copy_source = False
+    html_show_sourcelink = False
 """  # noqa: W605 B902
 
 default_conf_py = """\
@@ -510,6 +524,8 @@ class SphinxBuilder(Builder):
                     raise RuntimeError(
                         f"Error the 'doxygen_xml_directory' specified "
                         f"'{self.doxygen_xml_directory}' does not exist.")
+        if has_cpp:
+            self.check_breathe_workload()
 
         package_xml_directory = os.path.dirname(self.build_context.package.filename)
         # If 'python_source' is specified, construct 'python_src_directory' from it
@@ -526,12 +542,14 @@ class SphinxBuilder(Builder):
                 python_src_directory = None
 
         # If not provided or invalid, try to find the python source directory
+        package_survey = self.build_context.package_survey
         if not python_src_directory:
             search_dirs = ['.', 'src']
             for search_dir in search_dirs:
                 where = os.path.abspath(os.path.join(package_xml_directory, search_dir))
-                package_list = setuptools.find_packages(where=where)
-                if self.build_context.package.name in package_list:
+                # A top level Python package is a directory containing an __init__.py.
+                init_py = os.path.join(search_dir, self.build_context.package.name, '__init__.py')
+                if package_survey.isfile(init_py):
                     python_src_directory = \
                         os.path.abspath(
                             os.path.join(
@@ -549,14 +567,14 @@ class SphinxBuilder(Builder):
 
         # Generate rst documents for interfaces
         interface_counts = generate_interface_docs(
-            package_xml_directory,
+            package_survey,
             self.build_context.package.name,
             wrapped_sphinx_directory
         )
         logger.info(f'interface_counts: {interface_counts}')
 
         # locate standard documents
-        standard_docs = locate_standard_documents(package_xml_directory)
+        standard_docs = locate_standard_documents(package_survey)
         if standard_docs:
             generate_standard_document_files(standard_docs, wrapped_sphinx_directory)
         logger.info(f'standard_docs: {standard_docs}')
@@ -569,22 +587,23 @@ class SphinxBuilder(Builder):
             logger.info(
                 'Note: the user provided sourcedir for Sphinx '
                 f"'{self.sphinx_sourcedir}' will be used.")
-            # Copy all user content, like images or documentation files, and
-            # source files to the wrapping directory
+            # Stage all user content, like images or documentation files, and
+            # source files into the wrapping directory
             try:
-                shutil.copytree(
+                stage_directory(
                     os.path.join(package_xml_directory, self.sphinx_sourcedir),
-                    wrapped_sphinx_directory, dirs_exist_ok=True)
+                    wrapped_sphinx_directory,
+                    self.build_context.tool_options.doc_staging)
             except OSError as e:
                 print(f'Failed to copy user content: {e}')
         else:
             # copy index file if it exists
             index_jinja_path = os.path.join(package_xml_directory, 'index.rst.jinja')
-            if os.path.isfile(index_jinja_path):
+            if package_survey.isfile('index.rst.jinja'):
                 shutil.copy(index_jinja_path, wrapped_sphinx_directory)
             else:
                 index_path = os.path.join(package_xml_directory, 'index.rst')
-                if os.path.isfile(index_path):
+                if package_survey.isfile('index.rst'):
                     shutil.copy(index_path, wrapped_sphinx_directory)
 
             # include user documentation
@@ -601,21 +620,44 @@ class SphinxBuilder(Builder):
                         f'standard location "{user_doc_dir}" and that will be used.')
             if user_doc_dir:
                 doc_directories = include_user_docs(
-                    user_doc_dir, wrapped_sphinx_directory, package_xml_directory)
+                    user_doc_dir, wrapped_sphinx_directory, package_survey,
+                    self.build_context.tool_options.doc_staging)
                 logger.info(f'doc_directories: {doc_directories}')
 
         # Collect intersphinx mapping extensions from discovered inventory files.
         inventory_files = \
             collect_inventory_files(self.build_context.tool_options.cross_reference_directory)
+        # Packages in the workspace inventory are resolved by the rosdoc2 extension instead.
+        # It is brought up to date with the inventory maps of the cross reference directory.
+        database_path = \
+            workspace_inventory_path(self.build_context.tool_options.doc_build_directory)
+        try:
+            published = sync_workspace_inventory(database_path, inventory_files)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f'Unable to update the workspace inventory: {e}')
+            published = {}
+        workspace_inventory = ''
+        if set(published) - {self.build_context.package.name}:
+            workspace_inventory = esc_backslash(os.path.abspath(database_path))
         base_url = self.build_context.tool_options.base_url
-        intersphinx_mapping_extensions = [
-            f"'{package_name}': "
-            f"('{base_url}/{package_name}/{inventory_dict['location_data']['relative_root']}', "
-            f"'{esc_backslash(os.path.abspath(inventory_dict['inventory_file']))}')"
-            for package_name, inventory_dict in inventory_files.items()
-            # Exclude ourselves.
-            if package_name != self.build_context.package.name
-        ]
+        intersphinx_mapping_extensions = []
+        inventory_map_extensions = []
+        for package_name, inventory_dict in inventory_files.items():
+            # Exclude ourselves, and the up to date packages of the workspace inventory.
+            if package_name == self.build_context.package.name or \
+                    package_name in published:
+                continue
+            package_url = \
+                f"{base_url}/{package_name}/{inventory_dict['location_data']['relative_root']}"
+            # Inventories with a lookup map are resolved by the rosdoc2 extension instead.
+            if inventory_dict['inventory_map']:
+                inventory_map_extensions.append(
+                    f"'{package_name}': ('{package_url}', "
+                    f"'{esc_backslash(os.path.abspath(inventory_dict['inventory_map']))}')")
+            else:
+                intersphinx_mapping_extensions.append(
+                    f"'{package_name}': ('{package_url}', "
+                    f"'{esc_backslash(os.path.abspath(inventory_dict['inventory_file']))}')")
 
         # Collect package-only exec_depends
         exec_depends = self.build_context.package.exec_depends
@@ -624,8 +666,7 @@ class SphinxBuilder(Builder):
             logger.warning('ROS_DISTRO not set, cannot check ros package dependencies')
         package_depends = []
         if exec_depends and ros_distro:
-            index = rosdistro.get_index(rosdistro.get_index_url())
-            dist_file = rosdistro.get_distribution_file(index, ros_distro)
+            dist_file = get_distribution_file(ros_distro)
             rosdistro_packages = dist_file.release_packages
             for exec_depend in exec_depends:
                 if exec_depend.name in rosdistro_packages:
@@ -678,6 +719,12 @@ class SphinxBuilder(Builder):
                 f'        "{package.name} Doxygen Project": '
                 f'"{esc_backslash(self.doxygen_xml_directory)}"')
 
+        dependency_names = \
+            [exec_depend.name for exec_depend in package.exec_depends] + \
+            [doc_depend.name for doc_depend in package.doc_depends]
+        modules_to_mock = find_modules_to_mock(
+            dependency_names, self.build_context.tool_options.doc_build_directory)
+
         self.template_variables.update({
             'always_run_doxygen': self.build_context.always_run_doxygen,
             'breathe_projects': ',\n'.join(breathe_projects) + '\n    ',
@@ -687,15 +734,19 @@ class SphinxBuilder(Builder):
             'default_conf_py_filename': esc_backslash(
                 os.path.abspath(os.path.join(conf_py_directory, '__conf_default.py'))),
             'disable_breathe': self.build_context.disable_breathe,
-            'exec_depends': [exec_depend.name for exec_depend in package.exec_depends]
-            + [doc_depend.name for doc_depend in package.doc_depends],
+            'exec_depends': dependency_names,
             'has_python': has_python,
             'has_cpp': has_cpp,
             'has_standard_docs': bool(standard_docs),
             'has_documentation': bool(doc_directories),
             'has_readme': 'readme' in standard_docs,
             'interface_counts': interface_counts,
+            'modules_to_mock': modules_to_mock,
             'intersphinx_mapping_extensions': ',\n        '.join(intersphinx_mapping_extensions),
+            'workspace_inventory': workspace_inventory,
+            'package_dependencies': repr(sorted(package_dependencies(self.build_context.package))),
+            'inventory_map_extensions': ',\n        '.join(inventory_map_extensions),
+            'base_url': base_url,
             'package': package,
             'package_authors': ', '.join(sorted(set(
                 [a.name for a in package.authors] + [m.name for m in package.maintainers]
@@ -705,6 +756,7 @@ class SphinxBuilder(Builder):
             'package_version_short': '.'.join(package.version.split('.')[0:2]),
             'python_src_directory': esc_backslash(python_src_directory),
             'show_doxygen_html': self.build_context.show_doxygen_html,
+            'output_profile': self.build_context.output_profile,
             'user_conf_py_filename': esc_backslash(
                 os.path.abspath(os.path.join(conf_py_directory, '__conf.py'))),
             'wrapped_sphinx_directory': esc_backslash(os.path.abspath(wrapped_sphinx_directory)),
@@ -737,10 +789,11 @@ class SphinxBuilder(Builder):
                 logger.info(
                     f"Running sphinx-apidoc: '{' '.join(cmd)}' in '{wrapped_sphinx_directory}'"
                 )
-                completed_process = subprocess.run(cmd, cwd=wrapped_sphinx_directory,
-                                                   stdout=sys.stdout, stderr=sys.stderr)
-                msg = f"sphinx-apidoc exited with return code '{completed_process.returncode}'"
-                if completed_process.returncode == 0:
+                returncode = run_subprocess(
+                    cmd, cwd=wrapped_sphinx_directory, phase='sphinx-apidoc',
+                    timeout=self.build_context.tool_options.sphinx_timeout)
+                msg = f"sphinx-apidoc exited with return code '{returncode}'"
+                if returncode == 0:
                     logger.debug(msg)
                 else:
                     logger.warning(msg)
@@ -753,13 +806,24 @@ class SphinxBuilder(Builder):
             wrapped_sphinx_directory,
             sphinx_output_dir,
         ]
+        if getattr(self.build_context.tool_options, 'watch', False):
+            # Keep the environment and doctrees of Sphinx for the next build in watch mode,
+            # in which Sphinx only reads the documents which changed since.
+            watch_directory = watch_state_directory(
+                self.build_context.tool_options.doc_build_directory,
+                self.build_context.package.name, self.name)
+            kept = keep_unchanged_mtimes(
+                wrapped_sphinx_directory, os.path.join(watch_directory, 'sources.json'))
+            logger.info(f'{kept} generated files are unchanged since the previous build')
+            cmd[1:1] = ['-d', os.path.join(watch_directory, 'doctrees')]
         logger.info(
             f"Running Sphinx-build: '{' '.join(cmd)}' in '{wrapped_sphinx_directory}'"
         )
-        completed_process = subprocess.run(cmd, cwd=wrapped_sphinx_directory,
-                                           stdout=sys.stdout, stderr=sys.stderr)
-        msg = f"Sphinx-build exited with return code '{completed_process.returncode}'"
-        if completed_process.returncode == 0:
+        returncode = run_subprocess(
+            cmd, cwd=wrapped_sphinx_directory, phase='Sphinx-build',
+            timeout=self.build_context.tool_options.sphinx_timeout)
+        msg = f"Sphinx-build exited with return code '{returncode}'"
+        if returncode == 0:
             logger.info(msg)
         else:
             raise RuntimeError(msg)
@@ -778,6 +842,11 @@ class SphinxBuilder(Builder):
             os.path.abspath(inventory_file_name),
             os.path.abspath(destination)
         )
+        try:
+            write_inventory_map(os.path.abspath(destination))
+        except RuntimeError as e:
+            # Other packages fall back to intersphinx for this inventory.
+            logger.warning(f'Unable to write the lookup map of the inventory file: {e}')
 
         # Create a .location.json file as well, so we can know the relative path to the root
         # of the sphinx content from the package's documentation root.
@@ -795,9 +864,61 @@ class SphinxBuilder(Builder):
         # These do not seem to be needed for output display, so delete them.
         shutil.rmtree(os.path.join(sphinx_output_dir, '.doctrees'), ignore_errors=True)
 
+        if self.build_context.output_profile == 'lean':
+            self.remove_build_byproducts(sphinx_output_dir)
+
         # Return the directory into which Sphinx generated.
         return sphinx_output_dir
 
+    def remove_build_byproducts(self, sphinx_output_dir):
+        """Remove the files which are not needed to view the documentation, for lean output."""
+        byproducts = [
+            # Sphinx build state and source copies, in case a user conf.py enabled them.
+            os.path.join(sphinx_output_dir, '.buildinfo'),
+            os.path.join(sphinx_output_dir, '_sources'),
+        ]
+        if self.doxygen_xml_directory is not None:
+            # Only read by breathe and exhale, during the Sphinx build.
+            byproducts.append(self.doxygen_xml_directory)
+        for path in byproducts:
+            if os.path.isdir(path) and not os.path.islink(path):
+                logger.info(f"Removing '{path}' from the lean output")
+                shutil.rmtree(path)
+            elif os.path.lexists(path):
+                os.remove(path)
+
+    def check_breathe_workload(self):
+        """
+        Measure the Doxygen XML which breathe and exhale will process, before running Sphinx.
+
+        If the package has more members than the breathe_member_limit, breathe is disabled
+        and the Doxygen html is shown instead.
+        """
+        package_name = self.build_context.package.name
+        try:
+            statistics = doxygen_xml_statistics(self.doxygen_xml_directory)
+        except RuntimeError as e:
+            logger.warning(str(e))
+            return
+        if statistics is None:
+            return
+        logger.info(
+            f"Doxygen XML of '{package_name}' has {statistics['compounds']} compounds and "
+            f"{statistics['members']} members")
+        limit = self.build_context.breathe_member_limit
+        statistics['breathe_member_limit'] = limit
+        statistics['breathe_disabled_by_limit'] = False
+        if limit is not None and statistics['members'] > limit and \
+                not self.build_context.disable_breathe:
+            logger.warning(
+                f"Disabling breathe for '{package_name}', its {statistics['members']} Doxygen "
+                f'members exceed the breathe_member_limit of {limit}, showing the Doxygen '
+                'html instead')
+            self.build_context.disable_breathe = True
+            self.build_context.show_doxygen_html = True
+            statistics['breathe_disabled_by_limit'] = True
+        record_metrics(self.build_context.tool_options, package_name, 'doxygen_xml', statistics)
+
     def locate_user_doc_dir_from_standard_locations(self):
         """
         Return the location of a user documentation for the package.
@@ -809,20 +930,22 @@ class SphinxBuilder(Builder):
         "separate source and build directories" when running Sphinx-quickstart and
         those that did not, respectively.
         """
-        package_xml_directory = os.path.dirname(self.build_context.package.filename)
+        package_survey = self.build_context.package_survey
         options = [
             os.path.join('doc', 'source'),
             'doc',
         ]
         for option in options:
-            if os.path.isdir(os.path.join(package_xml_directory, option)):
+            if package_survey.isdir(option):
                 return option
         return None
 
     def generate_default_project_into_directory(
             self, conf_py_directory, python_src_directory):
         """Generate the default project configuration files if needed."""
-        with open(os.path.join(conf_py_directory, '__conf_default.py'), 'w') as f:
+        default_conf_py_path = os.path.join(conf_py_directory, '__conf_default.py')
+        unstage_file(default_conf_py_path)
+        with open(default_conf_py_path, 'w') as f:
             f.write(default_conf_py)
 
     def generate_wrapping_rosdoc2_sphinx_project_into_directory(
@@ -837,16 +960,18 @@ class SphinxBuilder(Builder):
             template_path = wrapped_sphinx_directory_path / 'index.rst.jinja'
             if template_path.is_file():
                 logger.info('Using a user-supplied index.rst.jinja')
+                template = jinja_environment().from_string(template_path.read_text())
             else:
                 # Generate a default index.rst
                 logger.info('Using a default index.rst.jinja')
-                template_path = resources.files(
-                    'rosdoc2.verbs.build.builders').joinpath('index.rst.jinja')
-            template_jinja = template_path.read_text()
-            index_rst = Template(template_jinja).render(self.template_variables)
+                template = jinja_environment().get_template('index.rst.jinja')
+            index_rst = template.render(self.template_variables)
 
             with open(index_rst_path, 'w+') as f:
                 f.write(index_rst)
 
-        with open(os.path.join(wrapped_sphinx_directory, 'conf.py'), 'w') as f:
+        # The conf.py may be a staged link to the user's own conf.py, do not write through it.
+        wrapping_conf_py_path = os.path.join(wrapped_sphinx_directory, 'conf.py')
+        unstage_file(wrapping_conf_py_path)
+        with open(wrapping_conf_py_path, 'w') as f:
             f.write(rosdoc2_wrapping_conf_py_template.format_map(self.template_variables))
@@ -12,18 +12,31 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 import logging
 import os
 
+from .inventory_map import INVENTORY_MAP_SUFFIX
+from .location_data import read_location_data
+
 logger = logging.getLogger('rosdoc2')
 
 
+def _up_to_date_inventory_map(inventory_file_path):
+    map_path = inventory_file_path + INVENTORY_MAP_SUFFIX
+    try:
+        if os.path.getmtime(map_path) >= os.path.getmtime(inventory_file_path):
+            return map_path
+    except OSError:
+        pass
+    return None
+
+
 def collect_inventory_files(cross_reference_directory):
     """
     Collect all inventory files of a given cross reference directory.
 
-    :return: dictionary of inventory files, where the package name is the key
+    :return: dictionary of inventory files, where the package name is the key, and the
+        'inventory_map' of each is the path of its lookup map, or None if it has none
     """
     inventory_files = {}
     for root, directories, filenames in os.walk(cross_reference_directory):
@@ -42,11 +55,10 @@ def collect_inventory_files(cross_reference_directory):
                         f"Ignoring tag file '{inventory_file_path}' because it lacks "
                         f"a '.location.json' file.")
                     continue
-                location_data = None
-                with open(location_json_path, 'r+') as f:
-                    location_data = json.loads(f.read())
+                location_data = read_location_data(location_json_path)
                 inventory_files[package_name] = {
                     'inventory_file': inventory_file_path,
                     'location_data': location_data,
+                    'inventory_map': _up_to_date_inventory_map(inventory_file_path),
                 }
     return inventory_files
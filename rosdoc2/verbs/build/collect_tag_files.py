@@ -12,15 +12,32 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 import logging
 import os
 
+from .location_data import read_location_data
+from .prune_tag_file import PRUNED_TAG_FILE_SUFFIX
+
 logger = logging.getLogger('rosdoc2')
 
 
+def _prefer_pruned_tag_file(tag_file_path):
+    # The pruned tag file is only used if it was created from the current tag file.
+    pruned_tag_file_path = tag_file_path + PRUNED_TAG_FILE_SUFFIX
+    try:
+        if os.path.getmtime(pruned_tag_file_path) >= os.path.getmtime(tag_file_path):
+            return pruned_tag_file_path
+    except OSError:
+        pass
+    return tag_file_path
+
+
 def collect_tag_files(cross_reference_directory):
-    """Collect all tag files if a given cross reference directory."""
+    """
+    Collect all tag files if a given cross reference directory.
+
+    The pruned version of a tag file is returned instead of the tag file, if there is one.
+    """
     tag_files = {}
     for root, directories, filenames in os.walk(cross_reference_directory):
         for filename in filenames:
@@ -38,11 +55,9 @@ def collect_tag_files(cross_reference_directory):
                         f"Ignoring tag file '{tag_file_path}' because it lacks "
                         f"a '.location.json' file.")
                     continue
-                location_data = None
-                with open(location_json_path, 'r+') as f:
-                    location_data = json.loads(f.read())
+                location_data = read_location_data(location_json_path)
                 tag_files[filename_base] = {
-                    'tag_file': tag_file_path,
+                    'tag_file': _prefer_pruned_tag_file(tag_file_path),
                     'location_data': location_data,
                 }
     return tag_files
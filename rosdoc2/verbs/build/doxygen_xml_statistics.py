@@ -0,0 +1,53 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Size of the Doxygen XML output, which determines the work of breathe and exhale."""
+
+import os
+from xml.etree import ElementTree
+
+
+def doxygen_xml_statistics(doxygen_xml_directory):
+    """
+    Count the compounds and members listed in the index.xml of a Doxygen XML directory.
+
+    The index is streamed, so that the index of large packages is not loaded into memory.
+
+    :return: dict with the number of 'compounds' and 'members', and the number of each kind
+        in 'compound_kinds' and 'member_kinds', or None if there is no index.xml
+    :raises RuntimeError: if the index can not be parsed
+    """
+    index_path = os.path.join(doxygen_xml_directory, 'index.xml')
+    if not os.path.isfile(index_path):
+        return None
+    compound_kinds = {}
+    member_kinds = {}
+    try:
+        for _, element in ElementTree.iterparse(index_path, events=('end',)):
+            if element.tag == 'member':
+                kind = element.get('kind', 'unknown')
+                member_kinds[kind] = member_kinds.get(kind, 0) + 1
+            elif element.tag == 'compound':
+                kind = element.get('kind', 'unknown')
+                compound_kinds[kind] = compound_kinds.get(kind, 0) + 1
+                # The compound and its members are counted, free them.
+                element.clear()
+    except ElementTree.ParseError as e:
+        raise RuntimeError(f"Error unable to parse Doxygen index '{index_path}': {e}")
+    return {
+        'compounds': sum(compound_kinds.values()),
+        'members': sum(member_kinds.values()),
+        'compound_kinds': compound_kinds,
+        'member_kinds': member_kinds,
+    }
@@ -0,0 +1,77 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Locate the C/C++ headers of a package for Doxygen."""
+
+import os
+
+HEADER_EXTENSIONS = ('.h', '.hpp', '.hh', '.h++', '.hxx')
+
+# Directories containing vendored third party code, whose headers are not part of the API.
+VENDORED_DIRECTORY_NAMES = ('3rdparty', 'external', 'third_party', 'thirdparty', 'vendor')
+# Directories containing tests, whose headers are not part of the API either. Only exact
+# names, so that headers in directories like include/test_msgs are still found.
+TEST_DIRECTORY_NAMES = ('test', 'tests')
+
+
+def is_excluded_directory(name):
+    """Return True if the headers of a directory with this name are not part of the API."""
+    return (
+        name.startswith('.')
+        or name in TEST_DIRECTORY_NAMES
+        or name.lower() in VENDORED_DIRECTORY_NAMES
+    )
+
+
+def _walk_headers(package_survey, relpath):
+    """Yield the relative paths of headers below relpath, pruning excluded directories."""
+    for root, dirs, files in package_survey.walk(relpath):
+        rel_root = os.path.relpath(root, start=package_survey.package_directory)
+        # Prune in place, so that excluded directories are never descended into.
+        dirs[:] = [
+            d for d in dirs
+            if not is_excluded_directory(d)
+            and os.path.normpath(os.path.join(rel_root, d))
+            not in package_survey.ignored_directories
+        ]
+        if rel_root in package_survey.ignored_directories:
+            dirs.clear()
+            continue
+        for file in files:
+            if os.path.splitext(file)[1].lower() in HEADER_EXTENSIONS:
+                yield os.path.join(rel_root, file)
+
+
+def find_include_directory(package_survey, candidate_dirs):
+    """
+    Return the first of candidate_dirs which contains a C/C++ header, or None.
+
+    The search of each candidate stops at the first header found. Test directories,
+    hidden directories, vendored third party directories and directories with an ignore
+    marker are skipped.
+    """
+    for candidate_dir in candidate_dirs:
+        if next(_walk_headers(package_survey, candidate_dir), None) is not None:
+            return candidate_dir
+    return None
+
+
+def count_headers(package_survey, relpath):
+    """
+    Count the C/C++ headers below relpath, with the same exclusions as find_include_directory().
+
+    The count is a cheap estimate of the cost of running Doxygen, which scan uses to estimate
+    the remaining time of the packages it is building.
+    """
+    return sum(1 for _ in _walk_headers(package_survey, relpath))
@@ -0,0 +1,100 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Decide which package dependencies autodoc needs to mock, without importing them."""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import sys
+
+logger = logging.getLogger('rosdoc2')
+
+
+def python_module_name(dependency_name):
+    """Guess the Python module name of a package.xml dependency, like python3-foo-pip."""
+    # Some python dependencies may be dist packages.
+    return dependency_name.split('python3-')[-1].split('-pip')[0].replace('-', '_')
+
+
+def environment_hash():
+    """
+    Return a hash identifying the interpreter and the modules it could import.
+
+    Installing or removing a module changes the modification time of the sys.path entry
+    containing it, and so also changes the hash.
+    """
+    path_state = []
+    for path in sys.path:
+        try:
+            mtime = os.stat(path or '.').st_mtime_ns
+        except OSError:
+            mtime = None
+        path_state.append((path, mtime))
+    key = json.dumps({
+        'executable': sys.executable,
+        'version': sys.version,
+        'path': path_state,
+    })
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _is_importable(module_name):
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def find_modules_to_mock(dependency_names, cache_directory):
+    """
+    Return the Python module names of the dependencies which cannot be imported.
+
+    Modules are located with importlib.util.find_spec(), so nothing is actually imported.
+    Results are cached in cache_directory, keyed by environment_hash().
+
+    :param list[str] dependency_names: exec and doc dependency names from package.xml
+    :param str cache_directory: directory to keep the cache in
+    :return: list of module names, in the order of dependency_names
+    """
+    cache_path = os.path.join(
+        cache_directory, f'importable_modules_{environment_hash()[:16]}.json')
+    importable = {}
+    if os.path.isfile(cache_path):
+        try:
+            with open(cache_path, 'r') as f:
+                importable = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Ignoring unreadable importable modules cache '{cache_path}': {e}")
+
+    modules_to_mock = []
+    cache_updated = False
+    for dependency_name in dependency_names:
+        module_name = python_module_name(dependency_name)
+        if module_name not in importable:
+            importable[module_name] = _is_importable(module_name)
+            cache_updated = True
+        if not importable[module_name] and module_name not in modules_to_mock:
+            modules_to_mock.append(module_name)
+
+    if cache_updated:
+        # Several scan workers may update the cache at once, so replace it atomically.
+        os.makedirs(cache_directory, exist_ok=True)
+        temporary_path = f'{cache_path}.{os.getpid()}'
+        with open(temporary_path, 'w') as f:
+            json.dump(importable, f, indent=0, sort_keys=True)
+        os.replace(temporary_path, cache_path)
+    return modules_to_mock
@@ -42,29 +42,27 @@ toc_fm_rst = """\
 """
 
 
-def _find_files_with_extension(path, ext):
+def _find_files_with_extension(package_survey, ext):
     """
-    Search a package path, in subdirectory <ext>, for files with that <ext>.
+    Search a package survey, in subdirectory <ext>, for files with that <ext>.
     """
     # Partly adapted from https://github.com/ros-infrastructure/rosdoc_lite
     matches = []
     # We assume that the directory name is the same as the extension
-    iface_dir = os.path.join(path, ext)
-    if not os.path.isdir(iface_dir):
-        return matches
-    for filename in os.listdir(iface_dir):
-        filepath = os.path.join(iface_dir, filename)
+    _, filenames = package_survey.listdir(ext)
+    for filename in filenames:
+        filepath = package_survey.abspath(os.path.join(ext, filename))
         (filebase, fileext) = os.path.splitext(filename)
-        if os.path.isfile(filepath) and (ext == fileext[1:]):
+        if ext == fileext[1:]:
             matches.append((filename, filepath, filebase))
     return matches
 
 
-def generate_interface_docs(path: str, package: str, output_dir: str):
+def generate_interface_docs(package_survey, package: str, output_dir: str):
     """
     Generate rst files from messages and services.
 
-    :param str path: Directory path to start search for files
+    :param PackageSurvey package_survey: Survey of the package directory to search for files
     :param str package: Name of containing package
     :param str output_dir: Directory path to write output
     :return: {'msg':msg_count, 'srv':srv_count} count of files written
@@ -74,7 +72,7 @@ def generate_interface_docs(path: str, package: str, output_dir: str):
     for type_info in (('msg', 'message'), ('srv', 'service'), ('action', 'action')):
         count = 0
         (type_ext, type_name) = type_info
-        interfaces = _find_files_with_extension(path, type_ext)
+        interfaces = _find_files_with_extension(package_survey, type_ext)
         output_dir_ex = os.path.join(output_dir, type_ext)
         title = type_name.capitalize() + ' Definitions'
         for interface in interfaces:
@@ -17,7 +17,7 @@
 
 import os
 
-from jinja2 import Template
+from .jinja_environment import jinja_environment, register_inline_template
 
 depends_fm_rst = """\
 ROS Package Dependencies
@@ -29,6 +29,7 @@ ROS Package Dependencies
     {{ package_depend }} <https://docs.ros.org/en/{{ rosdistro }}/p/{{ package_depend }}/>
     {% endfor %}
 """
+register_inline_template('__ros_package_dependencies.rst.jinja', depends_fm_rst)
 
 
 def generate_ros_package_dependencies(output_dir: str, package_depends: list[str], rosdistro: str):
@@ -39,7 +40,8 @@ def generate_ros_package_dependencies(output_dir: str, package_depends: list[str
     :param list[str] package_depends: List of package dependencies
     :param str rosdistro: Name of ROS distribution
     """
-    depends_rst = Template(depends_fm_rst).render({
+    template = jinja_environment().get_template('__ros_package_dependencies.rst.jinja')
+    depends_rst = template.render({
         'package_depends': package_depends,
         'rosdistro': rosdistro,
     })
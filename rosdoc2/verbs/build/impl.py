@@ -16,13 +16,15 @@ import os
 import shutil
 import sys
 
-from catkin_pkg.package import has_ros_schema_reference
-from catkin_pkg.package import InvalidPackage
-from catkin_pkg.package import package_exists_at
-from catkin_pkg.package import parse_package
 from rosdoc2.slugify import slugify
 
-from .inspect_package_for_settings import inspect_package_for_settings
+from .archive_output import archive_path, check_output_format, write_package_archive
+from .archive_output import DEFAULT_OUTPUT_FORMAT, OUTPUT_FORMATS
+from .build_context import DEFAULT_OUTPUT_PROFILE, OUTPUT_PROFILES
+from .manifest import publish_package_output
+from .metrics import record_metrics, summarize_output
+from .stage_directory import DEFAULT_STAGING_MODE, STAGING_MODES
+from .watch import WATCH_REUSABLE_BUILDER_TYPES, watch_state_directory
 
 logging.basicConfig(format='[%(name)s] [%(levelname)s] %(message)s', level=logging.INFO)
 logger = logging.getLogger('rosdoc2')
@@ -34,6 +36,12 @@ DEFAULT_CROSS_REFERENCE_DIR = 'cross_reference'
 
 def get_package(path):
     """Get the ROS package for the given path."""
+    # Imported here, as catkin_pkg is slow to import and not needed by every verb.
+    from catkin_pkg.package import has_ros_schema_reference
+    from catkin_pkg.package import InvalidPackage
+    from catkin_pkg.package import package_exists_at
+    from catkin_pkg.package import parse_package
+
     if not package_exists_at(path):
         raise RuntimeError(f"Failed to find a ROS package at given path '{path}'")
 
@@ -52,6 +60,26 @@ def get_package(path):
 
 def prepare_arguments(parser):
     """Add command-line arguments to the argparse object."""
+    prepare_package_arguments(parser)
+    parser.add_argument(
+        '--watch',
+        default=False,
+        action='store_true',
+        help=(
+            'keep running, and build the package again whenever its files change, Doxygen '
+            'is only run again when a file it reads changed'
+        ),
+    )
+    return parser
+
+
+def prepare_package_arguments(parser):
+    """
+    Add the arguments of building one package to the argparse object.
+
+    These are shared with the scan verb and the requests of the serve verb, which build
+    packages once, so they leave out --watch.
+    """
     parser.add_argument(
         '--package-path',
         '-p',
@@ -109,12 +137,72 @@ def prepare_arguments(parser):
         '-y',
         help='Extend rosdoc2.yaml'
     )
+    parser.add_argument(
+        '--doc-staging',
+        default=DEFAULT_STAGING_MODE,
+        choices=STAGING_MODES,
+        help=(
+            'how user documentation is staged into the build directory, linking avoids '
+            'copying large doc assets (default: %(default)s)'
+        ),
+    )
+    parser.add_argument(
+        '--doxygen-timeout',
+        type=float,
+        default=None,
+        help='maximum time in seconds allowed for running Doxygen (default: no limit)',
+    )
+    parser.add_argument(
+        '--breathe-member-limit',
+        type=int,
+        default=None,
+        help=(
+            'maximum number of Doxygen members to document with breathe, larger packages '
+            'link to the Doxygen html instead, overridden by the breathe_member_limit '
+            'setting of a package (default: no limit)'
+        ),
+    )
+    parser.add_argument(
+        '--output-profile',
+        default=DEFAULT_OUTPUT_PROFILE,
+        choices=OUTPUT_PROFILES,
+        help=(
+            "which files to publish, 'lean' leaves out the copies of the sources and other "
+            'build byproducts, overridden by the output_profile setting of a package '
+            '(default: %(default)s)'
+        ),
+    )
+    parser.add_argument(
+        '--output-format',
+        default=DEFAULT_OUTPUT_FORMAT,
+        choices=OUTPUT_FORMATS,
+        help=(
+            'publish the documentation of a package as a directory, or as a reproducible '
+            "archive named after the package in the output directory, 'tar.zst' requires the "
+            'zstandard python package (default: %(default)s)'
+        ),
+    )
+    parser.add_argument(
+        '--sphinx-timeout',
+        type=float,
+        default=None,
+        help=(
+            'maximum time in seconds allowed for each run of sphinx-apidoc and sphinx-build '
+            '(default: no limit)'
+        ),
+    )
     return parser
 
 
 def main(options):
     """Execute the program, catching errors."""
     try:
+        if options.watch:
+            from .watch import watch
+            return watch(
+                options, options.package_path,
+                lambda reuse_builder_types: main_impl(
+                    options, reuse_builder_types=reuse_builder_types))
         return main_impl(options)
     except Exception as e:  # noqa: B902
         if options.debug:
@@ -123,10 +211,31 @@ def main(options):
             sys.exit(str(e))
 
 
-def main_impl(options):
-    """Execute the program."""
+def _link_tree(source, destination):
+    """Copy a directory tree, hard linking the files where possible."""
+    def link(src, dst):
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+    shutil.copytree(source, destination, symlinks=True, copy_function=link)
+
+
+def main_impl(options, package=None, reuse_builder_types=frozenset()):
+    """
+    Execute the program.
+
+    :param package: the already parsed package at options.package_path, with its conditions
+        evaluated. If None, the package.xml is located and parsed.
+    :param reuse_builder_types: types of the builders whose output of the previous build in
+        watch mode is reused, instead of running them again
+    """
+    # Imported here, so that the builders and their dependencies are only loaded when building.
+    from .inspect_package_for_settings import inspect_package_for_settings
+
     # Locate and parse the package's package.xml.
-    package = get_package(options.package_path)
+    if package is None:
+        package = get_package(options.package_path)
 
     if options.build_directory is not None:
         logger.warn(
@@ -138,6 +247,8 @@ def main_impl(options):
             'The --install-directory option (-i) is unused '
             'and will be removed in a future version')
 
+    check_output_format(options.output_format)
+
     # Inspect package for additional settings, using defaults if none found.
     tool_settings, builders = inspect_package_for_settings(
         package,
@@ -165,11 +276,26 @@ def main_impl(options):
     pass
 
     # Run each builder.
+    # Map of builder name to its output directory and the files it moved.
+    builder_outputs = {}
     for builder in builders:
         # This is the working directory for the builder.
         doc_build_folder = os.path.join(package_doc_build_directory, slugify(builder.name))
         # This is the directory into which the results of the builder will be moved into.
         builder_destination = os.path.join(output_staging_directory, builder.output_dir)
+        # In watch mode the output of the builders which may be reused is kept here, outside
+        # of the package doc build directory, which is removed by every build.
+        watch_cache = watch_state_directory(
+            options.doc_build_directory, package.name, builder.name)
+        if builder.builder_type in reuse_builder_types and os.path.isdir(watch_cache):
+            logger.info(
+                f"Reusing the output of the builder '{builder.name} ({builder.builder_type})' "
+                'of the previous build.')
+            _link_tree(watch_cache, doc_build_folder)
+            builder_outputs[builder.name] = (builder.output_dir, builder.move_files(
+                source=doc_build_folder,
+                destination=builder_destination))
+            continue
         # Run the builder, get the directory where the artifacts were placed.
         # This should be inside the doc_build_folder, but might be a subfolder.
         doc_output_directory = builder.build(
@@ -187,25 +313,28 @@ def main_impl(options):
         # Move documentation artifacts from the builder into the output staging.
         # This is additionally in a subdirectory dictated by the output directory part of the
         # builder configuration.
-        builder.move_files(
+        builder_outputs[builder.name] = (builder.output_dir, builder.move_files(
             source=doc_output_directory,
-            destination=builder_destination)
+            destination=builder_destination))
+        if getattr(options, 'watch', False) and \
+                builder.builder_type in WATCH_REUSABLE_BUILDER_TYPES:
+            shutil.rmtree(watch_cache, ignore_errors=True)
+            _link_tree(builder_destination, watch_cache)
+    record_metrics(options, package.name, 'output', summarize_output(builder_outputs))
+
+    if options.output_format != DEFAULT_OUTPUT_FORMAT:
+        # Stream the staged files into the archive, instead of moving them.
+        package_archive = \
+            archive_path(options.output_directory, package.name, options.output_format)
+        logger.info(f"Writing the documentation into the archive '{package_archive}'.")
+        write_package_archive(
+            output_staging_directory, package_archive, package.name, options.output_format)
+        shutil.rmtree(output_staging_directory)
+        return 0
 
     # Move staged files to user provided output directory.
     package_output_directory = os.path.join(options.output_directory, package.name)
     logger.info(f"Moving files to final destination in '{package_output_directory}'.")
-    for root, dirs, files in os.walk(output_staging_directory):
-        for item in dirs + files:
-            source = os.path.abspath(os.path.join(root, item))
-            destination = \
-                os.path.abspath(os.path.join(package_output_directory, item))
-            if os.path.isdir(destination):
-                # shutil.move behaves in a way such that if the destination exists
-                # and is a directory, it would copy the source directory into it,
-                # rather than replacing its contents or appending to it.
-                # So deleting it first will prevent that.
-                shutil.rmtree(destination)
-            shutil.move(source, destination)
-        break
+    publish_package_output(output_staging_directory, package_output_directory)
 
     return 0
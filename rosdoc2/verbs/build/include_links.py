@@ -14,7 +14,7 @@
 
 import os
 
-from jinja2 import Template
+from .jinja_environment import jinja_environment, register_inline_template
 
 links_template = """
 Links
@@ -27,10 +27,11 @@ Links
    {{ link.type.capitalize() }} <{{ link.url }}>
 {%- endfor %}
 """
+register_inline_template('__links.rst.jinja', links_template)
 
 
 def include_links(package, output_dir):
     """Generate an rst file containing links."""
-    links_rst = Template(links_template).render({'package': package})
+    links_rst = jinja_environment().get_template('__links.rst.jinja').render({'package': package})
     with open(os.path.join(output_dir, '__links.rst'), 'w') as f:
         f.write(links_rst)
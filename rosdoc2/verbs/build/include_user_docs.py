@@ -14,7 +14,8 @@
 
 import logging
 import os
-import shutil
+
+from .stage_directory import DEFAULT_STAGING_MODE, stage_directory
 
 logger = logging.getLogger('rosdoc2')
 
@@ -46,15 +47,22 @@ subdirectory_rst_template = """\
 
 def include_user_docs(rel_user_doc_directory: str,
                       output_dir: str,
-                      package_xml_directory: str
+                      package_survey,
+                      staging_mode: str = DEFAULT_STAGING_MODE,
                       ):
-    """Generate rst files for user documents."""
+    """
+    Generate rst files for user documents.
+
+    :param PackageSurvey package_survey: survey of the package.xml directory
+    :param str staging_mode: how the user documentation is staged, see stage_directory()
+    """
     logger.info(f'include_user_docs: rel_user_doc_directory <{rel_user_doc_directory}> '
                 f'output_dir <{output_dir}>')
+    package_xml_directory = package_survey.package_directory
     user_doc_directory = os.path.join(
         os.path.join(package_xml_directory, rel_user_doc_directory))
     doc_directories = []
-    for root, dirs, files in os.walk(user_doc_directory):
+    for root, dirs, files in package_survey.walk(rel_user_doc_directory):
         for file in files:
             # ensure a valid documentation file exists, directories might only contain resources.
             (_, ext) = os.path.splitext(file)
@@ -66,16 +74,16 @@ def include_user_docs(rel_user_doc_directory: str,
             # We assume that this index will also show any desired files in subdirectories
             dirs.clear()
 
-    if os.path.isdir(user_doc_directory):
+    if package_survey.isdir(rel_user_doc_directory):
         # At this point we know that a documentation directory exists, but we do not know what
-        # might also be needed for images or includes, perhaps in a README. So we copy
-        # everything to the output directory.
-        logger.info(f'Copying {os.path.join(package_xml_directory, rel_user_doc_directory)} to '
+        # might also be needed for images or includes, perhaps in a README. So we stage
+        # everything into the output directory.
+        logger.info(f'Staging {os.path.join(package_xml_directory, rel_user_doc_directory)} to '
                     f'{os.path.join(output_dir, rel_user_doc_directory)}')
-        shutil.copytree(
+        stage_directory(
             os.path.join(package_xml_directory, rel_user_doc_directory),
             os.path.join(output_dir, rel_user_doc_directory),
-            dirs_exist_ok=True)
+            staging_mode)
 
     if not doc_directories:
         logger.debug(f'no documentation found in {user_doc_directory}')
@@ -84,7 +92,7 @@ def include_user_docs(rel_user_doc_directory: str,
     logger.info(f'Documentation found in directories {doc_directories}')
 
     toc_files = '*'
-    if os.path.isfile(os.path.join(user_doc_directory, 'index.rst')):
+    if package_survey.isfile(os.path.join(rel_user_doc_directory, 'index.rst')):
         toc_files = 'index'
     toc_content = documentation_rst_template.format_map(
         {'rel_user_doc_directory': rel_user_doc_directory, 'files': toc_files})
@@ -17,10 +17,11 @@ import os
 
 import yaml
 
-from .build_context import BuildContext
+from .build_context import BuildContext, OUTPUT_PROFILES
 from .builders import create_builder_by_name
 from .create_format_map_from_package import create_format_map_from_package
 from .parse_rosdoc2_yaml import parse_rosdoc2_yaml
+from .yaml_extend import apply_yaml_extend, package_yaml_extend, safe_loader
 
 logger = logging.getLogger('rosdoc2')
 
@@ -74,6 +75,17 @@ settings: {{
 
     ## This setting, if true, will display a link to the Doxygen html output.
     # show_doxygen_html: false,
+
+    ## This setting, if provided, limits the number of Doxygen members documented with
+    ## breathe. If the package has more, disable_breathe and show_doxygen_html are
+    ## turned on, as breathe and exhale may take hours for very large packages.
+    ## Defaults to the --breathe-member-limit option, which has no limit by default.
+    # breathe_member_limit: 50000,
+
+    ## This setting, if 'lean', leaves the copies of the sources, the Sphinx build info and
+    ## the Doxygen XML out of the output, as they are not needed to view the documentation.
+    ## Defaults to the --output-profile option, which is 'full' by default.
+    # output_profile: 'full',
 }}
 builders:
     ## Each stanza represents a separate build step, performed by a specific 'builder'.
@@ -168,28 +180,10 @@ def inspect_package_for_settings(package, tool_options):
     for depends in package['buildtool_depends']:
         if str(depends) == 'ament_cmake_python':
             build_context.ament_cmake_python = True
-    configs = list(yaml.load_all(rosdoc_config_file, Loader=yaml.SafeLoader))
+    configs = list(yaml.load_all(rosdoc_config_file, Loader=safe_loader()))
 
     (settings_dict, builders_list) = parse_rosdoc2_yaml(configs, build_context)
 
-    # Extend rosdoc2.yaml if desired
-    #
-    # An optional fie may be used to modify the values in rosdoc2.yaml for this package. The format
-    # of this file is as follows:
-    """
----
-<some_identifier_describing_a_collection_of_packages>:
-    packages:
-        <1st package name>:
-            <anything valid in rosdoc2.yaml file>
-        <2nd package name>:
-            <more valid rosdoc2.yaml>
-<another_description>
-    packages:
-        <another_package_name>
-            <valid rosdoc2.yaml>
-    """
-
     # Over 10 packages incorrectly use enable_breathe=false and enable_exhale=false to mean
     # "Don't parse my code for documentation" Detect those, give a warning, and interpret
     # this as never_run_doxygen and never_run_sphinx_apidoc
@@ -202,32 +196,9 @@ def inspect_package_for_settings(package, tool_options):
             if 'never_run_doxygen' not in settings_dict:
                 settings_dict['never_run_doxygen'] = True
 
-    yaml_extend = tool_options.yaml_extend
-    if yaml_extend:
-        if not os.path.isfile(yaml_extend):
-            raise ValueError(
-                f"yaml_extend path '{yaml_extend}' is not a file")
-        with open(yaml_extend, 'r') as f:
-            yaml_extend_text = f.read()
-        extended_settings = yaml.load(yaml_extend_text, Loader=yaml.SafeLoader)
-        for ex_name in extended_settings:
-            if package.name in extended_settings[ex_name]['packages']:
-                extended_object = extended_settings[ex_name]['packages'][package.name]
-                if 'settings' in extended_object:
-                    for key, value in extended_object['settings'].items():
-                        settings_dict[key] = value
-                        logger.info(f'Overriding rosdoc2.yaml setting  <{key}> with <{value}>')
-                if 'builders' in extended_object:
-                    for ex_builder in extended_object['builders']:
-                        ex_builder_name = next(iter(ex_builder))
-                        # find this object in the builders list
-                        for user_builder in builders_list:
-                            user_builder_name = next(iter(user_builder))
-                            if user_builder_name == ex_builder_name:
-                                for builder_k, builder_v in ex_builder[ex_builder_name].items():
-                                    logger.info(f'Overriding rosdoc2 builder <{ex_builder_name}> '
-                                                f'property <{builder_k}> with <{builder_v}>')
-                                    user_builder[user_builder_name][builder_k] = builder_v
+    # Extend rosdoc2.yaml if desired, with the optional --yaml-extend file.
+    apply_yaml_extend(
+        package_yaml_extend(tool_options, package.name), settings_dict, builders_list)
 
     # if None, python_source is set to either './<package.name>' or 'src/<package.name>'
     build_context.python_source = settings_dict.get('python_source', None)
@@ -238,6 +209,14 @@ def inspect_package_for_settings(package, tool_options):
     build_context.build_type = settings_dict.get('override_build_type', build_context.build_type)
     build_context.disable_breathe = settings_dict.get('disable_breathe', False)
     build_context.show_doxygen_html = settings_dict.get('show_doxygen_html', False)
+    build_context.breathe_member_limit = settings_dict.get(
+        'breathe_member_limit', tool_options.breathe_member_limit)
+    build_context.output_profile = settings_dict.get(
+        'output_profile', tool_options.output_profile)
+    if build_context.output_profile not in OUTPUT_PROFILES:
+        raise RuntimeError(
+            f"Error invalid output_profile '{build_context.output_profile}', expected one of "
+            f"{', '.join(OUTPUT_PROFILES)}")
 
     builders = []
     for builder in builders_list:
@@ -0,0 +1,226 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compact, memory mappable lookup maps of Sphinx objects.inv inventories.
+
+An objects.inv file has to be decompressed and parsed completely before any name can be
+looked up in it. A map is written once, when the inventory is published, and a lookup only
+reads the few pages of the map that it needs.
+
+The map file consists of:
+
+- a header: the magic bytes, the format version, the number of entries and the size of
+  the metadata,
+- the metadata: JSON with the project name, version and the object types of the inventory,
+- a table of (hash, offset, length) of each entry, sorted by hash,
+- the entries: the object type, name, URI and display name, separated by NUL bytes.
+
+The hash is of the object type and name, where the name of the case insensitive object
+types is lower cased, as Sphinx matches them regardless of case.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import zlib
+
+INVENTORY_MAP_SUFFIX = '.map'
+INVENTORY_MAP_MAGIC = b'RDIM'
+INVENTORY_MAP_VERSION = 1
+# Object types which Sphinx matches case insensitively.
+CASE_INSENSITIVE_TYPES = frozenset(('std:label', 'std:term'))
+
+_HEADER = struct.Struct('<4sIII')
+_TABLE_ENTRY = struct.Struct('<QII')
+# From sphinx.util.inventory, careful to handle names with embedded spaces.
+_INVENTORY_LINE = re.compile(r'(.+?)\s+(\S+)\s+(-?\d+)\s+?(\S*)\s+(.*)')
+
+
+def _hash_key(objtype, name):
+    if objtype in CASE_INSENSITIVE_TYPES:
+        name = name.lower()
+    digest = hashlib.blake2b(f'{objtype}\0{name}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def read_objects_inv(inventory_file):
+    """
+    Parse a version 2 Sphinx objects.inv file.
+
+    :return: tuple of (project name, project version, dict mapping (object type, name) to
+        a tuple of (uri, display name))
+    :raises RuntimeError: if the file is not a version 2 inventory
+    """
+    with open(inventory_file, 'rb') as f:
+        data = f.read()
+    try:
+        header_line, project_line, version_line, compression_line, compressed = \
+            data.split(b'\n', 4)
+    except ValueError:
+        raise RuntimeError(f"Error invalid inventory file '{inventory_file}'")
+    if header_line.rstrip() != b'# Sphinx inventory version 2' or \
+            b'zlib' not in compression_line:
+        raise RuntimeError(f"Error unsupported inventory file '{inventory_file}'")
+    project = project_line.rstrip()[11:].decode()
+    version = version_line.rstrip()[11:].decode()
+    try:
+        content = zlib.decompress(compressed).decode()
+    except (zlib.error, UnicodeDecodeError) as e:
+        raise RuntimeError(f"Error invalid inventory file '{inventory_file}': {e}")
+
+    entries = {}
+    for line in content.splitlines():
+        match = _INVENTORY_LINE.match(line.rstrip())
+        if not match:
+            continue
+        name, objtype, _, uri, dispname = match.groups()
+        if ':' not in objtype:
+            continue
+        if objtype == 'py:module' and (objtype, name) in entries:
+            # Old Sphinx versions wrote modules twice, the first entry is correct.
+            continue
+        if uri.endswith('$'):
+            uri = uri[:-1] + name
+        entries[(objtype, name)] = (uri, dispname)
+    return project, version, entries
+
+
+def write_inventory_map(inventory_file, map_file=None):
+    """
+    Write the lookup map of an objects.inv file.
+
+    :param str inventory_file: path of the objects.inv file
+    :param str map_file: path of the map, by default the inventory path plus '.map'
+    :return: the path of the map
+    """
+    map_file = map_file or inventory_file + INVENTORY_MAP_SUFFIX
+    project, version, entries = read_objects_inv(inventory_file)
+
+    table = []
+    blob = bytearray()
+    for (objtype, name), (uri, dispname) in entries.items():
+        record = '\0'.join((objtype, name, uri, dispname)).encode()
+        table.append((_hash_key(objtype, name), len(blob), len(record)))
+        blob += record
+    table.sort()
+    metadata = json.dumps({
+        'project': project,
+        'version': version,
+        'objtypes': sorted({objtype for objtype, _ in entries}),
+    }).encode()
+
+    with open(map_file + '.tmp', 'wb') as f:
+        f.write(_HEADER.pack(
+            INVENTORY_MAP_MAGIC, INVENTORY_MAP_VERSION, len(table), len(metadata)))
+        f.write(metadata)
+        for entry in table:
+            f.write(_TABLE_ENTRY.pack(*entry))
+        f.write(blob)
+    os.replace(map_file + '.tmp', map_file)
+    return map_file
+
+
+class InventoryMap:
+    """
+    Read only view of a map written by write_inventory_map().
+
+    The file is memory mapped when the first lookup is made.
+    """
+
+    def __init__(self, map_file):
+        """Create the view, without opening the map yet."""
+        self.map_file = map_file
+        self._mmap = None
+        self.project = None
+        self.version = None
+        self.objtypes = frozenset()
+        self._count = 0
+        self._table_offset = 0
+        self._blob_offset = 0
+
+    def _open(self):
+        with open(self.map_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise RuntimeError(f"Error invalid inventory map '{self.map_file}'")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, metadata_size = _HEADER.unpack_from(self._mmap, 0)
+        if magic != INVENTORY_MAP_MAGIC or version != INVENTORY_MAP_VERSION:
+            self.close()
+            raise RuntimeError(f"Error unsupported inventory map '{self.map_file}'")
+        metadata = json.loads(self._mmap[_HEADER.size:_HEADER.size + metadata_size])
+        self.project = metadata['project']
+        self.version = metadata['version']
+        self.objtypes = frozenset(metadata['objtypes'])
+        self._count = count
+        self._table_offset = _HEADER.size + metadata_size
+        self._blob_offset = self._table_offset + count * _TABLE_ENTRY.size
+
+    def close(self):
+        """Unmap the file, if it was mapped."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _table_entry(self, index):
+        return _TABLE_ENTRY.unpack_from(self._mmap, self._table_offset + index * _TABLE_ENTRY.size)
+
+    def _records(self, key_hash):
+        # Binary search for the first entry with the hash, then yield all entries with it.
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._table_entry(middle)[0] < key_hash:
+                low = middle + 1
+            else:
+                high = middle
+        for index in range(low, self._count):
+            entry_hash, offset, length = self._table_entry(index)
+            if entry_hash != key_hash:
+                break
+            start = self._blob_offset + offset
+            yield self._mmap[start:start + length].decode().split('\0')
+
+    def entries(self):
+        """Yield tuples of (object type, name, uri, display name) of all the entries."""
+        if self._mmap is None:
+            self._open()
+        for index in range(self._count):
+            _, offset, length = self._table_entry(index)
+            start = self._blob_offset + offset
+            yield tuple(self._mmap[start:start + length].decode().split('\0'))
+
+    def lookup(self, objtype, name):
+        """
+        Look up an object by type and name.
+
+        :return: tuple of (uri, display name), or None if it is not in the inventory
+        """
+        if self._mmap is None:
+            self._open()
+        if objtype not in self.objtypes:
+            return None
+        case_insensitive_match = None
+        for record_type, record_name, uri, dispname in self._records(_hash_key(objtype, name)):
+            if record_type != objtype:
+                continue
+            if record_name == name:
+                return (uri, dispname)
+            if objtype in CASE_INSENSITIVE_TYPES and case_insensitive_match is None and \
+                    record_name.lower() == name.lower():
+                case_insensitive_match = (uri, dispname)
+        return case_insensitive_match
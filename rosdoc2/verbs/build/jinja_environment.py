@@ -0,0 +1,64 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Shared Jinja environment for the templates bundled with rosdoc2."""
+
+import functools
+import logging
+
+logger = logging.getLogger('rosdoc2')
+
+# Map of template name to source, for templates defined inline in rosdoc2 modules.
+_inline_templates = {}
+
+
+def register_inline_template(name, source):
+    """
+    Make an inline template available from jinja_environment() under the given name.
+
+    Templates are registered when their module is imported, before they are first rendered.
+    """
+    _inline_templates[name] = source
+
+
+def _create_bytecode_cache():
+    from jinja2 import FileSystemBytecodeCache
+    try:
+        # By default the cache is kept in a private, per user directory in the temp directory.
+        return FileSystemBytecodeCache()
+    except (OSError, RuntimeError) as e:
+        logger.debug(f'Not caching compiled Jinja templates on disk: {e}')
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def jinja_environment():
+    """
+    Return the Jinja environment used to render rosdoc2's templates.
+
+    The environment is created once per process, so that each template is compiled at most
+    once. Compiled templates are also kept in an on disk bytecode cache, shared by all of
+    the processes of a user, so that new processes can usually skip compiling them.
+
+    Templates are looked up by name, first among the inline templates and then among the
+    files bundled in rosdoc2/verbs/build/builders, like 'index.rst.jinja'.
+    """
+    from jinja2 import ChoiceLoader, DictLoader, Environment, PackageLoader
+    loader = ChoiceLoader([
+        DictLoader(_inline_templates),
+        PackageLoader('rosdoc2.verbs.build', 'builders'),
+    ])
+    # The bundled templates do not change while rosdoc2 runs, so never check them for updates.
+    return Environment(
+        loader=loader, bytecode_cache=_create_bytecode_cache(), auto_reload=False)
@@ -0,0 +1,38 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Reading the .location.json files next to the files in a cross reference directory."""
+
+import json
+import os
+
+# Map of .location.json path to a tuple of its modification time and its data.
+_location_data_cache = {}
+
+
+def read_location_data(location_json_path):
+    """
+    Return the data of a .location.json file.
+
+    The data is kept for as long as the file is not modified, so that a process building many
+    packages, like a serve worker, only reads each file again once it was changed.
+    """
+    mtime = os.stat(location_json_path).st_mtime_ns
+    cached = _location_data_cache.get(location_json_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(location_json_path, 'r') as f:
+        location_data = json.load(f)
+    _location_data_cache[location_json_path] = (mtime, location_data)
+    return location_data
@@ -0,0 +1,299 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Manifests of the files in the documentation output, used to deploy only what changed.
+
+Each package output directory gets a manifest.json listing the path, size and sha256 of
+every file. The output directory gets a rollup manifest.json with the digest of each package
+manifest, so that unchanged packages are recognized without reading their manifests.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+logger = logging.getLogger('rosdoc2')
+
+MANIFEST_FILENAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+
+def _file_sha256(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _write_json(path, data):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def read_manifest(path):
+    """Return the manifest at path, or None if it is missing or of another version."""
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable manifest '{path}': {e}")
+        return None
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def manifest_digest(files):
+    """Return a sha256 over the path, size and hash of the files of a package manifest."""
+    sha256 = hashlib.sha256()
+    for relpath, (size, file_hash, _) in sorted(files.items()):
+        sha256.update(f'{relpath}\0{size}\0{file_hash}\n'.encode())
+    return sha256.hexdigest()
+
+
+def package_manifest(package_output_directory, previous=None, known_hashes=None):
+    """
+    List the files of a package output directory.
+
+    :param dict previous: an earlier manifest of the directory, the hash of a file is reused
+        if its size and modification time are unchanged
+    :param dict known_hashes: map of relative path to the sha256 of files which were already
+        hashed, like by publish_package_output()
+    :return: the manifest, with 'files' mapping each path relative to the package output
+        directory, with '/' separators, to a list of its size, sha256 and mtime in nanoseconds
+    """
+    previous_files = previous['files'] if previous else {}
+    known_hashes = known_hashes or {}
+    files = {}
+    reused = 0
+    for root, dirs, filenames in os.walk(package_output_directory):
+        dirs.sort()
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            relpath = os.path.relpath(path, package_output_directory).replace(os.sep, '/')
+            if relpath in (MANIFEST_FILENAME, MANIFEST_FILENAME + '.tmp'):
+                continue
+            stat = os.stat(path)
+            earlier = previous_files.get(relpath)
+            if earlier is not None and earlier[0] == stat.st_size \
+                    and earlier[2] == stat.st_mtime_ns:
+                files[relpath] = earlier
+                reused += 1
+            elif relpath in known_hashes:
+                files[relpath] = [stat.st_size, known_hashes[relpath], stat.st_mtime_ns]
+            else:
+                files[relpath] = [stat.st_size, _file_sha256(path), stat.st_mtime_ns]
+    if reused:
+        logger.debug(f'Reused the hashes of {reused} of {len(files)} unchanged files')
+    return {
+        'version': MANIFEST_VERSION,
+        'package': os.path.basename(os.path.normpath(package_output_directory)),
+        'files': files,
+        'digest': manifest_digest(files),
+    }
+
+
+def write_package_manifest(package_output_directory):
+    """
+    Write the manifest.json of a package output directory.
+
+    :return: the manifest
+    """
+    path = os.path.join(package_output_directory, MANIFEST_FILENAME)
+    manifest = package_manifest(package_output_directory, read_manifest(path))
+    _write_json(path, manifest)
+    return manifest
+
+
+def _remove(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+def publish_package_output(staging_directory, package_output_directory):
+    """
+    Move the staged output of a package into its output directory, and write its manifest.
+
+    Each top level file and directory of the staging directory replaces the one of the same
+    name in the output directory. A staged file with the same size and sha256 as the
+    published file of the same path, according to the manifest of the output directory, is
+    dropped instead, so the published file keeps its modification time and its hash is not
+    computed again. Each staged file is hashed at most once.
+
+    :return: the manifest
+    """
+    manifest_path = os.path.join(package_output_directory, MANIFEST_FILENAME)
+    previous = read_manifest(manifest_path)
+    previous_files = previous['files'] if previous else {}
+    known_hashes = {}
+    kept = 0
+    os.makedirs(package_output_directory, exist_ok=True)
+    for name in sorted(os.listdir(staging_directory)):
+        source_root = os.path.join(staging_directory, name)
+        destination_root = os.path.join(package_output_directory, name)
+        if os.path.islink(source_root) or not os.path.isdir(source_root):
+            staged = [name]
+            if os.path.isdir(destination_root) and not os.path.islink(destination_root):
+                shutil.rmtree(destination_root)
+        else:
+            staged = []
+            staged_directories = {name}
+            for root, dirs, files in os.walk(source_root):
+                relroot = os.path.relpath(root, staging_directory)
+                staged_directories.update(os.path.join(relroot, d) for d in dirs)
+                staged.extend(os.path.join(relroot, f) for f in files)
+            if not os.path.isdir(destination_root) or os.path.islink(destination_root):
+                _remove(destination_root)
+            # Remove what is not staged, like the files of a directory that was replaced.
+            for root, dirs, files in os.walk(destination_root, topdown=False):
+                relroot = os.path.relpath(root, package_output_directory)
+                for entry in files + dirs:
+                    relpath = os.path.join(relroot, entry)
+                    if relpath not in staged_directories and relpath not in staged:
+                        _remove(os.path.join(package_output_directory, relpath))
+                    elif relpath in staged_directories and \
+                            not os.path.isdir(os.path.join(package_output_directory, relpath)):
+                        _remove(os.path.join(package_output_directory, relpath))
+            for directory in sorted(staged_directories):
+                path = os.path.join(package_output_directory, directory)
+                if os.path.lexists(path) and not os.path.isdir(path):
+                    _remove(path)
+                os.makedirs(path, exist_ok=True)
+
+        for relpath in staged:
+            source = os.path.join(staging_directory, relpath)
+            destination = os.path.join(package_output_directory, relpath)
+            key = relpath.replace(os.sep, '/')
+            earlier = previous_files.get(key)
+            if earlier is not None and not os.path.islink(source) \
+                    and os.path.isfile(destination) and not os.path.islink(destination):
+                stat = os.stat(destination)
+                # The published file must still be the one in the manifest.
+                if [stat.st_size, stat.st_mtime_ns] == [earlier[0], earlier[2]] \
+                        and os.path.getsize(source) == earlier[0]:
+                    known_hashes[key] = _file_sha256(source)
+                    if known_hashes[key] == earlier[1]:
+                        os.remove(source)
+                        kept += 1
+                        continue
+            if os.path.isdir(destination) and not os.path.islink(destination):
+                shutil.rmtree(destination)
+            shutil.move(source, destination)
+        _remove(source_root)
+    if kept:
+        logger.info(f'Kept {kept} unchanged files of the published documentation')
+    manifest = package_manifest(package_output_directory, previous, known_hashes)
+    _write_json(manifest_path, manifest)
+    return manifest
+
+
+def update_rollup(output_directory, package_names):
+    """
+    Update the rollup manifest.json of an output directory.
+
+    The entries of the given packages are replaced from their package manifests, the entries
+    of packages whose output directory was removed are dropped, and the others are kept.
+
+    :return: the rollup manifest, with 'packages' mapping each package name to its number
+        of 'files', their 'bytes' and the 'digest' of its manifest
+    """
+    path = os.path.join(output_directory, MANIFEST_FILENAME)
+    rollup = read_manifest(path) or {'version': MANIFEST_VERSION, 'packages': {}}
+    packages = rollup['packages']
+    for name in package_names:
+        manifest = read_manifest(os.path.join(output_directory, name, MANIFEST_FILENAME))
+        if manifest is None:
+            packages.pop(name, None)
+            continue
+        packages[name] = {
+            'files': len(manifest['files']),
+            'bytes': sum(entry[0] for entry in manifest['files'].values()),
+            'digest': manifest['digest'],
+        }
+    for name in list(packages):
+        if not os.path.isdir(os.path.join(output_directory, name)):
+            del packages[name]
+    os.makedirs(output_directory, exist_ok=True)
+    _write_json(path, rollup)
+    return rollup
+
+
+def load_output_manifests(output_directory):
+    """
+    Return the rollup and a loader of the package manifests of an output directory.
+
+    Package directories missing from the rollup, or without a manifest, are listed and hashed,
+    without writing anything to the output directory.
+
+    :return: tuple of (map of package name to manifest digest, function taking a package name
+        and returning its manifest)
+    """
+    rollup = read_manifest(os.path.join(output_directory, MANIFEST_FILENAME))
+    digests = {
+        name: entry['digest'] for name, entry in (rollup or {'packages': {}})['packages'].items()
+        if os.path.isdir(os.path.join(output_directory, name))
+    }
+    if os.path.isdir(output_directory):
+        for name in os.listdir(output_directory):
+            if name not in digests and os.path.isdir(os.path.join(output_directory, name)):
+                digests[name] = None
+
+    def load(name):
+        package_directory = os.path.join(output_directory, name)
+        manifest = read_manifest(os.path.join(package_directory, MANIFEST_FILENAME))
+        if manifest is None:
+            manifest = package_manifest(package_directory)
+        return manifest
+
+    return digests, load
+
+
+def diff_output_directories(old_directory, new_directory):
+    """
+    Compare the files of two output directories by their manifests.
+
+    Packages with the same manifest digest in both rollups are skipped without reading their
+    package manifests.
+
+    :return: dict of 'added', 'removed' and 'changed' sorted lists of paths relative to the
+        output directories
+    """
+    old_digests, load_old = load_output_manifests(old_directory)
+    new_digests, load_new = load_output_manifests(new_directory)
+    result = {'added': [], 'removed': [], 'changed': []}
+    for name in sorted(set(old_digests) | set(new_digests)):
+        old_digest = old_digests.get(name)
+        new_digest = new_digests.get(name)
+        if old_digest is not None and old_digest == new_digest:
+            continue
+        old_files = load_old(name)['files'] if name in old_digests else {}
+        new_files = load_new(name)['files'] if name in new_digests else {}
+        for relpath in sorted(set(old_files) | set(new_files)):
+            path = f'{name}/{relpath}'
+            if relpath not in old_files:
+                result['added'].append(path)
+            elif relpath not in new_files:
+                result['removed'].append(path)
+            elif old_files[relpath][:2] != new_files[relpath][:2]:
+                result['changed'].append(path)
+    return result
@@ -0,0 +1,94 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measurements of the build of a package, kept with its doc build directory."""
+
+import json
+import logging
+import os
+
+logger = logging.getLogger('rosdoc2')
+
+METRICS_FILENAME = 'metrics.json'
+# Number of the largest output directories listed by summarize_output().
+LARGEST_SUBTREES = 10
+
+
+def metrics_path(tool_options, package_name):
+    """Return the path of the metrics file of a package."""
+    return os.path.join(tool_options.doc_build_directory, package_name, METRICS_FILENAME)
+
+
+def read_metrics(tool_options, package_name):
+    """Return the metrics recorded for a package, or an empty dict if there are none."""
+    path = metrics_path(tool_options, package_name)
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable metrics file '{path}': {e}")
+        return {}
+
+
+def record_metrics(tool_options, package_name, section, values):
+    """
+    Record a section of metrics of a package, replacing an earlier section of the same name.
+
+    If tool_options has a metrics_callback, as set by scan, it is called with the section
+    and values too.
+
+    :param str section: name of the section, like 'doxygen_xml'
+    :param dict values: JSON serializable metrics
+    """
+    metrics = read_metrics(tool_options, package_name)
+    metrics[section] = values
+    path = metrics_path(tool_options, package_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(metrics, f, indent=2, sort_keys=True)
+    callback = getattr(tool_options, 'metrics_callback', None)
+    if callback is not None:
+        callback(section, values)
+
+
+def summarize_output(builder_outputs, largest=LARGEST_SUBTREES):
+    """
+    Summarize the output of the builders of a package.
+
+    :param dict builder_outputs: map of builder name to a tuple of its output directory and
+        the accounting returned by Builder.move_files()
+    :param int largest: number of the largest subtrees to list
+    :return: dict with the total 'files' and 'bytes', the 'builders' with the files and
+        bytes of each, and the 'largest_subtrees' of the package output
+    """
+    builders = {}
+    subtrees = {}
+    for name, (output_dir, moved) in builder_outputs.items():
+        builders[name] = {
+            'output_dir': output_dir, 'files': moved['files'], 'bytes': moved['bytes']}
+        for subtree, size in moved['subtrees'].items():
+            path = '/'.join(part for part in (output_dir, subtree) if part)
+            subtrees[path] = subtrees.get(path, 0) + size
+    return {
+        'files': sum(b['files'] for b in builders.values()),
+        'bytes': sum(b['bytes'] for b in builders.values()),
+        'builders': builders,
+        'largest_subtrees': [
+            {'path': path, 'bytes': size}
+            for path, size in sorted(subtrees.items(), key=lambda item: (-item[1], item[0]))
+            [:largest]
+        ],
+    }
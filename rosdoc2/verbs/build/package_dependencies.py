@@ -0,0 +1,21 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+def package_dependencies(package):
+    """Return the names of the packages that the documentation of package may refer to."""
+    depends = [
+        *package.build_depends, *package.build_export_depends, *package.exec_depends,
+        *package.doc_depends]
+    return {d.name for d in depends if d.evaluated_condition is not False}
@@ -16,7 +16,8 @@ import logging
 import os
 
 from catkin_pkg.package import Url
-import rosdistro
+
+from .rosdistro_cache import get_distribution_file
 
 logger = logging.getLogger('rosdoc2')
 
@@ -34,8 +35,7 @@ def package_repo_url(package):
         logger.info('Not searching for package repository url because ROS_DISTRO is not set')
         return
     try:
-        index = rosdistro.get_index(rosdistro.get_index_url())
-        dist_file = rosdistro.get_distribution_file(index, distro)
+        dist_file = get_distribution_file(distro)
         rosdistro_package = dist_file.release_packages[package.name]
         repo_name = rosdistro_package.repository_name
         repo = dist_file.repositories[repo_name]
@@ -0,0 +1,202 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import namedtuple
+import logging
+import os
+import time
+
+from .find_include_directory import is_excluded_directory
+
+logger = logging.getLogger('rosdoc2')
+
+# Marker files which tell colcon, ament and catkin to ignore a directory.
+IGNORE_MARKERS = ('AMENT_IGNORE', 'CATKIN_IGNORE', 'COLCON_IGNORE')
+
+# Version control directories are never of interest to rosdoc2.
+SKIPPED_DIRECTORY_NAMES = ('.git', '.hg', '.svn')
+
+SurveyEntry = namedtuple('SurveyEntry', ['size', 'mtime'])
+
+
+class PackageSurvey:
+    """
+    In-memory inventory of the files in a package directory.
+
+    The package directory is walked once, and the result is shared by everything in rosdoc2
+    that needs to search the package, instead of each of them walking the tree again.
+
+    Paths are relative to the package directory, using os.sep, with '.' as the root.
+
+    Like os.walk(), symbolic links to directories are not followed. Hidden, test and vendored
+    directories, and the subdirectories of directories with an ignore marker, are not
+    surveyed either, as nothing in rosdoc2 searches them. Asking for such a directory, or a
+    path in it, explicitly falls back to the file system.
+    """
+
+    def __init__(self, package_directory, *, excluded_paths=()):
+        """
+        Survey the given package directory.
+
+        :param str package_directory: the directory containing the package.xml
+        :param list[str] excluded_paths: directories which are not surveyed, for example
+            a build directory which happens to be inside of the package directory
+        """
+        self.package_directory = package_directory
+        # Map of relative directory path to a tuple of (directory names, file names).
+        self.directories = {}
+        # Map of relative file path to a SurveyEntry.
+        self.files = {}
+        # Relative paths of directories which contain an ignore marker.
+        self.ignored_directories = set()
+        # Relative paths of directories which were not descended into.
+        self.pruned_directories = set()
+
+        start = time.time()
+        self._survey({os.path.realpath(p) for p in excluded_paths})
+        logger.debug(
+            f'Surveyed {len(self.files)} files in {len(self.directories)} directories of '
+            f"'{package_directory}' in {time.time() - start:.3f} seconds")
+
+    def _survey(self, excluded_real_paths):
+        pending = ['.']
+        while pending:
+            relpath = pending.pop()
+            path = os.path.normpath(os.path.join(self.package_directory, relpath))
+            dirs = []
+            subdirectories = []
+            files = []
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                            is_linked_dir = is_dir and entry.is_symlink()
+                        except OSError:
+                            continue
+                        entry_relpath = os.path.normpath(os.path.join(relpath, entry.name))
+                        if is_dir:
+                            if entry.name in SKIPPED_DIRECTORY_NAMES:
+                                continue
+                            if os.path.realpath(entry.path) in excluded_real_paths:
+                                continue
+                            if is_excluded_directory(entry.name):
+                                self.pruned_directories.add(entry_relpath)
+                                continue
+                            dirs.append(entry.name)
+                            if is_linked_dir:
+                                self.pruned_directories.add(entry_relpath)
+                            else:
+                                subdirectories.append(entry_relpath)
+                        else:
+                            try:
+                                stat = entry.stat()
+                            except OSError:
+                                # Most likely a dangling symbolic link.
+                                continue
+                            files.append(entry.name)
+                            self.files[entry_relpath] = SurveyEntry(stat.st_size, stat.st_mtime)
+            except OSError as e:
+                logger.debug(f"Unable to survey directory '{path}': {e}")
+            dirs.sort()
+            files.sort()
+            self.directories[relpath] = (dirs, files)
+            if any(marker in files for marker in IGNORE_MARKERS):
+                self.ignored_directories.add(relpath)
+                # The package itself is always surveyed, even if it is ignored by colcon.
+                if relpath != '.':
+                    self.pruned_directories.update(subdirectories)
+                    continue
+            pending.extend(subdirectories)
+
+    def abspath(self, relpath):
+        """Return the path of relpath, joined to the package directory."""
+        return os.path.normpath(os.path.join(self.package_directory, relpath))
+
+    def _is_outside(self, relpath):
+        # Paths outside of the package directory, or in a directory which was not descended
+        # into, are not surveyed, use the file system instead.
+        if os.path.isabs(relpath) or relpath == '..' or relpath.startswith('..' + os.sep):
+            return True
+        while relpath != '.':
+            if relpath in self.pruned_directories:
+                return True
+            relpath = os.path.dirname(relpath) or '.'
+        return False
+
+    def isdir(self, relpath):
+        """Return True if relpath is a surveyed directory."""
+        relpath = os.path.normpath(relpath)
+        if self._is_outside(relpath):
+            return os.path.isdir(self.abspath(relpath))
+        return relpath in self.directories
+
+    def isfile(self, relpath):
+        """Return True if relpath is a surveyed file."""
+        relpath = os.path.normpath(relpath)
+        if self._is_outside(relpath):
+            return os.path.isfile(self.abspath(relpath))
+        return relpath in self.files
+
+    def listdir(self, relpath='.'):
+        """Return a tuple of (directory names, file names) in relpath, empty if not a directory."""
+        relpath = os.path.normpath(relpath)
+        if self._is_outside(relpath):
+            for _, dirs, files in os.walk(self.abspath(relpath)):
+                return (sorted(dirs), sorted(files))
+            return ([], [])
+        dirs, files = self.directories.get(relpath, ([], []))
+        return (list(dirs), list(files))
+
+    def is_ignored(self, relpath):
+        """Return True if relpath, or any directory containing it, has an ignore marker."""
+        relpath = os.path.normpath(relpath)
+        while True:
+            if relpath in self.ignored_directories:
+                return True
+            if relpath == '.':
+                return False
+            relpath = os.path.dirname(relpath) or '.'
+
+    def walk(self, relpath='.'):
+        """
+        Walk the surveyed tree below relpath, like a top down walk of the file system.
+
+        Yields tuples of (root, dirs, files), where root is joined to the package directory.
+        Like os.walk(), directories removed from dirs in place are not descended into.
+        """
+        relpath = os.path.normpath(relpath)
+        if self._is_outside(relpath):
+            yield from os.walk(self.abspath(relpath))
+            return
+        if relpath not in self.directories:
+            return
+        pending = [relpath]
+        while pending:
+            current = pending.pop(0)
+            dirs, files = self.listdir(current)
+            yield (self.abspath(current), dirs, files)
+            pending[0:0] = [
+                os.path.normpath(os.path.join(current, d)) for d in dirs
+                if os.path.normpath(os.path.join(current, d)) in self.directories
+            ]
+
+    def files_with_extensions(self, extensions, relpath='.'):
+        """Return the sorted relative paths of files below relpath with one of the extensions."""
+        relpath = os.path.normpath(relpath)
+        prefix = '' if relpath == '.' else relpath + os.sep
+        extensions = tuple(extensions)
+        return sorted(
+            path for path in self.files
+            if path.startswith(prefix) and os.path.splitext(path)[1].lower() in extensions)
@@ -0,0 +1,101 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Reduce a Doxygen tag file to what other packages can link to."""
+
+import os
+from xml.etree import ElementTree
+from xml.sax.saxutils import quoteattr
+
+PRUNED_TAG_FILE_SUFFIX = '.pruned'
+# Compounds which other packages may refer to. Files are only kept for their members, pages,
+# directories and examples are never linked from the API documentation of other packages.
+API_COMPOUND_KINDS = frozenset((
+    'class', 'concept', 'exception', 'interface', 'namespace', 'protocol', 'category',
+    'service', 'singleton', 'struct', 'union',
+))
+# Children of file compounds which are listed as compounds of their own.
+_FILE_INDEX_TAGS = frozenset(('class', 'concept', 'namespace', 'includes', 'path', 'docanchor'))
+
+
+def _prune_compound(compound):
+    """Prune a compound element in place, and return True if it should be kept."""
+    kind = compound.get('kind')
+    name = compound.findtext('name', '')
+    # Anonymous namespaces, structs and unions can not be referred to.
+    if '@' in name or 'anonymous_namespace' in name:
+        return False
+    for member in compound.findall('member'):
+        if member.get('protection') == 'private':
+            compound.remove(member)
+    if kind in API_COMPOUND_KINDS:
+        return True
+    if kind == 'file':
+        # Files are needed for their functions, macros, typedefs and variables, which are not
+        # in a namespace.
+        for child in list(compound):
+            if child.tag in _FILE_INDEX_TAGS:
+                compound.remove(child)
+        return compound.find('member') is not None
+    return False
+
+
+def prune_tag_file(tag_file, pruned_tag_file=None):
+    """
+    Write a copy of a tag file with only the public API compounds and members.
+
+    The tag file is streamed, so that large tag files are not loaded into memory at once.
+
+    :param str tag_file: path of the tag file generated by Doxygen
+    :param str pruned_tag_file: path to write to, by default the tag file plus '.pruned'
+    :return: tuple of (compounds kept, compounds in the tag file)
+    :raises RuntimeError: if the tag file can not be parsed
+    """
+    pruned_tag_file = pruned_tag_file or tag_file + PRUNED_TAG_FILE_SUFFIX
+    kept = total = 0
+    depth = 0
+    root = None
+    try:
+        with open(pruned_tag_file + '.tmp', 'w', encoding='utf-8') as f:
+            for event, element in ElementTree.iterparse(tag_file, events=('start', 'end')):
+                if event == 'start':
+                    if depth == 0:
+                        root = element
+                        attributes = ''.join(
+                            f' {key}={quoteattr(value)}'
+                            for key, value in element.items())
+                        f.write(
+                            "<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>\n"
+                            f'<{element.tag}{attributes}>\n')
+                    depth += 1
+                    continue
+                depth -= 1
+                if depth != 1:
+                    continue
+                if element.tag == 'compound':
+                    total += 1
+                    if _prune_compound(element):
+                        kept += 1
+                        element.tail = '\n'
+                        f.write(ElementTree.tostring(element, encoding='unicode'))
+                # Top level elements are done with, free them.
+                root.clear()
+            if root is not None:
+                f.write(f'</{root.tag}>\n')
+    except (ElementTree.ParseError, OSError) as e:
+        if os.path.exists(pruned_tag_file + '.tmp'):
+            os.remove(pruned_tag_file + '.tmp')
+        raise RuntimeError(f"Error unable to prune tag file '{tag_file}': {e}")
+    os.replace(pruned_tag_file + '.tmp', pruned_tag_file)
+    return kept, total
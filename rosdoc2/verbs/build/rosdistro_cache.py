@@ -0,0 +1,30 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The rosdistro distribution files, fetched once per process."""
+
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def get_distribution_file(ros_distro):
+    """
+    Return the rosdistro distribution file of a ROS distribution.
+
+    The index and the distribution file are fetched the first time a distribution is asked
+    for, later calls in the same process, like the builds of a serve worker, reuse it.
+    """
+    import rosdistro
+    index = rosdistro.get_index(rosdistro.get_index_url())
+    return rosdistro.get_distribution_file(index, ros_distro)
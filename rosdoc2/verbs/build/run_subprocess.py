@@ -0,0 +1,108 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Run the external tools of a build, without leaving processes behind."""
+
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+
+logger = logging.getLogger('rosdoc2')
+
+# Seconds a process group has to exit after SIGTERM, before it is sent SIGKILL.
+TERMINATE_GRACE_PERIOD = 5.0
+
+
+class SubprocessTimeout(RuntimeError):
+    """A build phase run by run_subprocess() exceeded its timeout."""
+
+    def __init__(self, phase, timeout, elapsed):
+        """
+        Create the error.
+
+        :param str phase: name of the build phase, like 'Doxygen'
+        :param float timeout: the timeout of the phase in seconds
+        :param float elapsed: seconds the phase ran for before it was stopped
+        """
+        super().__init__(
+            f'{phase} timed out after {elapsed:.3f} seconds (timeout {timeout} seconds)')
+        self.phase = phase
+        self.timeout = timeout
+        self.elapsed = elapsed
+
+
+def _signal_process_group(process, sig):
+    try:
+        if os.name == 'posix':
+            os.killpg(process.pid, sig)
+        elif sig == signal.SIGTERM:
+            process.terminate()
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        # The process, and every process in its group, has already exited.
+        pass
+
+
+def terminate_process_group(process, grace_period=TERMINATE_GRACE_PERIOD):
+    """
+    Stop a process started by run_subprocess(), and all of the processes it started.
+
+    The process group is sent SIGTERM, and SIGKILL if it is still running after the grace
+    period.
+    """
+    _signal_process_group(process, signal.SIGTERM)
+    try:
+        process.wait(timeout=grace_period)
+    except subprocess.TimeoutExpired:
+        logger.warning(f"Killing '{process.args[0]}', which did not exit after SIGTERM")
+    # Children may outlive the process itself, so always kill what is left of the group.
+    _signal_process_group(process, signal.SIGKILL)
+    process.wait()
+
+
+def run_subprocess(cmd, *, cwd, phase, timeout=None):
+    """
+    Run a command in its own process group, with its output going to sys.stdout and sys.stderr.
+
+    If the command exceeds the timeout, or the build is interrupted while it runs, its whole
+    process group is terminated, so that no orphaned processes keep running.
+
+    :param list[str] cmd: the command to run
+    :param str cwd: directory to run the command in
+    :param str phase: name of the build phase, used in messages
+    :param float timeout: seconds the command may run for, or None for no limit
+    :return: the return code of the command
+    :raises SubprocessTimeout: if the command exceeded the timeout
+    """
+    kwargs = {}
+    if os.name == 'posix':
+        kwargs['start_new_session'] = True
+    start = time.time()
+    process = subprocess.Popen(cmd, cwd=cwd, stdout=sys.stdout, stderr=sys.stderr, **kwargs)
+    try:
+        returncode = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        terminate_process_group(process)
+        raise SubprocessTimeout(phase, timeout, time.time() - start)
+    except BaseException:  # noqa: B902
+        # Most likely the scan watchdog or a signal, clean up before passing it on.
+        logger.warning(f'Stopping {phase} after {time.time() - start:.3f} seconds')
+        terminate_process_group(process)
+        raise
+    logger.info(f'{phase} finished in {time.time() - start:.3f} seconds')
+    return returncode
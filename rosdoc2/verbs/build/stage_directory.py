@@ -0,0 +1,100 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Stage package source directories into the wrapped Sphinx directory."""
+
+import logging
+import os
+import shutil
+
+logger = logging.getLogger('rosdoc2')
+
+STAGING_MODES = ('copy', 'hardlink', 'symlink')
+DEFAULT_STAGING_MODE = 'copy'
+
+
+def stage_directory(source, destination, mode=DEFAULT_STAGING_MODE):
+    """
+    Mirror the directory tree at source into destination.
+
+    In 'copy' mode every file is copied. In 'hardlink' mode each file is hard linked,
+    falling back to a copy if the destination is on a different file system. In 'symlink'
+    mode each file is replaced by a symbolic link to the original. Directories are always
+    created for real, so that rosdoc2 can add generated files next to the staged ones, and
+    symbolic links to directories are followed, except those which would form a cycle.
+
+    Files that rosdoc2 needs to modify must first be passed to unstage_file().
+
+    :param str source: directory to stage
+    :param str destination: directory to stage into, created if needed
+    :param str mode: one of STAGING_MODES
+    """
+    if mode not in STAGING_MODES:
+        raise RuntimeError(
+            f"Error unknown staging mode '{mode}', supported modes: [{', '.join(STAGING_MODES)}]")
+    if mode == 'copy':
+        shutil.copytree(source, destination, dirs_exist_ok=True)
+        return
+
+    number_of_files_linked = 0
+    number_of_files_copied = 0
+    # Symbolic links to directories are followed, like copytree() does.
+    for root, dirs, files in os.walk(source, followlinks=True):
+        destination_root = os.path.join(destination, os.path.relpath(root, start=source))
+        os.makedirs(destination_root, exist_ok=True)
+        real_root = os.path.realpath(root)
+        for directory in list(dirs):
+            real_directory = os.path.realpath(os.path.join(root, directory))
+            if real_root == real_directory or real_root.startswith(real_directory + os.sep):
+                logger.warning(
+                    f"Not staging '{os.path.join(root, directory)}', "
+                    'it links to a directory which contains it')
+                dirs.remove(directory)
+        for file in files:
+            source_file = os.path.abspath(os.path.join(root, file))
+            destination_file = os.path.join(destination_root, file)
+            if os.path.lexists(destination_file):
+                os.unlink(destination_file)
+            if mode == 'symlink':
+                os.symlink(source_file, destination_file)
+                number_of_files_linked += 1
+                continue
+            try:
+                os.link(source_file, destination_file, follow_symlinks=True)
+                number_of_files_linked += 1
+            except OSError:
+                # Hard links cannot cross file systems, and are not supported everywhere.
+                shutil.copy2(source_file, destination_file)
+                number_of_files_copied += 1
+    logger.info(
+        f"Staged '{source}' into '{destination}' using {mode} mode: "
+        f'{number_of_files_linked} linked, {number_of_files_copied} copied.')
+
+
+def unstage_file(path):
+    """
+    Make sure that path is a private file, which is safe to modify or overwrite.
+
+    Staged links share their content with the package source tree, so writing through them
+    would modify the user's files. Links are replaced by a copy of their content.
+    """
+    if not os.path.lexists(path):
+        return
+    is_link = os.path.islink(path)
+    if not is_link and (not os.path.isfile(path) or os.stat(path).st_nlink < 2):
+        return
+    private_copy = path + '.rosdoc2_unstage'
+    shutil.copyfile(path, private_copy)
+    os.unlink(path)
+    os.rename(private_copy, path)
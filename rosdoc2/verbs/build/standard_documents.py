@@ -15,6 +15,8 @@
 import os
 import shutil
 
+from .stage_directory import unstage_file
+
 
 STANDARD_DOCUMENT_NAMES = [
     'authors',
@@ -44,14 +46,12 @@ README
 """
 
 
-def locate_standard_documents(package_xml_directory):
-    """Locate standard documents."""
+def locate_standard_documents(package_survey):
+    """Locate standard documents in the root of a surveyed package directory."""
     found_paths = {}
-    package_directory_items = os.scandir(package_xml_directory)
-    for item in package_directory_items:
-        if not item.is_file():
-            continue
-        (basename, ext) = os.path.splitext(item.name)
+    _, filenames = package_survey.listdir('.')
+    for filename in filenames:
+        (basename, ext) = os.path.splitext(filename)
         for name in STANDARD_DOCUMENT_NAMES:
             if name in found_paths:
                 continue
@@ -62,14 +62,14 @@ def locate_standard_documents(package_xml_directory):
                 elif ext.lower() == '.rst':
                     filetype = 'rst'
                 elif ext.lower() == '.xml':
-                    if item.name != 'package.xml':
+                    if filename != 'package.xml':
                         continue
                     filetype = 'xml'
                 else:
                     filetype = 'other'
                 found_paths[name] = {
-                    'path': item.path,
-                    'filename': item.name,
+                    'path': package_survey.abspath(filename),
+                    'filename': filename,
                     'type': filetype
                 }
     return found_paths
@@ -80,6 +80,7 @@ def generate_standard_document_files(standard_docs, wrapped_sphinx_directory):
     standards_toc = ''
     for key, standard_doc in standard_docs.items():
         # Copy the original document to the sphinx project
+        unstage_file(os.path.join(wrapped_sphinx_directory, standard_doc['filename']))
         shutil.copy(standard_doc['path'], wrapped_sphinx_directory)
         # generate the file according to type
         file_contents = f'{key.upper()}\n'
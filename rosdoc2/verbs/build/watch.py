@@ -0,0 +1,183 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Rebuild the documentation of a package whenever its files change."""
+
+import json
+import logging
+import os
+import time
+
+from rosdoc2.slugify import slugify
+
+from .manifest import package_manifest
+from .package_survey import PackageSurvey
+
+logger = logging.getLogger('rosdoc2')
+
+# Seconds between checks of the package directory for changes.
+WATCH_POLL_INTERVAL = 0.5
+# Seconds without further changes before a rebuild starts, so that saving many files at once
+# causes one rebuild.
+WATCH_DEBOUNCE = 1.0
+
+# Files read by Doxygen, changing them requires running Doxygen again.
+DOXYGEN_EXTENSIONS = frozenset((
+    '.c', '.cc', '.cpp', '.cxx', '.c++', '.h', '.hh', '.hpp', '.hxx', '.h++', '.inl', '.ipp',
+    '.dox',
+))
+# Files which may change the settings or builders of the package, so everything is rebuilt.
+SETTINGS_FILES = frozenset(('package.xml', 'rosdoc2.yaml'))
+
+# Builders whose output is kept in watch mode, to reuse it when their inputs did not change.
+WATCH_REUSABLE_BUILDER_TYPES = frozenset(('doxygen',))
+
+# The phases of a rebuild, Sphinx is always run.
+PHASE_DOXYGEN = 'doxygen'
+PHASE_SPHINX = 'sphinx'
+
+
+def classify_changes(relpaths):
+    """
+    Return the build phases which have to run again for changed files.
+
+    :param relpaths: paths of the added, modified or removed files, relative to the package
+    :return: set of PHASE_DOXYGEN and PHASE_SPHINX
+    """
+    phases = {PHASE_SPHINX}
+    for relpath in relpaths:
+        name = os.path.basename(relpath)
+        extension = os.path.splitext(name)[1].lower()
+        if name in SETTINGS_FILES or name.startswith('Doxyfile') or \
+                extension in DOXYGEN_EXTENSIONS:
+            phases.add(PHASE_DOXYGEN)
+    return phases
+
+
+def watch_state_directory(doc_build_directory, package_name, builder_name):
+    """
+    Return the directory where a builder keeps its state between builds in watch mode.
+
+    It is outside of the package doc build directory, which is removed by every build.
+    """
+    return os.path.join(doc_build_directory, f'{package_name}.watch', slugify(builder_name))
+
+
+def keep_unchanged_mtimes(directory, state_path):
+    """
+    Give the files of a regenerated directory the modification time of their previous build.
+
+    Sphinx reads a document again if it is newer than when it was last read, so generated
+    documents which did not change must keep their earlier modification time. Linked files
+    share the modification time of the package source tree, so they are left alone.
+
+    :param str directory: the directory, which is generated again by every build
+    :param str state_path: the file listing the files of the previous build
+    :return: the number of files which kept their modification time
+    """
+    previous = {}
+    if os.path.isfile(state_path):
+        with open(state_path, 'r') as f:
+            previous = json.load(f)
+    files = package_manifest(directory)['files']
+    kept = 0
+    for relpath, (size, sha256, mtime) in files.items():
+        earlier = previous.get(relpath)
+        if earlier is None or earlier[:2] != [size, sha256] or earlier[2] == mtime:
+            continue
+        path = os.path.join(directory, *relpath.split('/'))
+        if os.path.islink(path) or os.stat(path).st_nlink > 1:
+            continue
+        os.utime(path, ns=(earlier[2], earlier[2]))
+        files[relpath] = earlier
+        kept += 1
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    with open(state_path, 'w') as f:
+        json.dump(files, f)
+    return kept
+
+
+def _snapshot(package_directory, excluded_paths):
+    # Python bytecode is written when Sphinx imports the package, it must not cause a rebuild.
+    return {
+        relpath: entry
+        for relpath, entry in
+        PackageSurvey(package_directory, excluded_paths=excluded_paths).files.items()
+        if '__pycache__' not in relpath.split(os.sep) and not relpath.endswith('.pyc')
+    }
+
+
+def changed_files(before, after):
+    """Return the sorted relative paths which differ between two snapshots of a package."""
+    return sorted(
+        relpath for relpath in set(before) | set(after)
+        if before.get(relpath) != after.get(relpath))
+
+
+def wait_for_changes(package_directory, excluded_paths, snapshot,
+                     poll_interval=WATCH_POLL_INTERVAL, debounce=WATCH_DEBOUNCE):
+    """
+    Poll a package directory until its files changed and then stayed unchanged for a while.
+
+    :param dict snapshot: the files of the package when it was last built
+    :return: tuple of (the changed relative paths, the new snapshot)
+    """
+    while True:
+        time.sleep(poll_interval)
+        current = _snapshot(package_directory, excluded_paths)
+        if current == snapshot:
+            continue
+        # Wait for the changes to settle.
+        while True:
+            time.sleep(debounce)
+            settled = _snapshot(package_directory, excluded_paths)
+            if settled == current:
+                break
+            current = settled
+        return changed_files(snapshot, current), current
+
+
+def watch(options, package_directory, build):
+    """
+    Build a package, and build it again whenever its files change, until interrupted.
+
+    After the first build, Doxygen is only run again if a file which Doxygen reads changed,
+    otherwise its previous output is reused. Sphinx keeps its environment between builds, so
+    that it only reads the documents which changed.
+
+    :param build: function taking the set of builder types whose previous output should be
+        reused
+    """
+    excluded_paths = [
+        options.doc_build_directory, options.output_directory, options.cross_reference_directory]
+    snapshot = _snapshot(package_directory, excluded_paths)
+    reuse = frozenset()
+    try:
+        while True:
+            start = time.time()
+            try:
+                build(reuse)
+                logger.info(f'Build finished in {time.time() - start:.3f} seconds')
+            except RuntimeError as e:
+                logger.error(f'Build failed: {e}')
+            logger.info(f"Watching '{package_directory}' for changes, press Ctrl-C to stop")
+            changes, snapshot = wait_for_changes(package_directory, excluded_paths, snapshot)
+            phases = classify_changes(changes)
+            logger.info(
+                f'{len(changes)} files changed ({", ".join(changes[:5])}'
+                f'{", ..." if len(changes) > 5 else ""}), running {", ".join(sorted(phases))}')
+            reuse = frozenset() if PHASE_DOXYGEN in phases else WATCH_REUSABLE_BUILDER_TYPES
+    except KeyboardInterrupt:
+        logger.info('Stopped watching')
+    return 0
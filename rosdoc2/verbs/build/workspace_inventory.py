@@ -0,0 +1,273 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Merged inventory of the Sphinx objects of all packages in a cross reference directory.
+
+The inventory is built from the lookup maps of the objects.inv files in the cross reference
+directory: before a package is built, the packages whose map is new or changed replace their
+entries, and packages which are gone are removed. Objects are keyed by their type, like
+'py:class', and name, so a reference is resolved with one indexed lookup, instead of
+searching the inventory of every package. When several packages define the same object, the
+dependencies of the package being built win, and then the package whose name sorts first.
+
+The inventory is a SQLite database in WAL mode, so that the workers of a scan can update it
+at the same time and builds can read it while it is updated. WAL mode needs memory shared by
+all the processes using the database, so it lives in the doc build directory, which must be
+on a local file system and must not be shared between machines. The cross reference
+directory, which only holds files replaced atomically, may be shared, every machine merges
+the maps into its own workspace inventory.
+"""
+
+import os
+import sqlite3
+
+from .inventory_map import CASE_INSENSITIVE_TYPES, InventoryMap
+
+WORKSPACE_INVENTORY_FILENAME = 'workspace_inventory.sqlite3'
+# Seconds to wait for other processes writing to the inventory.
+BUSY_TIMEOUT = 60.0
+# Version of the schema, a database with another version is recreated.
+SCHEMA_VERSION = 2
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS packages (
+    package TEXT PRIMARY KEY,
+    relative_root TEXT NOT NULL,
+    project TEXT NOT NULL,
+    version TEXT NOT NULL,
+    map_stamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS objects (
+    objtype TEXT NOT NULL,
+    key TEXT NOT NULL,
+    package TEXT NOT NULL,
+    name TEXT NOT NULL,
+    uri TEXT NOT NULL,
+    dispname TEXT NOT NULL,
+    PRIMARY KEY (objtype, key, package)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS objects_package ON objects (package);
+"""
+
+
+def workspace_inventory_path(doc_build_directory):
+    """Return the path of the workspace inventory in a doc build directory."""
+    return os.path.join(doc_build_directory, WORKSPACE_INVENTORY_FILENAME)
+
+
+def _key(objtype, name):
+    # Names of the case insensitive types are keyed by their lower cased name.
+    return name.lower() if objtype in CASE_INSENSITIVE_TYPES else name
+
+
+def _connect(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+    connection.execute('PRAGMA journal_mode=WAL')
+    with connection:
+        connection.execute('BEGIN IMMEDIATE')
+        if connection.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            connection.execute('DROP TABLE IF EXISTS objects')
+            connection.execute('DROP TABLE IF EXISTS packages')
+            connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        for statement in _SCHEMA.split(';'):
+            if statement.strip():
+                connection.execute(statement)
+    return connection
+
+
+def _map_stamp(map_file):
+    # Maps are replaced, not modified, so their size and modification time identify them.
+    stat = os.stat(map_file)
+    return f'{stat.st_size}-{stat.st_mtime_ns}'
+
+
+def _publish(connection, package_name, map_file, relative_root):
+    inventory_map = InventoryMap(map_file)
+    try:
+        map_stamp = _map_stamp(map_file)
+        rows = {}
+        for objtype, name, uri, dispname in inventory_map.entries():
+            # The first of the names which only differ in case wins, as in Sphinx.
+            rows.setdefault((objtype, _key(objtype, name)), (name, uri, dispname))
+        connection.execute(
+            'INSERT OR REPLACE INTO packages VALUES (?, ?, ?, ?, ?)',
+            (package_name, relative_root, inventory_map.project, inventory_map.version,
+             map_stamp))
+    finally:
+        inventory_map.close()
+    connection.execute('DELETE FROM objects WHERE package = ?', (package_name,))
+    connection.executemany(
+        'INSERT INTO objects VALUES (?, ?, ?, ?, ?, ?)',
+        ((objtype, key, package_name, *row) for (objtype, key), row in rows.items()))
+
+
+def publish_inventory(database_path, package_name, map_file, relative_root):
+    """
+    Replace the entries of a package in the workspace inventory with those of its map.
+
+    :param str map_file: path of the lookup map of the objects.inv of the package
+    :param str relative_root: path of the Sphinx output relative to the package documentation
+    :raises RuntimeError: if the map is invalid
+    """
+    connection = _connect(database_path)
+    try:
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            _publish(connection, package_name, map_file, relative_root)
+    finally:
+        connection.close()
+
+
+def sync_workspace_inventory(database_path, inventory_files):
+    """
+    Bring the workspace inventory up to date with the maps of a cross reference directory.
+
+    Packages whose map is new or changed are published, and packages which no longer have a
+    map are removed. Packages whose map is invalid are left out.
+
+    :param dict inventory_files: the result of collect_inventory_files()
+    :return: dict of the name of each package in the workspace inventory to the size and
+        modification time of the map it was published from
+    """
+    connection = _connect(database_path)
+    try:
+        maps = {
+            package_name: inventory_dict for package_name, inventory_dict in
+            inventory_files.items() if inventory_dict['inventory_map']
+        }
+        for package_name in sorted(maps):
+            inventory_dict = maps[package_name]
+            try:
+                map_stamp = _map_stamp(inventory_dict['inventory_map'])
+            except OSError:
+                continue
+            with connection:
+                connection.execute('BEGIN IMMEDIATE')
+                # Checked in the transaction, another process may have just published it.
+                published = connection.execute(
+                    'SELECT map_stamp FROM packages WHERE package = ?',
+                    (package_name,)).fetchone()
+                if published is not None and published[0] == map_stamp:
+                    continue
+                try:
+                    _publish(
+                        connection, package_name, inventory_dict['inventory_map'],
+                        inventory_dict['location_data']['relative_root'])
+                except (OSError, RuntimeError):
+                    connection.execute(
+                        'DELETE FROM packages WHERE package = ?', (package_name,))
+                    connection.execute(
+                        'DELETE FROM objects WHERE package = ?', (package_name,))
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            for (package_name,) in connection.execute('SELECT package FROM packages').fetchall():
+                if package_name not in maps:
+                    connection.execute(
+                        'DELETE FROM packages WHERE package = ?', (package_name,))
+                    connection.execute(
+                        'DELETE FROM objects WHERE package = ?', (package_name,))
+        return dict(connection.execute('SELECT package, map_stamp FROM packages'))
+    finally:
+        connection.close()
+
+
+class WorkspaceInventory:
+    """
+    Read only access to a workspace inventory.
+
+    The database is opened when the first lookup is made.
+    """
+
+    def __init__(self, path):
+        """Create the reader, without opening the database yet."""
+        self.path = path
+        self._connection = None
+        self.packages = None
+
+    def _open(self):
+        self._connection = sqlite3.connect(
+            f'file:{self.path}?mode=ro', uri=True, timeout=BUSY_TIMEOUT,
+            check_same_thread=False)
+        # Map of package name to (relative root, project, version).
+        self.packages = {
+            row[0]: row[1:] for row in self._connection.execute(
+                'SELECT package, relative_root, project, version FROM packages')
+        }
+
+    def close(self):
+        """Close the database, if it was opened."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def has_package(self, package_name):
+        """Return True if the package is in the inventory."""
+        if self._connection is None:
+            self._open()
+        return package_name in self.packages
+
+    def lookup(self, objtypes, name, *, package=None, exclude_package=None,
+               preferred_packages=()):
+        """
+        Look up an object by name.
+
+        :param list objtypes: the object types the object may have, in order of preference
+        :param str package: only look in the entries of this package
+        :param str exclude_package: ignore the entries of this package
+        :param preferred_packages: packages whose entries win over those of other packages,
+            normally the dependencies of the package being built
+        :return: tuple of (rank, (package, relative root, project, version, uri, display
+            name)), where a lower rank is a better match, or None if no object matches
+        """
+        if self._connection is None:
+            self._open()
+        objtypes = list(objtypes)
+        if not objtypes:
+            return None
+        conditions = ' OR '.join('(objtype = ? AND key = ?)' for _ in objtypes)
+        parameters = [value for objtype in objtypes for value in (objtype, _key(objtype, name))]
+        query = f'SELECT objtype, name, package, uri, dispname FROM objects WHERE ({conditions})'
+        if package is not None:
+            query += ' AND package = ?'
+            parameters.append(package)
+        if exclude_package is not None:
+            query += ' AND package != ?'
+            parameters.append(exclude_package)
+        best = None
+        for objtype, object_name, object_package, uri, dispname in \
+                self._connection.execute(query, parameters):
+            if object_package not in self.packages:
+                # Published after the inventory was opened.
+                continue
+            rank = lookup_rank(
+                objtypes, name, objtype, object_name, object_package, preferred_packages)
+            if best is None or rank < best[0]:
+                relative_root, project, version = self.packages[object_package]
+                best = (rank, (object_package, relative_root, project, version, uri, dispname))
+        return best
+
+
+def lookup_rank(objtypes, name, objtype, object_name, object_package, preferred_packages):
+    """
+    Return the rank of an object found by a lookup, the object with the lowest rank wins.
+
+    An exact match of the name is preferred, then the order of objtypes, then the preferred
+    packages, and then the package name, so the result does not depend on the order in which
+    the packages were built.
+    """
+    return (
+        object_name != name, objtypes.index(objtype),
+        object_package not in preferred_packages, object_package)
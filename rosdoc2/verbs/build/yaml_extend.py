@@ -0,0 +1,101 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Read the optional --yaml-extend file, which overrides the rosdoc2.yaml of packages.
+
+The format of the file is as follows:
+
+---
+<some_identifier_describing_a_collection_of_packages>:
+    packages:
+        <1st package name>:
+            <anything valid in rosdoc2.yaml file>
+        <2nd package name>:
+            <more valid rosdoc2.yaml>
+<another_description>
+    packages:
+        <another_package_name>
+            <valid rosdoc2.yaml>
+"""
+
+import logging
+import os
+
+logger = logging.getLogger('rosdoc2')
+
+
+def safe_loader():
+    """Return the libyaml safe loader if PyYAML was built with it, it is much faster."""
+    # yaml is imported on first use, to keep the start up of the command line fast.
+    import yaml
+    return getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def load_yaml_extend(path):
+    """
+    Parse a yaml extend file into the overrides of each package.
+
+    :param str path: path of the yaml extend file
+    :return: dictionary of package name to the list of its override objects, in the order of
+        the collections of the file
+    """
+    import yaml
+    if not os.path.isfile(path):
+        raise ValueError(
+            f"yaml_extend path '{path}' is not a file")
+    with open(path, 'r') as f:
+        extended_settings = yaml.load(f, Loader=safe_loader()) or {}
+    overrides = {}
+    for ex_name in extended_settings:
+        for package_name, extended_object in extended_settings[ex_name]['packages'].items():
+            overrides.setdefault(package_name, []).append(extended_object)
+    return overrides
+
+
+def package_yaml_extend(tool_options, package_name):
+    """
+    Return the override objects of a package, from the yaml extend file of the options.
+
+    The scan verb parses the file once, and passes the overrides of each package in the
+    yaml_extend_overrides option, otherwise the file is parsed here.
+
+    :return: list of override objects, empty if the package has none
+    """
+    overrides = getattr(tool_options, 'yaml_extend_overrides', None)
+    if overrides is None:
+        if not tool_options.yaml_extend:
+            return []
+        overrides = load_yaml_extend(tool_options.yaml_extend)
+    return overrides.get(package_name, [])
+
+
+def apply_yaml_extend(extended_objects, settings_dict, builders_list):
+    """Override the settings and builders of rosdoc2.yaml with the objects of a package."""
+    for extended_object in extended_objects:
+        if 'settings' in extended_object:
+            for key, value in extended_object['settings'].items():
+                settings_dict[key] = value
+                logger.info(f'Overriding rosdoc2.yaml setting  <{key}> with <{value}>')
+        if 'builders' in extended_object:
+            for ex_builder in extended_object['builders']:
+                ex_builder_name = next(iter(ex_builder))
+                # find this object in the builders list
+                for user_builder in builders_list:
+                    user_builder_name = next(iter(user_builder))
+                    if user_builder_name == ex_builder_name:
+                        for builder_k, builder_v in ex_builder[ex_builder_name].items():
+                            logger.info(f'Overriding rosdoc2 builder <{ex_builder_name}> '
+                                        f'property <{builder_k}> with <{builder_v}>')
+                            user_builder[user_builder_name][builder_k] = builder_v
@@ -14,9 +14,7 @@
 
 import os
 
-from ..build.create_format_map_from_package import create_format_map_from_package
 from ..build.impl import get_package
-from ..build.inspect_package_for_settings import DEFAULT_ROSDOC_CONFIG_FILE
 
 
 def prepare_arguments(parser):
@@ -32,6 +30,9 @@ def prepare_arguments(parser):
 
 def main(options):
     """Execute command to create default config file."""
+    from ..build.create_format_map_from_package import create_format_map_from_package
+    from ..build.inspect_package_for_settings import DEFAULT_ROSDOC_CONFIG_FILE
+
     package = get_package(options.package_path)
     path = os.path.join(os.path.dirname(package.filename), 'rosdoc2.yaml')
     if os.path.exists(path):
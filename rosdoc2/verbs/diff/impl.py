@@ -0,0 +1,64 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import sys
+
+from ..build.manifest import diff_output_directories
+
+# Prefix of each path in the plain output, by change.
+STATUS_LETTERS = {'added': 'A', 'removed': 'D', 'changed': 'M'}
+
+
+def prepare_arguments(parser):
+    """Add command-line arguments to the argparse object."""
+    parser.add_argument(
+        'old_output_directory',
+        help='output directory as it was deployed, for example a copy of its manifests',
+    )
+    parser.add_argument(
+        'new_output_directory',
+        help='output directory to deploy',
+    )
+    parser.add_argument(
+        '--json',
+        default=False,
+        action='store_true',
+        help='print the added, removed and changed paths as a JSON object',
+    )
+    return parser
+
+
+def main(options):
+    """Execute the program, catching errors."""
+    try:
+        return main_impl(options)
+    except RuntimeError as e:
+        sys.exit(str(e))
+
+
+def main_impl(options):
+    """Print the paths which differ between the old and new output directories."""
+    if not os.path.isdir(options.new_output_directory):
+        raise RuntimeError(
+            f"Error output directory '{options.new_output_directory}' does not exist")
+    changes = diff_output_directories(
+        options.old_output_directory, options.new_output_directory)
+    if options.json:
+        print(json.dumps(changes, indent=2))
+        return
+    for change, letter in STATUS_LETTERS.items():
+        for path in changes[change]:
+            print(f'{letter}\t{path}')
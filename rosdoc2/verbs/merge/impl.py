@@ -0,0 +1,169 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+import shutil
+import sys
+
+from ..build.impl import DEFAULT_OUTPUT_DIR
+from ..build.manifest import update_rollup
+from ..scan.scan_report import read_scan_report, write_scan_report
+from ..scan.search_index import SEARCH_DIRECTORY, update_search_index
+
+logging.basicConfig(format='[%(name)s] [%(levelname)s] %(message)s', level=logging.INFO)
+logger = logging.getLogger('rosdoc2.merge')
+
+
+def prepare_arguments(parser):
+    """Add command-line arguments to the argparse object."""
+    parser.add_argument(
+        'shard_output_directories',
+        nargs='+',
+        help='output directories of the scan shards to merge',
+    )
+    parser.add_argument(
+        '--output-directory',
+        '-o',
+        default=DEFAULT_OUTPUT_DIR,
+        help='directory to merge the documentation of all shards into (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--cross-reference-directory',
+        '-c',
+        default=None,
+        help='directory to merge the cross reference directories of the shards into',
+    )
+    parser.add_argument(
+        '--shard-cross-reference-directories',
+        nargs='*',
+        default=[],
+        help='cross reference directories of the shards, if they were not shared',
+    )
+    return parser
+
+
+def main(options):
+    """Execute the program, catching errors."""
+    try:
+        return main_impl(options)
+    except RuntimeError as e:
+        sys.exit(str(e))
+
+
+def _is_same_directory(a, b):
+    return os.path.isdir(a) and os.path.isdir(b) and os.path.samefile(a, b)
+
+
+def merge_package_directories(source_directories, destination):
+    """
+    Copy the package subdirectories of each source directory into destination.
+
+    :return: dict of package directory name to the source directory it was taken from
+    :raises RuntimeError: if two of the source directories contain the same package
+    """
+    origins = {}
+    os.makedirs(destination, exist_ok=True)
+    for source in source_directories:
+        if not os.path.isdir(source):
+            raise RuntimeError(f"Error directory to merge '{source}' does not exist")
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            if not os.path.isdir(path) or name == SEARCH_DIRECTORY:
+                # The search index of each shard is replaced by one of all packages.
+                continue
+            if name in origins:
+                raise RuntimeError(
+                    f"Error package '{name}' is in both '{origins[name]}' and '{source}'")
+            origins[name] = source
+            if not _is_same_directory(source, destination):
+                shutil.copytree(path, os.path.join(destination, name), dirs_exist_ok=True)
+    return origins
+
+
+def merge_scan_reports(reports):
+    """
+    Combine the scan reports of several shards into one.
+
+    :param dict reports: map of shard output directory to its scan report
+    :return: the merged scan report
+    """
+    merged = None
+    for directory, report in reports.items():
+        if merged is None:
+            merged = {**report, 'shards': [], 'packages': {}}
+        if report['shard_count'] != merged['shard_count']:
+            raise RuntimeError(
+                f"Error the scan report in '{directory}' is for {report['shard_count']} "
+                f"shards, not {merged['shard_count']}")
+        for shard in report['shards']:
+            if shard in merged['shards']:
+                raise RuntimeError(f'Error shard {shard} is merged more than once')
+            merged['shards'].append(shard)
+        for name, result in report['packages'].items():
+            if name in merged['packages']:
+                raise RuntimeError(f"Error package '{name}' is in more than one scan report")
+            merged['packages'][name] = result
+    merged['shards'].sort(key=lambda shard: int(shard.split('/')[0]))
+    return merged
+
+
+def main_impl(options):
+    """Execute the program."""
+    output_directory = options.output_directory
+    origins = merge_package_directories(options.shard_output_directories, output_directory)
+    logger.info(
+        f'Merged the documentation of {len(origins)} packages into {output_directory}')
+    update_rollup(output_directory, origins)
+    update_search_index(output_directory)
+
+    if options.shard_cross_reference_directories:
+        if not options.cross_reference_directory:
+            raise RuntimeError(
+                'Error --cross-reference-directory is required to merge the cross reference '
+                'directories of the shards')
+        xref_origins = merge_package_directories(
+            options.shard_cross_reference_directories, options.cross_reference_directory)
+        logger.info(
+            f'Merged the cross references of {len(xref_origins)} packages into '
+            f'{options.cross_reference_directory}')
+
+    reports = {}
+    for directory in options.shard_output_directories:
+        report = read_scan_report(directory)
+        if report is None:
+            logger.warning(f"No scan report in '{directory}'")
+            continue
+        reports[directory] = report
+    if not reports:
+        return
+    merged = merge_scan_reports(reports)
+    shard_count = merged['shard_count']
+    if shard_count:
+        merged_indices = {int(shard.split('/')[0]) for shard in merged['shards']}
+        missing = sorted(set(range(1, shard_count + 1)) - merged_indices)
+        if missing:
+            logger.warning(
+                f"Shards {', '.join(f'{i}/{shard_count}' for i in missing)} were not merged")
+    write_scan_report(output_directory, merged)
+
+    failed = sorted(
+        name for name, result in merged['packages'].items() if result['return_code'] != 0)
+    if failed:
+        print(f'{len(failed)} of {len(merged["packages"])} packages failed:')
+        for name in failed:
+            result = merged['packages'][name]
+            print(f'{name}: retval={result["return_code"]}: {result["message"]}')
+    else:
+        print(f'All {len(merged["packages"])} packages succeeded')
@@ -12,12 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
 import os
 import sys
 import webbrowser
 
+from .server import create_server, DEFAULT_BIND_ADDRESS, DEFAULT_PORT
 from ..build.impl import DEFAULT_OUTPUT_DIR
 
+logger = logging.getLogger('rosdoc2')
+
 
 def prepare_arguments(parser):
     """Add command-line arguments to the argparse object."""
@@ -27,9 +31,73 @@ def prepare_arguments(parser):
         default=DEFAULT_OUTPUT_DIR,
         help='(optional) path to the built documentation (default: %(default)s) OR package name',
     )
+    parser.add_argument(
+        '--serve',
+        default=False,
+        action='store_true',
+        help=(
+            'serve the documentation over HTTP on localhost, instead of opening the files, '
+            'pages reload when their package is built again, as with build --watch'
+        ),
+    )
+    parser.add_argument(
+        '--reload',
+        dest='auto_reload',
+        default=None,
+        action='store_true',
+        help=(
+            'with --serve, reload pages when their package is built again '
+            '(default: only if --bind is a loopback address)'
+        ),
+    )
+    parser.add_argument(
+        '--no-reload',
+        dest='auto_reload',
+        action='store_false',
+        help='with --serve, send pages as they are, without the reload script',
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=DEFAULT_PORT,
+        help='port to serve the documentation on with --serve (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--bind',
+        default=DEFAULT_BIND_ADDRESS,
+        help=(
+            'address to serve the documentation on with --serve, 0.0.0.0 shares it with '
+            'other machines (default: %(default)s)'
+        ),
+    )
     return parser
 
 
+def serve(path_to_open, port, bind=DEFAULT_BIND_ADDRESS, auto_reload=None):
+    """Serve the documentation containing path_to_open, and open it in a web browser."""
+    path_to_open = os.path.abspath(path_to_open)
+    directory = path_to_open if os.path.isdir(path_to_open) else os.path.dirname(path_to_open)
+    # Serve the directory of all packages, so that links between packages work, and the
+    # package index is available.
+    root = directory
+    if os.path.isfile(os.path.join(directory, 'index.html')):
+        root = os.path.dirname(directory)
+    page = os.path.relpath(path_to_open, root).replace(os.sep, '/')
+    if os.path.isdir(path_to_open):
+        page = '' if page == '.' else page + '/'
+    server = create_server(root, port, auto_reload=auto_reload, bind=bind)
+    host = '127.0.0.1' if bind in ('', '0.0.0.0') else bind
+    url = f'http://{host}:{server.server_address[1]}/{page}'
+    logger.info(f"Serving '{root}' at {url}, press Ctrl-C to stop")
+    webbrowser.open(url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
 def main(options):
     """Open a web browser to display the built documentation."""
     # Locate the entry point for the built documentation.
@@ -49,7 +117,9 @@ def main(options):
         if os.path.isfile(candidate):
             path_to_open = candidate
 
-    if path_to_open:
+    if path_to_open and options.serve:
+        serve(path_to_open, options.port, options.bind, options.auto_reload)
+    elif path_to_open:
         webbrowser.open(f'file://{os.path.abspath(path_to_open)}')
     else:
         sys.exit('did not find package documentation at given package_output_directory '
@@ -0,0 +1,286 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Serve built documentation over HTTP, reloading pages when their package is rebuilt."""
+
+import email.utils
+import functools
+import html
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import io
+import ipaddress
+import logging
+import os
+import shutil
+import urllib.parse
+
+from ..build.manifest import MANIFEST_FILENAME, read_manifest
+from ..scan.search_index import SEARCH_PAGE
+
+logger = logging.getLogger('rosdoc2')
+
+DEFAULT_PORT = 8000
+DEFAULT_BIND_ADDRESS = '127.0.0.1'
+# Files at least this large are sent with sendfile, instead of being copied through Python.
+SENDFILE_THRESHOLD = 64 * 1024
+# Content encodings of precompressed siblings of files, in order of preference.
+PRECOMPRESSED_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+MIB = 1024 * 1024
+PACKAGE_INDEX = """\
+<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Package documentation</title></head>
+<body>
+<h1>Package documentation</h1>
+<p>{count} packages</p>
+{search}
+<ul>
+{rows}
+</ul>
+</body>
+</html>
+"""
+# Path which returns the build version of the package of the page given in its query.
+RELOAD_PATH = '/__rosdoc2_reload__'
+# Milliseconds between checks of the page for a new build.
+RELOAD_INTERVAL = 1000
+RELOAD_SCRIPT = """\
+<script>
+(function () {{
+  var version = null;
+  function check() {{
+    fetch('{reload_path}?page=' + encodeURIComponent(location.pathname), {{cache: 'no-store'}})
+      .then(function (response) {{ return response.text(); }})
+      .then(function (current) {{
+        if (version !== null && current !== version) {{ location.reload(); }}
+        version = current;
+      }})
+      .catch(function () {{}})
+      .finally(function () {{ setTimeout(check, {interval}); }});
+  }}
+  check();
+}})();
+</script>
+""".format(reload_path=RELOAD_PATH, interval=RELOAD_INTERVAL)
+
+
+def is_loopback_address(address):
+    """Return True if address only accepts connections from this machine."""
+    if address == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(address).is_loopback
+    except ValueError:
+        return False
+
+
+def build_version(root, page):
+    """
+    Return a string which changes whenever the package of a page is built again.
+
+    Every build writes the manifest of the package last, so its modification time is used.
+    """
+    parts = [part for part in page.split('/') if part and part not in ('.', '..')]
+    candidates = []
+    if parts:
+        candidates.append(os.path.join(root, parts[0], MANIFEST_FILENAME))
+    candidates.append(os.path.join(root, MANIFEST_FILENAME))
+    for path in candidates:
+        try:
+            return str(os.stat(path).st_mtime_ns)
+        except OSError:
+            continue
+    return ''
+
+
+class DocumentationRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serve the files of the documentation.
+
+    Files are revalidated with ETag and Last-Modified, a precompressed .br or .gz sibling of a
+    file is sent to clients which accept it, and large files are sent with sendfile. With
+    auto_reload, HTML pages get a script which reloads them when their package is built
+    again, so they are sent from memory, uncompressed. The root lists the packages if it has
+    no index.html.
+    """
+
+    auto_reload = True
+
+    def log_message(self, message_format, *args):
+        """Log requests at debug level, instead of printing them to stderr."""
+        logger.debug(message_format % args)
+
+    def do_GET(self):
+        """Answer reload checks, and serve everything else."""
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == RELOAD_PATH:
+            page = urllib.parse.parse_qs(url.query).get('page', [''])[0]
+            self._send_bytes(build_version(self.directory, page).encode(), 'text/plain')
+            return
+        super().do_GET()
+
+    def send_head(self):
+        """Send the headers of a response, and return the file with its body, or None."""
+        url = urllib.parse.urlsplit(self.path)
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = os.path.join(path, 'index.html')
+            if not url.path.endswith('/') or not os.path.isfile(index):
+                if url.path == '/':
+                    return self._package_index()
+                # Redirect to the directory, or list it.
+                return super().send_head()
+            path = index
+        if not os.path.isfile(path):
+            self.send_error(404, 'File not found')
+            return None
+        if self.auto_reload and path.endswith('.html'):
+            stat = os.stat(path)
+            # The page differs from the file by the reload script, so it has its own tag.
+            etag = self._etag(stat, 'reload')
+            if self._not_modified(etag, stat.st_mtime):
+                return self._send_not_modified(etag)
+            with open(path, 'rb') as f:
+                content = f.read()
+            script = RELOAD_SCRIPT.encode()
+            index = content.rfind(b'</body>')
+            if index == -1:
+                content += script
+            else:
+                content = content[:index] + script + content[index:]
+            return self._send_bytes(
+                content, 'text/html; charset=utf-8', body=False, stat=stat, etag=etag)
+
+        content_type = self.guess_type(path)
+        encoding, path = self._precompressed(path)
+        stat = os.stat(path)
+        etag = self._etag(stat, encoding)
+        if self._not_modified(etag, stat.st_mtime):
+            return self._send_not_modified(etag)
+        f = open(path, 'rb')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(stat.st_size))
+        self.send_header('Last-Modified', self.date_time_string(stat.st_mtime))
+        self.send_header('ETag', etag)
+        # Documentation changes when it is rebuilt, so clients have to revalidate.
+        self.send_header('Cache-Control', 'no-cache')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if encoding or self._precompressed_siblings(path):
+            self.send_header('Vary', 'Accept-Encoding')
+        self.end_headers()
+        return f
+
+    @staticmethod
+    def _etag(stat, variant=None):
+        return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{"-" + variant if variant else ""}"'
+
+    def _send_not_modified(self, etag):
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        self.end_headers()
+        return None
+
+    @staticmethod
+    def _precompressed_siblings(path):
+        return [
+            encoding for encoding, suffix in PRECOMPRESSED_SUFFIXES
+            if os.path.isfile(path + suffix)]
+
+    def _precompressed(self, path):
+        """Return the content encoding and path of the file to send for path."""
+        accepted = {
+            value.split(';')[0].strip()
+            for value in self.headers.get('Accept-Encoding', '').split(',')}
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES:
+            if encoding in accepted and os.path.isfile(path + suffix) \
+                    and os.path.getmtime(path + suffix) >= os.path.getmtime(path):
+                return encoding, path + suffix
+        return None, path
+
+    def _not_modified(self, etag, mtime):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return if_none_match.strip() == '*' or etag in (
+                tag.strip() for tag in if_none_match.split(','))
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is None:
+            return False
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return since.timestamp() >= int(mtime)
+
+    def copyfile(self, source, outputfile):
+        """Copy a response body, with sendfile for large files."""
+        if isinstance(source, io.BufferedReader) and \
+                os.fstat(source.fileno()).st_size >= SENDFILE_THRESHOLD:
+            self.connection.sendfile(source)
+        else:
+            shutil.copyfileobj(source, outputfile)
+
+    def _package_index(self):
+        """Send a page listing the packages in the served directory."""
+        rollup = read_manifest(os.path.join(self.directory, MANIFEST_FILENAME)) or {}
+        sizes = rollup.get('packages', {})
+        rows = []
+        for name in sorted(os.listdir(self.directory)):
+            if not os.path.isfile(os.path.join(self.directory, name, 'index.html')):
+                continue
+            size = sizes.get(name)
+            details = f'{size["files"]} files, {size["bytes"] / MIB:.1f} MiB' if size else ''
+            rows.append(
+                f'<li><a href="{urllib.parse.quote(name)}/">{html.escape(name)}</a> '
+                f'{details}</li>')
+        search = ''
+        if os.path.isfile(os.path.join(self.directory, SEARCH_PAGE)):
+            search = f'<p><a href="{SEARCH_PAGE}">Search all packages</a></p>'
+        content = PACKAGE_INDEX.format(count=len(rows), rows='\n'.join(rows), search=search)
+        if self.auto_reload:
+            content = content.replace('</body>', RELOAD_SCRIPT + '</body>')
+        return self._send_bytes(content.encode(), 'text/html; charset=utf-8', body=False)
+
+    def _send_bytes(self, content, content_type, body=True, stat=None, etag=None):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        if stat is not None:
+            self.send_header('Last-Modified', self.date_time_string(stat.st_mtime))
+        if etag is not None:
+            self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if not body:
+            return io.BytesIO(content)
+        self.wfile.write(content)
+
+
+def create_server(root, port=DEFAULT_PORT, auto_reload=None, bind=DEFAULT_BIND_ADDRESS):
+    """
+    Create a threaded server of the documentation in root.
+
+    :param int port: port to listen on, 0 picks a free one
+    :param bool auto_reload: reload HTML pages when their package is built again, by default
+        only if bind is a loopback address
+    :param str bind: address to listen on, localhost by default
+    """
+    if auto_reload is None:
+        auto_reload = is_loopback_address(bind)
+    handler_class = type(
+        'DocumentationRequestHandler', (DocumentationRequestHandler,),
+        {'auto_reload': auto_reload})
+    return ThreadingHTTPServer(
+        (bind, port), functools.partial(handler_class, directory=root))
@@ -0,0 +1,162 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Concurrent discovery and parsing of the packages below a directory."""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import json
+import logging
+import os
+import time
+
+from catkin_pkg.package import PACKAGE_MANIFEST_FILENAME
+from catkin_pkg.packages import DEFAULT_IGNORE_MARKERS
+from rosdoc2.verbs.build.impl import get_package
+
+logger = logging.getLogger('rosdoc2.scan')
+
+# Discovery is dominated by file system latency, not CPU, so use more threads than cores.
+DISCOVERY_THREADS = 16
+
+DISCOVERY_CACHE_VERSION = 1
+
+
+def _scan_directory(path):
+    """
+    Scan one directory, following the rules of catkin_pkg.packages.find_package_paths().
+
+    :return: tuple of (modification time, is a package, subdirectories to search)
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+        with os.scandir(path) as entries:
+            entries = list(entries)
+    except OSError as e:
+        logger.debug(f"Unable to scan directory '{path}': {e}")
+        return (None, False, [])
+    names = {entry.name for entry in entries}
+    if names & DEFAULT_IGNORE_MARKERS:
+        return (mtime, False, [])
+    if PACKAGE_MANIFEST_FILENAME in names:
+        return (mtime, True, [])
+    subdirectories = []
+    for entry in entries:
+        if entry.name.startswith('.'):
+            continue
+        try:
+            if entry.is_dir():
+                subdirectories.append(entry.name)
+        except OSError:
+            continue
+    return (mtime, False, subdirectories)
+
+
+def find_package_paths(basepath, executor):
+    """
+    Walk basepath concurrently, looking for packages.
+
+    :return: tuple of (sorted relative package paths, map of relative directory to mtime)
+    """
+    package_paths = []
+    directory_mtimes = {}
+    visited_real_paths = {os.path.realpath(basepath)}
+    pending = {executor.submit(_scan_directory, basepath): '.'}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            relpath = pending.pop(future)
+            mtime, is_package, subdirectories = future.result()
+            if mtime is None:
+                continue
+            directory_mtimes[relpath] = mtime
+            if is_package:
+                package_paths.append(relpath)
+                continue
+            for subdirectory in subdirectories:
+                sub_relpath = os.path.normpath(os.path.join(relpath, subdirectory))
+                sub_path = os.path.join(basepath, sub_relpath)
+                # Links are followed, like catkin_pkg does, but each directory is searched once.
+                real_path = os.path.realpath(sub_path)
+                if real_path in visited_real_paths:
+                    continue
+                visited_real_paths.add(real_path)
+                pending[executor.submit(_scan_directory, sub_path)] = sub_relpath
+    return (sorted(package_paths), directory_mtimes)
+
+
+def _read_discovery_cache(cache_path, basepath, executor):
+    """Return the cached package paths, or None if the cache is missing or out of date."""
+    if not cache_path or not os.path.isfile(cache_path):
+        return None
+    try:
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable discovery cache '{cache_path}': {e}")
+        return None
+    if cache.get('version') != DISCOVERY_CACHE_VERSION or \
+            cache.get('basepath') != os.path.realpath(basepath):
+        return None
+
+    # Any added, removed or renamed entry changes the modification time of its directory.
+    def is_unchanged(item):
+        relpath, mtime = item
+        try:
+            return os.stat(os.path.join(basepath, relpath)).st_mtime_ns == mtime
+        except OSError:
+            return False
+    if not all(executor.map(is_unchanged, cache['directories'].items())):
+        logger.info(f"Discovery cache '{cache_path}' is out of date")
+        return None
+    return cache['packages']
+
+
+def _write_discovery_cache(cache_path, basepath, package_paths, directory_mtimes):
+    os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+    with open(cache_path, 'w') as f:
+        json.dump({
+            'version': DISCOVERY_CACHE_VERSION,
+            'basepath': os.path.realpath(basepath),
+            'packages': package_paths,
+            'directories': directory_mtimes,
+        }, f)
+
+
+def discover_packages(basepath, cache_path=None):
+    """
+    Find and parse all of the packages below basepath.
+
+    Directories are walked, and manifests parsed, in a thread pool. Conditions in the
+    manifests are evaluated, so the packages are ready to be built.
+
+    :param str basepath: directory to search for packages
+    :param str cache_path: if given, a file where the discovered package paths are cached.
+        The cache is used as long as none of the searched directories have been modified.
+    :return: dict of relative package path to catkin_pkg Package, sorted by path
+    """
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=DISCOVERY_THREADS) as executor:
+        package_paths = _read_discovery_cache(cache_path, basepath, executor)
+        if package_paths is None:
+            package_paths, directory_mtimes = find_package_paths(basepath, executor)
+            if cache_path:
+                _write_discovery_cache(cache_path, basepath, package_paths, directory_mtimes)
+        else:
+            logger.info(f"Using package paths from discovery cache '{cache_path}'")
+        packages = executor.map(
+            get_package, [os.path.join(basepath, path) for path in package_paths])
+        found_packages = dict(zip(package_paths, packages))
+    logger.info(
+        f'Discovered {len(found_packages)} packages in {time.time() - start:.3f} seconds')
+    return found_packages
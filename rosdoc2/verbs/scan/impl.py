@@ -12,17 +12,33 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
 import logging
 import multiprocessing as mp
 import os
+import queue
 import signal
 import sys
 import threading
 import time
 
-from catkin_pkg.packages import find_packages_allowing_duplicates
+from rosdoc2.verbs.build.archive_output import DEFAULT_OUTPUT_FORMAT
 from rosdoc2.verbs.build.impl import main_impl as build_main_impl
-from rosdoc2.verbs.build.impl import prepare_arguments as build_prepare_arguments
+from rosdoc2.verbs.build.impl import prepare_package_arguments
+from rosdoc2.verbs.build.manifest import update_rollup
+from rosdoc2.verbs.build.metrics import read_metrics
+from rosdoc2.verbs.build.yaml_extend import load_yaml_extend
+
+from .journal import build_settings, hash_cross_references, input_fingerprints
+from .journal import JOURNAL_FILENAME, ScanJournal
+from .memory_monitor import AdmissionController, DEFAULT_MEMORY_RESERVE_MIB, MIB, own_peak_rss
+from .progress import DEFAULT_PROGRESS_INTERVAL, init_worker, ProgressReporter
+from .progress import report_metrics, report_progress
+from .scan_report import add_package_result, new_scan_report, write_scan_report
+from .search_index import update_search_index
+from .shard import order_by_dependencies, parse_shard, ready_packages, scan_dependencies
+from .shard import select_shard, waited_dependencies
+from .shard_exchange import export_cross_references, import_cross_references
 
 mp.set_start_method('spawn', force=True)
 
@@ -35,6 +51,10 @@ logger_scan = logging.getLogger('rosdoc2.scan')
 # this module, to reduce run time or isolate sections that cause hangs.
 MAX_PACKAGES = 10000
 WATCHDOG_TIMEOUT = 15 * 60  # Seconds
+# Seconds between checks whether another package may start, while packages are held back.
+ADMISSION_INTERVAL = 1.0
+# Seconds after its worker exited, before a package without a result is considered lost.
+LOST_WORKER_GRACE_PERIOD = 10.0
 
 
 def main(options):
@@ -59,7 +79,7 @@ class Struct:
 def prepare_arguments(parser):
     """Add command-line arguments to the argparse object."""
     # Wrap the builder arguments to include their choices.
-    build_prepare_arguments(parser)
+    prepare_package_arguments(parser)
 
     # Additional options for scan
     parser.add_argument(
@@ -80,6 +100,71 @@ def prepare_arguments(parser):
         default=None,
         help='number of subprocesses to use, defaults to os.cpu_count()'
     )
+    parser.add_argument(
+        '--discovery-cache',
+        default=False,
+        action='store_true',
+        help=(
+            'cache the discovered package locations in the doc build directory, reusing them '
+            'until a directory in the package path is modified'
+        ),
+    )
+    parser.add_argument(
+        '--progress-interval',
+        type=float,
+        default=DEFAULT_PROGRESS_INTERVAL,
+        help=(
+            'seconds between progress reports when the output is not a terminal, '
+            '0 disables progress reporting (default: %(default)s)'
+        ),
+    )
+    parser.add_argument(
+        '--memory-reserve',
+        default=DEFAULT_MEMORY_RESERVE_MIB,
+        help=(
+            'memory in MiB to keep available, packages are held back when starting them could '
+            'use it up (default: %(default)s)'
+        ),
+    )
+    parser.add_argument(
+        '--shard',
+        default=None,
+        help=(
+            'only build shard I of N, like 2/4. Packages are grouped by repository and every '
+            'machine computes the same shards. Packages wait for their dependencies in other '
+            'shards, whose cross references are exchanged through --shard-exchange. Combine '
+            'the output directories of the shards with the merge verb'
+        ),
+    )
+    parser.add_argument(
+        '--shard-exchange',
+        default=None,
+        metavar='DIRECTORY',
+        help=(
+            'directory shared by the shards of a scan, or synchronized between their '
+            'machines, through which they exchange the cross references of the packages they '
+            'finished, required with --shard. It must be empty when a new scan starts'
+        ),
+    )
+    parser.add_argument(
+        '--resume',
+        default=False,
+        action='store_true',
+        help=(
+            'skip packages which succeeded in an earlier scan with the same inputs, according '
+            'to the journal in the doc build directory'
+        ),
+    )
+    parser.add_argument(
+        '--retry-failed',
+        nargs='*',
+        default=None,
+        metavar='PACKAGE',
+        help=(
+            'only build the packages which failed in the latest scan according to the journal, '
+            'or only the given ones of them'
+        ),
+    )
     return parser
 
 
@@ -87,47 +172,220 @@ def main_impl(options):
     """Execute the program."""
     import traceback
 
+    from .discover_packages import discover_packages
+
     if options.install_directory is not None:
         logger.warn(
             'The --install-directory option (-i) is unused '
             'and will be removed in a future version')
 
     # Locate the packages to document.
-    found_packages = find_packages_allowing_duplicates(options.package_path)
-    packages = list(found_packages.values())
+    discovery_cache_path = None
+    if options.discovery_cache:
+        discovery_cache_path = \
+            os.path.join(options.doc_build_directory, 'scan_discovery_cache.json')
+    found_packages = discover_packages(options.package_path, cache_path=discovery_cache_path)
+    shard = parse_shard(options.shard) if options.shard else None
+    exchange = None
+    if shard and shard[1] > 1:
+        exchange = options.shard_exchange
+        if not exchange:
+            raise RuntimeError('Error --shard requires --shard-exchange')
+        if os.path.realpath(exchange) == os.path.realpath(options.cross_reference_directory):
+            raise RuntimeError(
+                'Error the shard exchange directory must not be the cross reference directory')
+        os.makedirs(exchange, exist_ok=True)
+    if shard:
+        packages = select_shard(found_packages, *shard)
+        logger_scan.info(
+            f'Shard {options.shard} has {len(packages)} of {len(found_packages)} packages')
+    else:
+        packages = order_by_dependencies(list(found_packages.values()))
     if len(packages) == 0:
         logger_scan.error(f'No packages found in subdirectories of {options.package_path}')
         exit(1)
+    shard_names = {p.name for p in packages}
+
+    journal = ScanJournal(os.path.join(options.doc_build_directory, JOURNAL_FILENAME))
+    # Packages whose result in the report is taken from the journal, instead of building them.
+    resumed_packages = []
+    if options.retry_failed is not None:
+        retried_packages = [
+            p for p in packages
+            if journal.has_failed(_package_relpath(p, options))
+            and (not options.retry_failed or p.name in options.retry_failed)
+        ]
+        # The report of a retry still describes every package, with the earlier results of
+        # the packages which are not retried.
+        resumed_packages = [
+            p for p in packages
+            if p not in retried_packages and _package_relpath(p, options) in journal.entries]
+        packages = retried_packages
+        logger_scan.info(f'Retrying {len(packages)} failed packages')
     max_packages = int(options.max_packages)
     subprocesses = int(options.subprocesses) if options.subprocesses is not None else None
     if len(packages) > max_packages:
         packages = packages[0:max_packages]
+    # Dependencies anywhere in the workspace, which the journal checks for changes.
+    workspace_dependencies = scan_dependencies(list(found_packages.values()))
+    # Fingerprint the inputs before building, so that changes made during the build are
+    # detected by the next resumed scan.
+    fingerprints = input_fingerprints(
+        [os.path.dirname(p.filename) for p in packages],
+        [options.doc_build_directory, options.output_directory,
+         options.cross_reference_directory],
+        build_settings(options))
+    if options.resume:
+        # Packages are in dependency order, and the dependents of a package which is built
+        # again are built again too, since its cross references may change.
+        rebuilt_names = set()
+        up_to_date_packages = []
+        for p in packages:
+            if not workspace_dependencies[p.filename] & rebuilt_names and journal.is_up_to_date(
+                    _package_relpath(p, options), fingerprints[os.path.dirname(p.filename)],
+                    options.output_directory, options.cross_reference_directory):
+                up_to_date_packages.append(p)
+            else:
+                rebuilt_names.add(p.name)
+        packages = [p for p in packages if p not in up_to_date_packages]
+        resumed_packages += up_to_date_packages
+        logger_scan.info(f'Resuming, skipping {len(up_to_date_packages)} up to date packages')
     packages_total = len(packages)
     packages_done = 0
     logger_scan.info(f'Processing {packages_total} packages')
+    report = new_scan_report(shard)
+    for package in resumed_packages:
+        entry = journal.entries[_package_relpath(package, options)]
+        add_package_result(
+            report, package.name, entry['path'], entry['return_code'], entry['message'],
+            {'resumed': True})
+        if exchange:
+            export_cross_references(
+                exchange, options.cross_reference_directory, package.name,
+                entry['return_code'], shard)
     failed_packages = []
     for package in packages:
         logger_scan.info(f'Adding {package.name} for processing')
 
-    pool = mp.Pool(maxtasksperchild=1, processes=subprocesses)
-    pool_results = pool.imap_unordered(package_impl, ((p, options) for p in packages))
-    while True:
-        try:
-            (package, returns, message) = pool_results.next()
+    os.makedirs(options.doc_build_directory, exist_ok=True)
+    workers = max(1, min(subprocesses or os.cpu_count() or 1, packages_total))
+    progress = ProgressReporter(
+        [p.name for p in packages],
+        workers,
+        float(options.timeout),
+        interval=options.progress_interval,
+        history_path=os.path.join(options.doc_build_directory, 'scan_durations.json'))
+    admission = AdmissionController(
+        workers,
+        int(float(options.memory_reserve) * MIB),
+        history_path=os.path.join(options.doc_build_directory, 'scan_memory.json'))
+    # Parse the yaml extend file once, each worker only gets the overrides of its package.
+    yaml_extend_overrides = load_yaml_extend(options.yaml_extend) if options.yaml_extend else None
+    pool = mp.Pool(
+        maxtasksperchild=1, processes=workers,
+        initializer=init_worker, initargs=(progress.queue,))
+    progress.start()
+    results = queue.Queue()
+    pending = list(packages)
+    # Packages only start once their dependencies finished, so that the cross references of
+    # the dependencies exist. Those built by this scan are waited for directly, those in
+    # other shards through the shard exchange directory.
+    waited = waited_dependencies(list(found_packages.values()))
+    scan_names = {p.name for p in packages}
+    dependencies = {}
+    awaited_names = set()
+    for package in packages:
+        dependencies[package.filename] = waited[package.filename] & scan_names
+        if exchange:
+            dependencies[package.filename] |= waited[package.filename] - shard_names
+            awaited_names |= waited[package.filename] - shard_names
+    if awaited_names:
+        logger_scan.info(
+            f'Waiting for {len(awaited_names)} dependencies in other shards: '
+            f'{", ".join(sorted(awaited_names))}')
+    finished_names = set()
+    # Map of package.xml path to package, for the packages given to the pool.
+    running = {}
+    # Map of package.xml path to the time its worker was first seen to have exited.
+    lost = {}
+    try:
+        while pending or running:
+            for name in sorted(awaited_names):
+                if import_cross_references(
+                        exchange, options.cross_reference_directory, name, shard[1]) is None:
+                    continue
+                awaited_names.discard(name)
+                finished_names.add(name)
+                logger_scan.info(f'Imported the cross references of {name} from another shard')
+            # Start packages while there are idle workers and enough memory.
+            while pending and len(running) < workers:
+                ready = ready_packages(
+                    pending, dependencies, finished_names, running, bool(awaited_names))
+                running_pids = progress.running_pids()
+                index = admission.choose(
+                    [p.name for p in ready],
+                    {p.name: running_pids.get(p.name) for p in running.values()})
+                if index is None:
+                    break
+                package = ready[index]
+                pending.remove(package)
+                running[package.filename] = package
+                package_overrides = None
+                if yaml_extend_overrides is not None:
+                    package_overrides = {
+                        package.name: yaml_extend_overrides.get(package.name, [])}
+                pool.apply_async(
+                    package_impl, ((package, options, package_overrides),),
+                    callback=results.put,
+                    error_callback=functools.partial(_package_error, package, results))
+            try:
+                (package, returns, message, stats) = results.get(timeout=ADMISSION_INTERVAL)
+            except queue.Empty:
+                # A worker killed by the system, for example when out of memory, never
+                # returns a result, so stop waiting for it.
+                for package in _find_lost_packages(running, progress.running_pids(), lost):
+                    results.put((package, 3, 'Worker process exited without a result', {}))
+                continue
+            if package.filename not in running:
+                # A late result of a package that was considered lost.
+                continue
+            del running[package.filename]
+            finished_names.add(package.name)
             packages_done += 1
-            if returns != 0:
-                logger_scan.warning(f'{package.name} ({packages_done}/{packages_total})'
-                                    f' returned {returns}: {message}')
-                failed_packages.append((package, returns, message))
-            else:
-                logger_scan.info(
-                    f'{package.name} successful ({packages_done}/{packages_total})')
-        except StopIteration:
-            break
-        except BaseException as e:  # noqa: B902
-            logger_scan.error(f'Unexpected error in scan: {type(e).__name__ + " " + str(e)}')
-            print(traceback.format_exc())
-            break
+            progress.package_done(package.name)
+            admission.package_done(package.name, stats.get('peak_rss'))
+            relpath = _package_relpath(package, options)
+            add_package_result(report, package.name, relpath, returns, message, stats)
+            if exchange:
+                export_cross_references(
+                    exchange, options.cross_reference_directory, package.name, returns, shard)
+            journal.record(
+                package.name, relpath, returns, message,
+                fingerprints[os.path.dirname(package.filename)],
+                hash_cross_references(options.cross_reference_directory, package.name)
+                if returns == 0 else {},
+                {
+                    name: journal.cross_reference_hashes(
+                        options.cross_reference_directory, name)
+                    for name in sorted(workspace_dependencies[package.filename])
+                } if returns == 0 else {})
+            with progress.suspended():
+                if returns != 0:
+                    logger_scan.warning(f'{package.name} ({packages_done}/{packages_total})'
+                                        f' returned {returns}: {message}')
+                    failed_packages.append((package, returns, message))
+                else:
+                    logger_scan.info(
+                        f'{package.name} successful ({packages_done}/{packages_total})')
+    except BaseException as e:  # noqa: B902
+        logger_scan.error(f'Unexpected error in scan: {type(e).__name__ + " " + str(e)}')
+        print(traceback.format_exc())
+    progress.stop()
+    admission.save()
+    write_scan_report(options.output_directory, report)
+    update_rollup(options.output_directory, [p.name for p in packages])
+    if options.output_format == DEFAULT_OUTPUT_FORMAT:
+        update_search_index(options.output_directory)
     logger_scan.info('Finished')
     # I'd prefer close() then join() but that seems to sometimes hang.
     pool.terminate()
@@ -142,16 +400,47 @@ def main_impl(options):
         print('All packages succeeded')
 
 
+def _package_relpath(package, options):
+    return os.path.relpath(os.path.dirname(package.filename), options.package_path)
+
+
+def _find_lost_packages(running, running_pids, lost):
+    """Return the running packages whose worker exited more than the grace period ago."""
+    now = time.time()
+    lost_packages = []
+    for path, package in running.items():
+        pid = running_pids.get(package.name)
+        if pid is None:
+            continue
+        try:
+            os.kill(pid, 0)
+            continue
+        except ProcessLookupError:
+            pass
+        except OSError:
+            continue
+        if now - lost.setdefault(path, now) > LOST_WORKER_GRACE_PERIOD:
+            lost_packages.append(package)
+    return lost_packages
+
+
+def _package_error(package, results, e):
+    """Report a package whose worker failed outside of package_impl(), like a dead worker."""
+    results.put((package, 3, type(e).__name__ + ' ' + str(e), {}))
+
+
 def _clocktime():
     return time.strftime('%H:%M:%S')
 
 
 def package_impl(package_options):
     """Execute for a single function."""
-    (package, options) = package_options
+    (package, options, yaml_extend_overrides) = package_options
     options = Struct(**options.__dict__)
+    options.yaml_extend_overrides = yaml_extend_overrides
     package_path = os.path.dirname(package.filename)
     options.package_path = package_path
+    options.metrics_callback = functools.partial(report_metrics, package.name)
     return_value = 100
     message = 'Unknown error'
     start = time.time()
@@ -164,10 +453,16 @@ def package_impl(package_options):
         os.kill(os.getpid(), signal.SIGINT)
     threading.Thread(target=watchdog, daemon=True).start()
 
+    def terminate(signum, frame):
+        """Unwind on SIGTERM from the pool, so that running tools are stopped."""
+        raise SystemExit(f'Terminated by signal {signum}')
+    signal.signal(signal.SIGTERM, terminate)
+
     # Generate the doc build directory.
     os.makedirs(options.doc_build_directory, exist_ok=True)
 
     print(f'{_clocktime()} Begin processing {package.name}', flush=True)
+    report_progress('start', package.name)
     # remap output
     outfile = open(os.path.join(options.doc_build_directory, f'{package.name}.txt'), 'w')
     old_stdout = sys.stdout
@@ -181,8 +476,8 @@ def package_impl(package_options):
     logger.info(f'Processing package build at {package_path}')
 
     try:
-        # run rosdoc2 for the package
-        build_main_impl(options)
+        # run rosdoc2 for the package, which was already parsed during discovery
+        build_main_impl(options, package=package)
         return_value = 0
         message = 'OK'
     except RuntimeError as e:
@@ -211,4 +506,10 @@ def package_impl(package_options):
                         f'in {elapsed_time} seconds')
         if not outfile.closed:
             outfile.close()
-        return (package, return_value, message)
+        report_progress('end', package.name)
+        stats = {
+            'duration': round(time.time() - start, 3),
+            'peak_rss': own_peak_rss(),
+            'metrics': read_metrics(options, package.name),
+        }
+        return (package, return_value, message, stats)
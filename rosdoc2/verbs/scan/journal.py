@@ -0,0 +1,192 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Journal of the package results of scans, used to resume an interrupted scan."""
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import importlib.metadata
+import json
+import logging
+import os
+import time
+
+from rosdoc2.verbs.build.archive_output import package_output_exists
+from rosdoc2.verbs.build.package_survey import PackageSurvey
+
+logger_scan = logging.getLogger('rosdoc2.scan')
+
+JOURNAL_FILENAME = 'scan_journal.jsonl'
+JOURNAL_VERSION = 2
+# Fingerprinting is dominated by file system latency, not CPU.
+FINGERPRINT_THREADS = 16
+
+
+def _file_sha256(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def build_settings(options):
+    """Return the options of a scan which change the documentation of every package."""
+    settings = {
+        'rosdoc2': importlib.metadata.version('rosdoc2'),
+        'base_url': options.base_url,
+        'breathe_member_limit': options.breathe_member_limit,
+        'output_format': options.output_format,
+        'output_profile': options.output_profile,
+        'yaml_extend': None,
+    }
+    if options.yaml_extend and os.path.isfile(options.yaml_extend):
+        settings['yaml_extend'] = _file_sha256(options.yaml_extend)
+    return settings
+
+
+def input_fingerprint(package_directory, excluded_paths, settings):
+    """
+    Return a hash of the inputs of the documentation of a package.
+
+    The hash covers the path, size and modification time of every file in the package
+    directory, and the settings from build_settings(). Python bytecode is ignored, since
+    importing the package while documenting it may write it.
+    """
+    survey = PackageSurvey(package_directory, excluded_paths=excluded_paths)
+    sha256 = hashlib.sha256(json.dumps(settings, sort_keys=True).encode())
+    for relpath, entry in sorted(survey.files.items()):
+        if '__pycache__' in relpath.split(os.sep) or relpath.endswith('.pyc'):
+            continue
+        sha256.update(f'{relpath}\0{entry.size}\0{entry.mtime}\n'.encode())
+    return sha256.hexdigest()
+
+
+def input_fingerprints(package_directories, excluded_paths, settings):
+    """Return a map of package directory to input_fingerprint(), computed concurrently."""
+    with ThreadPoolExecutor(max_workers=FINGERPRINT_THREADS) as executor:
+        fingerprints = executor.map(
+            lambda d: input_fingerprint(d, excluded_paths, settings), package_directories)
+        return dict(zip(package_directories, fingerprints))
+
+
+def hash_cross_references(cross_reference_directory, package_name):
+    """Return a map of each cross reference file of a package to its sha256."""
+    package_directory = os.path.join(cross_reference_directory, package_name)
+    hashes = {}
+    for root, _, files in os.walk(package_directory):
+        for file in files:
+            path = os.path.join(root, file)
+            hashes[os.path.relpath(path, package_directory)] = _file_sha256(path)
+    return hashes
+
+
+class ScanJournal:
+    """
+    Append only log of the result of each package of a scan.
+
+    Every result is written, and synced to disk, as soon as it is known, so that the journal
+    survives the scan being interrupted or killed. The latest entry of a package counts.
+    """
+
+    def __init__(self, path):
+        """Open the journal at path, reading any entries of earlier scans."""
+        self.path = path
+        # Map of relative package path to its latest entry.
+        self.entries = {}
+        # Map of (cross reference directory, package name) to hash_cross_references(), since
+        # the cross references of a dependency are compared for each of its dependents.
+        self._cross_reference_hashes = {}
+        if os.path.isfile(path):
+            self._read()
+
+    def cross_reference_hashes(self, cross_reference_directory, package_name):
+        """Return hash_cross_references() of a package, computed once until it is recorded."""
+        key = (cross_reference_directory, package_name)
+        if key not in self._cross_reference_hashes:
+            self._cross_reference_hashes[key] = \
+                hash_cross_references(cross_reference_directory, package_name)
+        return self._cross_reference_hashes[key]
+
+    def _read(self):
+        with open(self.path, 'r') as f:
+            for line_number, line in enumerate(f, start=1):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Most likely the last line, from a scan killed while writing it.
+                    logger_scan.warning(
+                        f"Ignoring invalid line {line_number} of the scan journal '{self.path}'")
+                    continue
+                if entry.get('version') == JOURNAL_VERSION:
+                    self.entries[entry['path']] = entry
+
+    def record(self, package_name, relpath, return_code, message, fingerprint, cross_references,
+               dependency_cross_references):
+        """
+        Append the result of a package to the journal.
+
+        :param str relpath: path of the package relative to the scanned directory
+        :param str fingerprint: input_fingerprint() of the package before it was built
+        :param dict cross_references: hash_cross_references() of the package after it was built
+        :param dict dependency_cross_references: map of the name of each dependency in the
+            workspace to its hash_cross_references(), which the package was built against
+        """
+        entry = {
+            'version': JOURNAL_VERSION,
+            'package': package_name,
+            'path': relpath,
+            'return_code': return_code,
+            'message': message,
+            'input_fingerprint': fingerprint,
+            'cross_references': cross_references,
+            'dependency_cross_references': dependency_cross_references,
+            'time': time.time(),
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry, sort_keys=True) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.entries[relpath] = entry
+        # The package was built again, so its cross references may have changed.
+        for key in [key for key in self._cross_reference_hashes if key[1] == package_name]:
+            del self._cross_reference_hashes[key]
+
+    def has_failed(self, relpath):
+        """Return True if the latest result of the package at relpath is a failure."""
+        entry = self.entries.get(relpath)
+        return entry is not None and entry['return_code'] != 0
+
+    def is_up_to_date(self, relpath, fingerprint, output_directory, cross_reference_directory):
+        """
+        Return True if the package at relpath succeeded with the same inputs before.
+
+        The documentation of the package must still be in the output directory, and its
+        cross reference files must be unchanged, since other packages are built against them.
+        The cross reference files of its dependencies must be unchanged too, since its links
+        were resolved against them.
+        """
+        entry = self.entries.get(relpath)
+        if entry is None or entry['return_code'] != 0:
+            return False
+        if entry['input_fingerprint'] != fingerprint:
+            return False
+        if not package_output_exists(output_directory, entry['package']):
+            return False
+        packages = {entry['package']: entry['cross_references']}
+        packages.update(entry['dependency_cross_references'])
+        return all(
+            hashes == self.cross_reference_hashes(cross_reference_directory, name)
+            for name, hashes in packages.items())
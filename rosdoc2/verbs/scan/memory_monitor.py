@@ -0,0 +1,240 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Memory aware admission of packages into the scan workers."""
+
+import json
+import logging
+import os
+
+logger_scan = logging.getLogger('rosdoc2.scan')
+
+MIB = 1024 * 1024
+DEFAULT_MEMORY_RESERVE_MIB = 1024
+# Predicted peak RSS of a package with no history, when no other package has finished yet.
+DEFAULT_PREDICTED_RSS = 512 * MIB
+# Hold back new packages while processes stalled on memory more than this percentage of the
+# last 10 seconds, as reported by the pressure stall information of the kernel.
+MEMORY_PRESSURE_THRESHOLD = 10.0
+
+try:
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def available_memory():
+    """Return MemAvailable from /proc/meminfo in bytes, or None if it is not available."""
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def memory_pressure():
+    """Return the 'some avg10' memory pressure percentage, or None if it is not available."""
+    try:
+        with open('/proc/pressure/memory', 'r') as f:
+            for line in f:
+                fields = line.split()
+                if fields and fields[0] == 'some':
+                    return float(dict(field.split('=') for field in fields[1:])['avg10'])
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def process_tree_rss(pids):
+    """
+    Return the total resident memory of each process in pids and all of its descendants.
+
+    :param list[int] pids: the root processes
+    :return: dict of pid to bytes, omitting processes which no longer exist
+    """
+    children = {}
+    rss = {}
+    try:
+        proc_entries = os.listdir('/proc')
+    except OSError:
+        return {}
+    for entry in proc_entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                # The command name is in parentheses and may contain spaces.
+                fields = f.read().rsplit(')', 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        pid = int(entry)
+        children.setdefault(int(fields[1]), []).append(pid)
+        rss[pid] = int(fields[21]) * _PAGE_SIZE
+    totals = {}
+    for root in pids:
+        if root not in rss:
+            continue
+        total = 0
+        pending = [root]
+        while pending:
+            pid = pending.pop()
+            total += rss.get(pid, 0)
+            pending.extend(children.get(pid, []))
+        totals[root] = total
+    return totals
+
+
+def own_peak_rss():
+    """Return the peak RSS in bytes of this process and of its largest child, or None."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak += resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux, but in bytes on macOS.
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+class AdmissionController:
+    """
+    Decide when the next package may start, based on the memory available.
+
+    A package is admitted if its predicted peak RSS, plus the memory that the running
+    packages are still expected to grow by, fits into the available memory minus a reserve.
+    Packages predicted to need more than a fair share of the memory are large, and only one
+    large package runs at a time. While the kernel reports memory pressure, no package is
+    admitted. A package is always admitted when nothing else is running.
+
+    Peak RSS of each package is kept in history_path, to predict the next scan.
+    On systems without /proc/meminfo, every package is admitted immediately.
+    """
+
+    def __init__(self, workers, reserve, *, history_path=None):
+        """
+        Create the controller.
+
+        :param int workers: maximum number of packages running at once
+        :param int reserve: bytes of memory to leave unused
+        :param str history_path: file used to store package peak RSS between scans
+        """
+        self.workers = max(1, workers)
+        self.reserve = reserve
+        self.history_path = history_path
+        self.enabled = available_memory() is not None
+        self.history = self._load_history()
+        # Map of package name to the highest RSS seen in this scan.
+        self.peaks = {}
+        self.finished = set()
+        self._held = None
+
+    def _load_history(self):
+        if not self.history_path or not os.path.isfile(self.history_path):
+            return {}
+        try:
+            with open(self.history_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger_scan.debug(f"Ignoring unreadable memory history '{self.history_path}': {e}")
+            return {}
+
+    def save(self):
+        """Save the peak RSS of the packages of this scan to the history."""
+        if not self.history_path or not self.peaks:
+            return
+        history = dict(self.history)
+        history.update(self.peaks)
+        try:
+            with open(self.history_path, 'w') as f:
+                json.dump(history, f, indent=0, sort_keys=True)
+        except OSError as e:
+            logger_scan.warning(f"Unable to save memory history '{self.history_path}': {e}")
+
+    def record_peak(self, package_name, peak_rss):
+        """Record a RSS in bytes of a package, sampled while it runs."""
+        if peak_rss:
+            self.peaks[package_name] = max(self.peaks.get(package_name, 0), int(peak_rss))
+
+    def package_done(self, package_name, peak_rss=None):
+        """Record that a package finished, with the peak RSS measured by its worker."""
+        self.record_peak(package_name, peak_rss)
+        self.finished.add(package_name)
+
+    def predicted_rss(self, package_name):
+        """Return the expected peak RSS of a package in bytes."""
+        if package_name in self.history:
+            estimate = self.history[package_name]
+        else:
+            known = [self.peaks[name] for name in self.finished if name in self.peaks]
+            known = known or list(self.history.values())
+            estimate = sum(known) / len(known) if known else DEFAULT_PREDICTED_RSS
+        # A running package may already have exceeded its estimate.
+        return max(estimate, self.peaks.get(package_name, 0))
+
+    def is_large(self, package_name, total_memory):
+        """Return True if the package is expected to need more than its share of memory."""
+        return self.predicted_rss(package_name) > total_memory / self.workers
+
+    def choose(self, pending_names, running_pids):
+        """
+        Choose the next package to start.
+
+        :param list[str] pending_names: names of the packages waiting to start, in order
+        :param dict running_pids: map of the name of each running package to the pid of its
+            worker, or None if the worker has not reported it yet
+        :return: index into pending_names of the package to start, or None to wait
+        """
+        if not pending_names:
+            return None
+        if not self.enabled or not running_pids:
+            return 0
+        available = available_memory()
+        if available is None:
+            return 0
+        pressure = memory_pressure()
+        if pressure is not None and pressure > MEMORY_PRESSURE_THRESHOLD:
+            self._hold(pending_names[0], f'memory pressure is {pressure:.1f}%')
+            return None
+
+        # Running packages are expected to keep growing up to their predicted peak.
+        current = process_tree_rss([pid for pid in running_pids.values() if pid])
+        growth = 0
+        for name, pid in running_pids.items():
+            rss = current.get(pid, 0)
+            self.record_peak(name, rss)
+            growth += max(self.predicted_rss(name) - rss, 0)
+        budget = available - self.reserve - growth
+        total_memory = available + sum(current.values())
+        large_running = any(self.is_large(name, total_memory) for name in running_pids)
+
+        for index, name in enumerate(pending_names):
+            if self.is_large(name, total_memory) and large_running:
+                continue
+            if self.predicted_rss(name) <= budget:
+                self._held = None
+                return index
+        self._hold(
+            pending_names[0],
+            f'{budget / MIB:.0f} MiB available for a package expected to need '
+            f'{self.predicted_rss(pending_names[0]) / MIB:.0f} MiB')
+        return None
+
+    def _hold(self, package_name, reason):
+        # Only log when the reason for waiting changes, not on every poll.
+        if self._held != package_name:
+            self._held = package_name
+            logger_scan.info(f'Holding back {package_name}: {reason}')
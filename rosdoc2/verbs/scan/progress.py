@@ -0,0 +1,370 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Live progress reporting for scan."""
+
+import contextlib
+import json
+import logging
+import multiprocessing as mp
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+
+logger_scan = logging.getLogger('rosdoc2.scan')
+
+# Packages running longer than this fraction of the timeout are flagged.
+NEAR_TIMEOUT_FRACTION = 0.8
+# Seconds between updates of the status line on a terminal.
+TTY_REFRESH_INTERVAL = 1.0
+DEFAULT_PROGRESS_INTERVAL = 30.0  # Seconds
+
+# The queue that workers report their progress to, set by init_worker().
+_worker_queue = None
+
+
+def init_worker(progress_queue):
+    """Initialize a scan worker process, used as the initializer of the pool."""
+    global _worker_queue
+    _worker_queue = progress_queue
+
+
+def report_progress(event, package_name):
+    """
+    Report that a scan worker has started or ended a package.
+
+    :param str event: 'start' or 'end'
+    :param str package_name: name of the package
+    """
+    if _worker_queue is None:
+        return
+    try:
+        _worker_queue.put((event, package_name, os.getpid(), time.time()))
+    except (OSError, ValueError):
+        # Progress is informational only, never fail the build because of it.
+        pass
+
+
+def report_metrics(package_name, section, values):
+    """
+    Report metrics which a scan worker recorded while building a package.
+
+    Used as the metrics_callback of the build options, see record_metrics().
+    """
+    if _worker_queue is None:
+        return
+    try:
+        _worker_queue.put(('metrics', package_name, os.getpid(), time.time(), (section, values)))
+    except (OSError, ValueError):
+        pass
+
+
+def format_duration(seconds):
+    """Format a duration in seconds like 1h02m, 3m05s or 42s."""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f'{seconds // 3600}h{seconds % 3600 // 60:02d}m'
+    if seconds >= 60:
+        return f'{seconds // 60}m{seconds % 60:02d}s'
+    return f'{seconds}s'
+
+
+class ProgressReporter:
+    """
+    Collect progress events from the scan workers and periodically report the status.
+
+    On a terminal, a status line is redrawn every TTY_REFRESH_INTERVAL seconds. Otherwise a
+    status line is logged every interval seconds, so that logs of unattended runs show
+    progress without being flooded.
+
+    The duration of each package is saved in history_path, if given, and used to estimate
+    the remaining time of later scans.
+    """
+
+    def __init__(
+        self, package_names, workers, timeout, *, interval=DEFAULT_PROGRESS_INTERVAL,
+        history_path=None, stream=None,
+    ):
+        """
+        Create a reporter, which does nothing until start() is called.
+
+        :param list[str] package_names: names of all packages to be processed
+        :param int workers: number of worker processes
+        :param float timeout: the per package timeout in seconds
+        :param float interval: seconds between status lines when not on a terminal
+        :param str history_path: file used to store package durations between scans
+        :param stream: stream to report to, defaults to sys.stderr
+        """
+        self.package_names = list(package_names)
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.interval = interval
+        self.history_path = history_path
+        self.stream = stream if stream is not None else sys.stderr
+        self.is_tty = self.stream.isatty()
+        self.queue = mp.Queue()
+
+        self.history = self._load_history()
+        # Map of worker slot to (package name, pid, start time).
+        self.active = {}
+        # Map of package name to duration in seconds, for packages finished in this scan.
+        self.durations = {}
+        self.started = set()
+        self.finished = set()
+        self.flagged = set()
+        # Map of package name to the number of Doxygen members it hands to breathe.
+        self.workloads = {}
+        # Map of package name to the number of C/C++ headers it gives to Doxygen.
+        self.header_counts = {}
+        self.start_time = time.time()
+
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._status_shown = False
+
+    def _load_history(self):
+        if not self.history_path or not os.path.isfile(self.history_path):
+            return {}
+        try:
+            with open(self.history_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger_scan.debug(f"Ignoring unreadable scan history '{self.history_path}': {e}")
+            return {}
+
+    def _save_history(self):
+        if not self.history_path or not self.durations:
+            return
+        history = dict(self.history)
+        history.update({name: round(d, 3) for name, d in self.durations.items()})
+        try:
+            with open(self.history_path, 'w') as f:
+                json.dump(history, f, indent=0, sort_keys=True)
+        except OSError as e:
+            logger_scan.warning(f"Unable to save scan history '{self.history_path}': {e}")
+
+    def start(self):
+        """Start consuming events from the workers, and reporting unless interval is 0."""
+        self.start_time = time.time()
+        targets = [self._consume_events]
+        if self.interval > 0:
+            targets.append(self._report_periodically)
+        for target in targets:
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Stop reporting, and save the package durations."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._drain_events()
+        with self._lock:
+            self._clear_status()
+        self._save_history()
+
+    def handle_event(self, event, package_name, pid, event_time, data=None):
+        """Record an event reported by a worker with report_progress() or report_metrics()."""
+        with self._lock:
+            if package_name in self.finished:
+                # The result overtook the events of the worker, see package_done().
+                return
+            if event == 'metrics':
+                self._handle_metrics(package_name, event_time, *data)
+                return
+            if event == 'start':
+                self.started.add(package_name)
+                slot = min(set(range(len(self.active) + 1)) - set(self.active))
+                self.active[slot] = (package_name, pid, event_time)
+            elif event == 'end':
+                for slot, (name, _, start) in list(self.active.items()):
+                    if name == package_name:
+                        self.durations[package_name] = event_time - start
+                        del self.active[slot]
+
+    def _handle_metrics(self, package_name, event_time, section, values):
+        if section == 'doxygen_input':
+            self.header_counts[package_name] = values['headers']
+            return
+        if section != 'doxygen_xml':
+            return
+        members = values['members']
+        self.workloads[package_name] = members
+        rate = self._seconds_per_member()
+        if rate is None or not self.timeout or values.get('breathe_disabled_by_limit'):
+            return
+        start = next(
+            (start for name, _, start in self.active.values() if name == package_name),
+            event_time)
+        expected = event_time - start + members * rate
+        if expected > self.timeout and package_name not in self.flagged:
+            self.flagged.add(package_name)
+            self._clear_status()
+            logger_scan.warning(
+                f'{package_name} hands {members} Doxygen members to breathe, and is expected '
+                f'to take {format_duration(expected)}, more than the timeout of '
+                f'{format_duration(self.timeout)}')
+
+    def _seconds_per_member(self):
+        """Return the seconds per Doxygen member of the finished packages, or None."""
+        return self._seconds_per_unit(self.workloads)
+
+    def _seconds_per_header(self):
+        """Return the seconds per C/C++ header of the finished packages, or None."""
+        return self._seconds_per_unit(self.header_counts)
+
+    def _seconds_per_unit(self, counts):
+        measured = [
+            (self.durations[name], count) for name, count in counts.items()
+            if name in self.durations and count > 0
+        ]
+        if not measured:
+            return None
+        return sum(d for d, _ in measured) / sum(c for _, c in measured)
+
+    def package_done(self, package_name):
+        """Record that the result of a package was received by the scan."""
+        with self._lock:
+            self.finished.add(package_name)
+            # The end event may still be queued, or never be sent if the worker died.
+            for slot, (name, _, start) in list(self.active.items()):
+                if name == package_name:
+                    self.durations.setdefault(package_name, time.time() - start)
+                    del self.active[slot]
+
+    def running_pids(self):
+        """Return a map of the name of each running package to the pid of its worker."""
+        with self._lock:
+            return {name: pid for name, pid, _ in self.active.values()}
+
+    @contextlib.contextmanager
+    def suspended(self):
+        """Clear the status line while other output is written."""
+        with self._lock:
+            self._clear_status()
+            yield
+
+    def _drain_events(self):
+        while True:
+            try:
+                self.handle_event(*self.queue.get_nowait())
+            except queue.Empty:
+                return
+            except (OSError, ValueError):
+                return
+
+    def _consume_events(self):
+        while not self._stop.is_set():
+            try:
+                self.handle_event(*self.queue.get(timeout=0.2))
+            except queue.Empty:
+                continue
+            except (EOFError, OSError, ValueError):
+                return
+
+    def _report_periodically(self):
+        interval = TTY_REFRESH_INTERVAL if self.is_tty else self.interval
+        while not self._stop.wait(interval):
+            self.report()
+
+    def _estimate(self, package_name):
+        """Return the expected duration of a package in seconds, or None if unknown."""
+        if package_name in self.history:
+            return self.history[package_name]
+        rate = self._seconds_per_member()
+        if package_name in self.workloads and rate is not None:
+            return self.workloads[package_name] * rate
+        # The header count is known as soon as a package starts, before Doxygen runs.
+        rate = self._seconds_per_header()
+        if self.header_counts.get(package_name) and rate is not None:
+            return self.header_counts[package_name] * rate
+        known = list(self.durations.values()) or list(self.history.values())
+        if not known:
+            return None
+        return sum(known) / len(known)
+
+    def eta(self, now=None):
+        """Return the estimated seconds until the scan completes, or None if unknown."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            remaining = 0.0
+            for name in self.package_names:
+                if name in self.started or name in self.finished:
+                    continue
+                estimate = self._estimate(name)
+                if estimate is None:
+                    return None
+                remaining += estimate
+            for name, _, start in self.active.values():
+                estimate = self._estimate(name)
+                if estimate is None:
+                    return None
+                remaining += max(estimate - (now - start), 0.0)
+        return remaining / self.workers
+
+    def status_line(self, now=None):
+        """Return a one line summary of the progress of the scan."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            done = len(self.finished)
+            elapsed = now - self.start_time
+            rate = done / (elapsed / 60) if elapsed > 0 else 0.0
+            eta = self.eta(now)
+            eta_text = format_duration(eta) if eta is not None else 'unknown'
+            parts = [
+                f'[{done}/{len(self.package_names)}] {rate:.1f} packages/min, '
+                f'elapsed {format_duration(elapsed)}, ETA {eta_text}'
+            ]
+            for slot in sorted(self.active):
+                name, _, start = self.active[slot]
+                running = now - start
+                flag = ' (near timeout)' if self._is_near_timeout(running) else ''
+                parts.append(f'#{slot} {name} {format_duration(running)}{flag}')
+        return ' | '.join(parts)
+
+    def _is_near_timeout(self, running):
+        return bool(self.timeout) and running >= NEAR_TIMEOUT_FRACTION * self.timeout
+
+    def report(self):
+        """Report the current status, and warn about packages approaching the timeout."""
+        now = time.time()
+        with self._lock:
+            for name, _, start in list(self.active.values()):
+                running = now - start
+                if name not in self.flagged and self._is_near_timeout(running):
+                    self.flagged.add(name)
+                    self._clear_status()
+                    logger_scan.warning(
+                        f'{name} has been running for {format_duration(running)}, '
+                        f'approaching the timeout of {format_duration(self.timeout)}')
+            line = self.status_line(now)
+            if self.is_tty:
+                width = shutil.get_terminal_size().columns
+                self.stream.write('\r\x1b[K' + line[:max(width - 1, 0)])
+                self.stream.flush()
+                self._status_shown = True
+            else:
+                logger_scan.info(line)
+
+    def _clear_status(self):
+        if self._status_shown:
+            self.stream.write('\r\x1b[K')
+            self.stream.flush()
+            self._status_shown = False
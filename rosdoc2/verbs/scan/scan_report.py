@@ -0,0 +1,67 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The machine readable report of a scan, written into its output directory."""
+
+import json
+import os
+
+SCAN_REPORT_FILENAME = 'scan_report.json'
+SCAN_REPORT_VERSION = 1
+
+
+def new_scan_report(shard=None):
+    """
+    Create an empty scan report.
+
+    :param tuple shard: tuple of (shard index, number of shards), or None if not sharded
+    """
+    return {
+        'version': SCAN_REPORT_VERSION,
+        'shard_count': shard[1] if shard else None,
+        'shards': [f'{shard[0]}/{shard[1]}'] if shard else [],
+        'packages': {},
+    }
+
+
+def add_package_result(report, package_name, relpath, return_code, message, stats):
+    """Add the result of one package to a scan report."""
+    report['packages'][package_name] = {
+        'path': relpath,
+        'return_code': return_code,
+        'message': message,
+        **stats,
+    }
+
+
+def write_scan_report(output_directory, report):
+    """Write a scan report into an output directory."""
+    os.makedirs(output_directory, exist_ok=True)
+    path = os.path.join(output_directory, SCAN_REPORT_FILENAME)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def read_scan_report(output_directory):
+    """Read the scan report of an output directory, or return None if there is none."""
+    path = os.path.join(output_directory, SCAN_REPORT_FILENAME)
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'r') as f:
+        report = json.load(f)
+    if report.get('version') != SCAN_REPORT_VERSION:
+        raise RuntimeError(
+            f"Error unsupported scan report version '{report.get('version')}' in '{path}'")
+    return report
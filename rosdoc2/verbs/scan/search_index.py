@@ -0,0 +1,366 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Search index of all packages in an output directory, merged from their Sphinx search indexes.
+
+The index is written to the _search directory of the output directory, with a search page,
+search.html, next to it:
+
+- index.json has the shards, and the packages with the stamp of the searchindex.js they were
+  read from.
+- docs/<package>.json lists the url, relative to the output directory, and the title of each
+  document of a package.
+- shards/<shard>.json maps each term of the shard to the packages it occurs in, each with the
+  indexes of its documents. A document whose title contains the term has the index -1 - i
+  instead of i.
+
+Terms are sharded by their first characters, with longer prefixes for the shards which would
+otherwise be larger than MAX_SHARD_BYTES, so that the search page only loads the shards which
+can hold the terms starting with, or started by, the words searched for. A shard holds the
+terms starting with its prefix which are not in a shard with a longer prefix.
+
+Only the packages whose searchindex.js changed are read again, and only the shards whose
+content changed are written.
+"""
+
+import json
+import logging
+import os
+import re
+
+logger_scan = logging.getLogger('rosdoc2.scan')
+
+SEARCH_DIRECTORY = '_search'
+SEARCH_PAGE = 'search.html'
+SEARCH_INDEX_VERSION = 1
+# Shards are split by longer prefixes until they are at most this large, if possible.
+MAX_SHARD_BYTES = 128 * 1024
+MAX_PREFIX_LENGTH = 4
+# Depth below a package output directory to look for the Sphinx searchindex.js.
+SEARCHINDEX_DEPTH = 2
+_SAFE_SHARD_NAME = re.compile(r'[a-z0-9_]+')
+
+
+def shard_filename(prefix):
+    """Return the file name of the shard of a prefix, hex encoded if it is not alphanumeric."""
+    if _SAFE_SHARD_NAME.fullmatch(prefix):
+        return prefix + '.json'
+    return 'x' + prefix.encode().hex() + '.json'
+
+
+def _dumps(data):
+    return json.dumps(data, separators=(',', ':'), sort_keys=True, ensure_ascii=False)
+
+
+def _write_if_changed(path, content):
+    """Write content to path, unless it already has that content, and return True if written."""
+    encoded = content.encode()
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == encoded:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(encoded)
+    os.replace(path + '.tmp', path)
+    return True
+
+
+def find_searchindex(package_output_directory):
+    """Return the path of the searchindex.js relative to a package output directory, or None."""
+    for root, dirs, files in os.walk(package_output_directory):
+        relroot = os.path.relpath(root, package_output_directory)
+        depth = 0 if relroot == '.' else relroot.count(os.sep) + 1
+        if 'searchindex.js' in files:
+            return os.path.normpath(os.path.join(relroot, 'searchindex.js'))
+        if depth >= SEARCHINDEX_DEPTH:
+            dirs[:] = []
+        else:
+            # The Sphinx output is not in its static or image directories.
+            dirs[:] = sorted(d for d in dirs if not d.startswith('_'))
+    return None
+
+
+def read_searchindex(path):
+    """
+    Read a Sphinx searchindex.js.
+
+    :return: tuple of (list of (docname, title), dict of lower case term to a set of document
+        indexes, with -1 - i for title matches)
+    :raises ValueError: if the file is not a JSON search index
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    index = json.loads(content[content.index('(') + 1:content.rindex(')')])
+    docs = list(zip(index['docnames'], index['titles']))
+    terms = {}
+    for key, encode in (('terms', lambda i: i), ('titleterms', lambda i: -1 - i)):
+        for term, documents in index.get(key, {}).items():
+            if isinstance(documents, int):
+                documents = [documents]
+            terms.setdefault(term.lower(), set()).update(encode(i) for i in documents)
+    return docs, terms
+
+
+def _shard(terms, prefix_length=1, prefix=''):
+    """
+    Split a map of term to postings into shards.
+
+    :return: dict of shard prefix to its map of term to postings
+    """
+    groups = {}
+    remaining = {}
+    for term, postings in terms.items():
+        if len(term) >= prefix_length:
+            groups.setdefault(term[:prefix_length], {})[term] = postings
+        else:
+            remaining[term] = postings
+    shards = {prefix: remaining} if remaining else {}
+    for group_prefix, group in groups.items():
+        if prefix_length < MAX_PREFIX_LENGTH and len(_dumps(group)) > MAX_SHARD_BYTES:
+            shards.update(_shard(group, prefix_length + 1, group_prefix))
+        else:
+            shards[group_prefix] = group
+    return shards
+
+
+def _read_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as e:
+        logger_scan.warning(f"Rebuilding the search index, '{path}' is unreadable: {e}")
+        return None
+
+
+def _package_stamps(output_directory, known):
+    """Return a map of package name to (searchindex relative path, [size, mtime_ns])."""
+    stamps = {}
+    if not os.path.isdir(output_directory):
+        return stamps
+    for name in sorted(os.listdir(output_directory)):
+        package_directory = os.path.join(output_directory, name)
+        if name == SEARCH_DIRECTORY or not os.path.isdir(package_directory):
+            continue
+        relpath = known.get(name, {}).get('searchindex')
+        if relpath is None or not os.path.isfile(os.path.join(package_directory, relpath)):
+            relpath = find_searchindex(package_directory)
+        if relpath is None:
+            continue
+        stat = os.stat(os.path.join(package_directory, relpath))
+        stamps[name] = (relpath, [stat.st_size, stat.st_mtime_ns])
+    return stamps
+
+
+def update_search_index(output_directory):
+    """
+    Update the search index of an output directory for the packages whose search index changed.
+
+    :return: the names of the packages which were read again or removed
+    """
+    search_directory = os.path.join(output_directory, SEARCH_DIRECTORY)
+    index_path = os.path.join(search_directory, 'index.json')
+    index = _read_json(index_path, {})
+    if index is None or index.get('version') != SEARCH_INDEX_VERSION:
+        index = {}
+    packages = index.get('packages', {})
+    stamps = _package_stamps(output_directory, packages)
+    changed = sorted(
+        name for name, (relpath, stamp) in stamps.items()
+        if packages.get(name, {}).get('stamp') != stamp)
+    removed = sorted(set(packages) - set(stamps))
+    if not changed and not removed and os.path.isfile(index_path):
+        return []
+
+    # Collect the postings of the packages which are unchanged from the existing shards.
+    terms = {}
+    kept = set(packages) - set(changed) - set(removed)
+    for filename in set(index.get('shards', {}).values()):
+        shard = _read_json(os.path.join(search_directory, 'shards', filename), {})
+        if shard is None:
+            # Read every package again.
+            kept = set()
+            terms = {}
+            changed = sorted(stamps)
+            break
+        for term, postings in shard.items():
+            for name, documents in postings.items():
+                if name in kept:
+                    terms.setdefault(term, {})[name] = documents
+    packages = {name: entry for name, entry in packages.items() if name in kept}
+
+    for name in changed:
+        relpath, stamp = stamps[name]
+        try:
+            docs, package_terms = read_searchindex(os.path.join(output_directory, name, relpath))
+        except (OSError, ValueError, KeyError) as e:
+            logger_scan.warning(f"Leaving '{name}' out of the search index: {e}")
+            continue
+        root = os.path.dirname(relpath).replace(os.sep, '/')
+        _write_if_changed(
+            os.path.join(search_directory, 'docs', f'{name}.json'),
+            _dumps([
+                ['/'.join(part for part in (name, root, docname + '.html') if part), title]
+                for docname, title in docs
+            ]))
+        for term, documents in package_terms.items():
+            terms.setdefault(term, {})[name] = sorted(documents)
+        packages[name] = {'searchindex': relpath, 'stamp': stamp, 'docs': len(docs)}
+    for name in removed:
+        docs_path = os.path.join(search_directory, 'docs', f'{name}.json')
+        if os.path.exists(docs_path):
+            os.remove(docs_path)
+
+    shards = _shard(terms)
+    shard_filenames = {prefix: shard_filename(prefix) for prefix in shards}
+    written = 0
+    for prefix, shard in shards.items():
+        written += _write_if_changed(
+            os.path.join(search_directory, 'shards', shard_filenames[prefix]), _dumps(shard))
+    shards_directory = os.path.join(search_directory, 'shards')
+    os.makedirs(shards_directory, exist_ok=True)
+    for filename in set(os.listdir(shards_directory)) - set(shard_filenames.values()):
+        os.remove(os.path.join(shards_directory, filename))
+    _write_if_changed(index_path, _dumps({
+        'version': SEARCH_INDEX_VERSION,
+        'shards': shard_filenames,
+        'packages': packages,
+    }))
+    _write_if_changed(os.path.join(output_directory, SEARCH_PAGE), SEARCH_PAGE_HTML)
+    logger_scan.info(
+        f'Updated the search index for {len(changed)} changed and {len(removed)} removed '
+        f'packages, wrote {written} of {len(shards)} shards')
+    return changed + removed
+
+
+SEARCH_PAGE_HTML = """\
+<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Search all packages</title>
+<style>
+body { font-family: sans-serif; max-width: 50em; margin: 2em auto; }
+input { width: 100%; font-size: 1.2em; }
+.package { color: #666; }
+</style>
+</head>
+<body>
+<h1>Search all packages</h1>
+<form id="form"><input id="query" type="search" autofocus placeholder="Search"></form>
+<p id="status"></p>
+<ol id="results"></ol>
+<script>
+(function () {
+  var base = '""" + SEARCH_DIRECTORY + """/';
+  var index = fetch(base + 'index.json').then(function (r) { return r.json(); });
+  var cache = {};
+  function load(path) {
+    if (!(path in cache)) {
+      cache[path] = fetch(base + path).then(function (r) { return r.json(); });
+    }
+    return cache[path];
+  }
+  function shardFile(prefix) {
+    if (/^[a-z0-9_]+$/.test(prefix)) { return prefix + '.json'; }
+    var hex = '';
+    new TextEncoder().encode(prefix).forEach(function (b) {
+      hex += (b < 16 ? '0' : '') + b.toString(16);
+    });
+    return 'x' + hex + '.json';
+  }
+  // Score the documents matching a word. Terms are stems, so a term matches if it is the
+  // word, or the start of it, or the other way around. The terms starting with the word are
+  // in the shards of its prefixes, and in the shards of longer prefixes starting with it.
+  function searchWord(word, idx) {
+    var shards = Object.keys(idx.shards).filter(function (prefix) {
+      return word.startsWith(prefix) || prefix.startsWith(word);
+    }).map(function (prefix) { return load('shards/' + shardFile(prefix)); });
+    return Promise.all(shards).then(function (loaded) {
+      var scores = {};
+      loaded.forEach(function (shard) {
+        Object.keys(shard).forEach(function (term) {
+          var weight = term === word ? 3 : (word.startsWith(term) && term.length > 2) ||
+            term.startsWith(word) ? 1 : 0;
+          if (!weight) { return; }
+          Object.keys(shard[term]).forEach(function (pkg) {
+            shard[term][pkg].forEach(function (doc) {
+              var key = pkg + ' ' + (doc < 0 ? -1 - doc : doc);
+              scores[key] = Math.max(scores[key] || 0, weight * (doc < 0 ? 5 : 1));
+            });
+          });
+        });
+      });
+      return scores;
+    });
+  }
+  function search(query) {
+    var words = query.toLowerCase().split(/[^\\p{L}\\p{N}_]+/u).filter(Boolean);
+    var status = document.getElementById('status');
+    var results = document.getElementById('results');
+    results.innerHTML = '';
+    if (!words.length) { status.textContent = ''; return; }
+    status.textContent = 'Searching...';
+    index.then(function (idx) {
+      return Promise.all(words.map(function (w) { return searchWord(w, idx); }));
+    }).then(function (perWord) {
+      // Every word has to match.
+      var total = perWord[0];
+      perWord.slice(1).forEach(function (scores) {
+        Object.keys(total).forEach(function (key) {
+          if (key in scores) { total[key] += scores[key]; } else { delete total[key]; }
+        });
+      });
+      var keys = Object.keys(total).sort(function (a, b) { return total[b] - total[a]; });
+      status.textContent = keys.length + ' results';
+      var shown = keys.slice(0, 100);
+      var packages = Array.from(new Set(shown.map(function (k) { return k.split(' ')[0]; })));
+      return Promise.all(packages.map(function (p) { return load('docs/' + p + '.json'); }))
+        .then(function (docs) {
+          var byPackage = {};
+          packages.forEach(function (p, i) { byPackage[p] = docs[i]; });
+          shown.forEach(function (key) {
+            var parts = key.split(' ');
+            var doc = byPackage[parts[0]][parseInt(parts[1], 10)];
+            var item = document.createElement('li');
+            var link = document.createElement('a');
+            link.href = doc[0];
+            link.textContent = doc[1];
+            var pkg = document.createElement('span');
+            pkg.className = 'package';
+            pkg.textContent = ' (' + parts[0] + ')';
+            item.appendChild(link);
+            item.appendChild(pkg);
+            results.appendChild(item);
+          });
+        });
+    });
+  }
+  var input = document.getElementById('query');
+  document.getElementById('form').addEventListener('submit', function (e) {
+    e.preventDefault();
+    search(input.value);
+  });
+  var initial = new URLSearchParams(location.search).get('q');
+  if (initial) { input.value = initial; search(initial); }
+})();
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,160 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Split the packages of a scan into shards, which can be built on separate machines."""
+
+import os
+
+from rosdoc2.verbs.build.package_dependencies import package_dependencies
+
+
+def parse_shard(shard):
+    """
+    Parse a shard specification like '2/4', meaning the second of four shards.
+
+    :return: tuple of (shard index starting at 1, number of shards)
+    """
+    try:
+        index, count = (int(part) for part in shard.split('/'))
+    except ValueError:
+        raise RuntimeError(f"Error invalid shard '{shard}', expected the form I/N, like 2/4")
+    if count < 1 or not 1 <= index <= count:
+        raise RuntimeError(f"Error invalid shard '{shard}', I must be between 1 and N")
+    return (index, count)
+
+
+def _repository_of(relpath):
+    # Packages of one repository are usually released, and changed, together.
+    return relpath.split(os.sep)[0] if relpath != '.' else '.'
+
+
+def order_by_dependencies(packages):
+    """
+    Order packages so that each package comes after the packages it depends on.
+
+    Packages which are independent of each other are kept in name order. Dependency cycles
+    are broken in name order too.
+
+    :param list packages: catkin_pkg Package objects
+    :return: list of the packages
+    """
+    by_name = {}
+    for package in sorted(packages, key=lambda p: (p.name, p.filename)):
+        by_name.setdefault(package.name, []).append(package)
+    remaining = {
+        name: package_dependencies(group[0]) & set(by_name) - {name}
+        for name, group in by_name.items()
+    }
+    ordered = []
+    while remaining:
+        ready = sorted(name for name, depends in remaining.items() if not depends)
+        if not ready:
+            # A cycle, start with the first package of it.
+            ready = [min(remaining)]
+        for name in ready:
+            ordered.extend(by_name[name])
+            del remaining[name]
+        for depends in remaining.values():
+            depends.difference_update(ready)
+    return ordered
+
+
+def scan_dependencies(packages):
+    """
+    Return the dependencies of each package among the packages of a scan.
+
+    :param list packages: catkin_pkg Package objects
+    :return: map of package.xml path to the set of names of the packages it depends on
+    """
+    names = {package.name for package in packages}
+    return {
+        package.filename: package_dependencies(package) & names - {package.name}
+        for package in packages
+    }
+
+
+def waited_dependencies(packages):
+    """
+    Return the dependencies among all packages of a scan which each package waits for.
+
+    Like scan_dependencies(), except that dependency cycles are broken in the order of
+    order_by_dependencies(): a package only waits for the dependencies before it. So every
+    shard waits for the same packages, whatever it builds, and no packages wait for each
+    other.
+
+    :param list packages: catkin_pkg Package objects, of all shards
+    :return: map of package.xml path to the set of names of the packages it waits for
+    """
+    positions = {}
+    for position, package in enumerate(order_by_dependencies(packages)):
+        positions.setdefault(package.name, position)
+    dependencies = scan_dependencies(packages)
+    return {
+        package.filename: {
+            name for name in dependencies[package.filename]
+            if positions[name] < positions[package.name]}
+        for package in packages
+    }
+
+
+def ready_packages(pending, dependencies, finished_names, running, waiting=False):
+    """
+    Return the pending packages whose dependencies in the scan have all finished.
+
+    Dependencies which failed count as finished. If no package is ready and none is running,
+    the remaining packages depend on each other in a cycle, which is broken by returning the
+    first of them, unless packages are waiting for dependencies in other shards.
+
+    :param list pending: packages waiting to start, ordered by their dependencies
+    :param dict dependencies: the result of scan_dependencies()
+    :param set finished_names: names of the packages which finished
+    :param running: the packages which are running
+    :param bool waiting: True if dependencies in other shards have not finished yet
+    :return: list of the packages which may start, in the order of pending
+    """
+    ready = [p for p in pending if dependencies[p.filename] <= finished_names]
+    if not ready and pending and not running and not waiting:
+        ready = pending[:1]
+    return ready
+
+
+def select_shard(found_packages, index, count):
+    """
+    Select the packages of one shard.
+
+    Packages are grouped by the top level directory they are found in, which is normally
+    their repository, so that packages which refer to each other the most are built in the
+    same shard. Groups are assigned to the shard with the fewest packages, largest groups
+    first. The result only depends on the relative paths and names of the packages, so
+    every machine computes the same shards.
+
+    A package waits for its dependencies in other shards, see waited_dependencies(), and
+    gets their cross references through the shard exchange directory.
+
+    :param dict found_packages: map of relative package path to catkin_pkg Package
+    :param int index: the shard to select, starting at 1
+    :param int count: the number of shards
+    :return: list of the packages of the shard, ordered by their dependencies
+    """
+    groups = {}
+    for relpath, package in found_packages.items():
+        groups.setdefault(_repository_of(os.path.normpath(relpath)), []).append(package)
+    loads = [0] * count
+    selected = []
+    for name, group in sorted(groups.items(), key=lambda item: (-len(item[1]), item[0])):
+        shard = loads.index(min(loads))
+        loads[shard] += len(group)
+        if shard == index - 1:
+            selected.extend(group)
+    return order_by_dependencies(selected)
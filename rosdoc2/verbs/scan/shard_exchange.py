@@ -0,0 +1,105 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Exchange the cross references of packages between the shards of a scan.
+
+Every shard exports the cross references of each package it finished into a directory which
+all shards of the scan share, either directly or by synchronizing it between machines, for
+example with rsync. A package whose dependency is in another shard waits until the bundle of
+the dependency appears, and imports it into its own cross reference directory, so that the
+output of a shard does not depend on the order in which the shards run.
+
+The bundle of a package is the directory <exchange>/<package name>, with a copy of the cross
+reference directory of the package, and a bundle.json written last, which marks the bundle
+as complete. The exchange directory must be empty when a new scan starts.
+"""
+
+import json
+import logging
+import os
+import shutil
+
+logger_scan = logging.getLogger('rosdoc2.scan')
+
+BUNDLE_FILENAME = 'bundle.json'
+
+
+def export_cross_references(exchange_directory, cross_reference_directory, package_name,
+                            return_code, shard):
+    """
+    Export the cross references of a finished package into the exchange directory.
+
+    A package which failed is exported too, without cross references, so that the packages
+    depending on it do not wait for it forever.
+
+    :param int return_code: the return code of the package
+    :param tuple shard: (index, count) of the shard which built the package
+    """
+    bundle_directory = os.path.join(exchange_directory, package_name)
+    marker = os.path.join(bundle_directory, BUNDLE_FILENAME)
+    # Readers ignore the bundle while it is replaced.
+    if os.path.exists(marker):
+        os.remove(marker)
+    if os.path.isdir(bundle_directory):
+        shutil.rmtree(bundle_directory)
+    source = os.path.join(cross_reference_directory, package_name)
+    if return_code == 0 and os.path.isdir(source):
+        shutil.copytree(source, bundle_directory)
+    else:
+        os.makedirs(bundle_directory)
+    with open(marker + '.tmp', 'w') as f:
+        json.dump({
+            'package': package_name,
+            'return_code': return_code,
+            'shard': '/'.join(str(part) for part in shard),
+        }, f, sort_keys=True)
+    os.replace(marker + '.tmp', marker)
+
+
+def import_cross_references(exchange_directory, cross_reference_directory, package_name,
+                            shard_count):
+    """
+    Import the cross references of a package from the exchange directory, if it finished.
+
+    :param int shard_count: the number of shards of the scan
+    :return: the return code of the package, or None if its bundle is not complete yet
+    :raises RuntimeError: if the bundle was exported by a scan with another number of shards
+    """
+    bundle_directory = os.path.join(exchange_directory, package_name)
+    marker = os.path.join(bundle_directory, BUNDLE_FILENAME)
+    try:
+        with open(marker, 'r') as f:
+            bundle = json.load(f)
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        # Still being synchronized.
+        return None
+    if int(bundle['shard'].split('/')[1]) != shard_count:
+        raise RuntimeError(
+            f"Error the shard exchange directory '{exchange_directory}' has the package "
+            f"'{package_name}' of shard {bundle['shard']}, of another scan")
+    destination = os.path.join(cross_reference_directory, package_name)
+    if os.path.isdir(destination):
+        shutil.rmtree(destination)
+    try:
+        shutil.copytree(
+            bundle_directory, destination, ignore=shutil.ignore_patterns(BUNDLE_FILENAME + '*'))
+    except (OSError, shutil.Error) as e:
+        # The bundle is being exported again, try again later.
+        logger_scan.debug(f"Unable to import the cross references of '{package_name}': {e}")
+        shutil.rmtree(destination, ignore_errors=True)
+        return None
+    return bundle['return_code']
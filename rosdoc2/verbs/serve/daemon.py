@@ -0,0 +1,448 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A long running daemon which builds the documentation of packages on request.
+
+A build request is a JSON object with the 'args' of 'rosdoc2 build', and the 'cwd' they are
+relative to. On the Unix socket a request is sent as one line, over HTTP it is the body of a
+POST to /build, with the Content-Type application/json. The response is a stream of JSON
+lines: {"job": id, "deduplicated": bool} first, then {"log": line} for each line of the build
+log, and {"return_code": n, "message": text} last.
+
+Builds run in a pool of worker processes, which are reused for many builds, so that imports,
+the rosdistro distribution file and the cross reference location data are loaded once. A
+request identical to one which is queued is attached to it, instead of being built again. Once
+a build started, an identical request is queued again, as the package may have changed since.
+"""
+
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import multiprocessing as mp
+import os
+import queue
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+logger = logging.getLogger('rosdoc2.serve')
+
+# Seconds between checks of the log of a running build for new lines.
+LOG_POLL_INTERVAL = 0.2
+# Seconds between checks for builds whose worker process exited.
+LOST_WORKER_INTERVAL = 1.0
+# Seconds a build's worker has to be gone before the build fails, so that a result which was
+# sent just before the worker exited is still used.
+LOST_WORKER_GRACE_PERIOD = 5.0
+
+# Queue on which a worker reports the job id and its pid when it starts a build.
+_started_queue = None
+
+
+class _RequestArgumentParser(argparse.ArgumentParser):
+    """Argument parser which raises instead of exiting the daemon."""
+
+    def error(self, message):
+        raise RuntimeError(f'Error invalid build arguments: {message}')
+
+
+def parse_build_arguments(args):
+    """
+    Parse the arguments of a build request like 'rosdoc2 build' does.
+
+    :raises RuntimeError: if the arguments are invalid
+    """
+    from rosdoc2.verbs.build.impl import prepare_package_arguments
+    parser = _RequestArgumentParser(prog='rosdoc2 build', add_help=False)
+    prepare_package_arguments(parser)
+    return parser.parse_args(args)
+
+
+def warm_worker(started_queue):
+    """Import the builders and fetch the rosdistro distribution file, before the first build."""
+    global _started_queue
+    _started_queue = started_queue
+    # Interrupting the daemon stops the workers through the pool, not by interrupting them.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import rosdoc2.verbs.build.inspect_package_for_settings  # noqa: F401
+    from rosdoc2.verbs.build.rosdistro_cache import get_distribution_file
+    ros_distro = os.environ.get('ROS_DISTRO')
+    if ros_distro:
+        try:
+            get_distribution_file(ros_distro)
+        except Exception as e:  # noqa: B902
+            logger.warning(f"Unable to fetch the rosdistro distribution '{ros_distro}': {e}")
+
+
+def run_build_job(job_id, args, cwd, log_path):
+    """
+    Run a build in a worker process, with its output going to log_path.
+
+    :return: tuple of (return code, message), with the return codes of the scan verb
+    """
+    _started_queue.put((job_id, os.getpid()))
+    from rosdoc2.verbs.build.impl import main_impl
+    return_code = 100
+    message = 'Unknown error'
+    old_stdout = sys.stdout
+    old_stderr = sys.stderr
+    with open(log_path, 'a', buffering=1) as log:
+        sys.stdout = log
+        sys.stderr = log
+        logging.basicConfig(
+            format='[%(name)s] [%(levelname)s] %(message)s',
+            level=logging.INFO, stream=log, force=True)
+        try:
+            os.chdir(cwd)
+            main_impl(parse_build_arguments(args))
+            return_code = 0
+            message = 'OK'
+        except RuntimeError as e:
+            return_code = 1
+            message = type(e).__name__ + ' ' + str(e)
+        except BaseException as e:  # noqa: B902
+            return_code = 3
+            message = type(e).__name__ + ' ' + str(e)
+        finally:
+            sys.stdout = old_stdout
+            sys.stderr = old_stderr
+            if return_code != 0:
+                print(f'Build failed {return_code}: {message}', file=log)
+    return return_code, message
+
+
+class BuildJob:
+    """A build request, which clients with the same request share."""
+
+    def __init__(self, job_id, key, log_path):
+        """Create a queued job, which logs to log_path."""
+        self.job_id = job_id
+        self.key = key
+        self.log_path = log_path
+        self.done = threading.Event()
+        self.return_code = None
+        self.message = None
+        # Pid of the worker running the job, once it started.
+        self.pid = None
+        # Time the worker of the job was first seen to have exited.
+        self.lost_since = None
+        open(log_path, 'w').close()
+
+    def finish(self, return_code, message):
+        """Record the result of the job."""
+        self.return_code = return_code
+        self.message = message
+        self.done.set()
+
+    def events(self):
+        """Yield the lines of the log of the job as they are written, then its result."""
+        with open(self.log_path, 'r', errors='replace') as log:
+            partial = ''
+            while True:
+                finished = self.done.is_set()
+                for line in (partial + log.read()).splitlines(keepends=True):
+                    if line.endswith('\n'):
+                        yield {'log': line.rstrip('\n')}
+                        partial = ''
+                    else:
+                        partial = line
+                if finished:
+                    break
+                self.done.wait(LOG_POLL_INTERVAL)
+            if partial:
+                yield {'log': partial}
+        yield {'return_code': self.return_code, 'message': self.message}
+
+
+class BuildDaemon:
+    """The queue of build requests and the worker pool which builds them."""
+
+    def __init__(self, workers, log_directory):
+        """
+        Start the worker pool.
+
+        :param int workers: number of builds to run at the same time
+        :param str log_directory: directory for the logs of the builds
+        """
+        self.log_directory = log_directory
+        os.makedirs(log_directory, exist_ok=True)
+        context = mp.get_context('spawn')
+        self._started_queue = context.Queue()
+        # Workers are only replaced when they die, so that what they loaded is reused by the
+        # next build.
+        self.pool = context.Pool(
+            processes=workers, initializer=warm_worker, initargs=(self._started_queue,))
+        self._lock = threading.Lock()
+        # Map of request key to its queued job, which identical requests attach to.
+        self._queued = {}
+        # Map of job id to the queued and running jobs.
+        self._jobs = {}
+        self._next_job_id = 1
+        self._closed = threading.Event()
+        self._watcher = threading.Thread(target=self._watch_workers, daemon=True)
+        self._watcher.start()
+
+    def submit(self, args, cwd):
+        """
+        Queue a build, or attach to an identical queued build.
+
+        A running build may have read the package before it changed, so an identical request
+        is queued again once the build started.
+
+        :param list args: arguments of 'rosdoc2 build'
+        :param str cwd: directory the arguments are relative to
+        :return: tuple of (the job, True if it was already queued)
+        :raises RuntimeError: if the arguments are invalid
+        """
+        if not isinstance(args, list) or not all(isinstance(arg, str) for arg in args):
+            raise RuntimeError("Error the 'args' of a build request must be a list of strings")
+        if not os.path.isdir(cwd):
+            raise RuntimeError(f"Error the directory '{cwd}' of the build request does not exist")
+        # Requests are identical if they parse to the same options, in the same directory.
+        options = vars(parse_build_arguments(args))
+        key = json.dumps([os.path.realpath(cwd), options], sort_keys=True, default=str)
+        with self._lock:
+            job = self._queued.get(key)
+            # A job has started once its worker reported its pid.
+            if job is not None and job.pid is None:
+                return job, True
+            job_id = self._next_job_id
+            self._next_job_id += 1
+            job = BuildJob(job_id, key, os.path.join(self.log_directory, f'{job_id}.txt'))
+            self._queued[key] = job
+            self._jobs[job_id] = job
+        logger.info(f'Queued build {job_id}: {" ".join(args)}')
+        self.pool.apply_async(
+            run_build_job, (job_id, args, cwd, job.log_path),
+            callback=lambda result: self._finish(job, *result),
+            error_callback=lambda e: self._finish(job, 3, type(e).__name__ + ' ' + str(e)))
+        return job, False
+
+    def _finish(self, job, return_code, message):
+        with self._lock:
+            if job.job_id not in self._jobs:
+                # A late result of a job whose worker was considered lost.
+                return
+            del self._jobs[job.job_id]
+            if self._queued.get(job.key) is job:
+                del self._queued[job.key]
+        logger.info(f'Finished build {job.job_id}: {return_code} {message}')
+        job.finish(return_code, message)
+
+    def _watch_workers(self):
+        """
+        Fail the jobs whose worker process exited without a result.
+
+        A worker killed by the system, for example when out of memory, never returns a result,
+        and the pool starts another worker without reporting the lost job.
+        """
+        while not self._closed.is_set():
+            try:
+                job_id, pid = self._started_queue.get(timeout=LOST_WORKER_INTERVAL)
+            except queue.Empty:
+                pass
+            except (EOFError, OSError):
+                return
+            else:
+                with self._lock:
+                    if job_id in self._jobs:
+                        self._jobs[job_id].pid = pid
+            for job in self._find_lost_jobs():
+                self._finish(job, 3, 'Worker process exited without a result')
+
+    def _find_lost_jobs(self):
+        """Return the running jobs whose worker exited more than the grace period ago."""
+        now = time.time()
+        lost_jobs = []
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.pid is not None]
+        for job in jobs:
+            try:
+                os.kill(job.pid, 0)
+                continue
+            except ProcessLookupError:
+                pass
+            except OSError:
+                continue
+            if job.lost_since is None:
+                job.lost_since = now
+            if now - job.lost_since > LOST_WORKER_GRACE_PERIOD:
+                lost_jobs.append(job)
+        return lost_jobs
+
+    def status(self):
+        """Return the ids of the queued and running builds."""
+        with self._lock:
+            return {'jobs': sorted(self._jobs)}
+
+    def close(self):
+        """Stop the workers, abandoning queued and running builds."""
+        self._closed.set()
+        self.pool.terminate()
+        self.pool.join()
+        self._watcher.join()
+
+    def handle_request(self, request, write):
+        """
+        Run a build request, writing the response events with write.
+
+        :param dict request: the decoded JSON request
+        :param write: function taking one event dict
+        """
+        try:
+            if not isinstance(request, dict):
+                raise RuntimeError('Error a build request must be a JSON object')
+            job, deduplicated = self.submit(
+                request.get('args', []), request.get('cwd') or os.getcwd())
+        except RuntimeError as e:
+            write({'return_code': 1, 'message': str(e)})
+            return
+        write({'job': job.job_id, 'deduplicated': deduplicated})
+        for event in job.events():
+            write(event)
+
+
+class _UnixRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        def write(event):
+            self.wfile.write(json.dumps(event).encode() + b'\n')
+            self.wfile.flush()
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError as e:
+            write({'return_code': 1, 'message': f'Error invalid build request: {e}'})
+            return
+        try:
+            self.server.build_daemon.handle_request(request, write)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away, the build goes on for other clients.
+            pass
+
+
+class UnixBuildServer(socketserver.ThreadingUnixStreamServer):
+    """Accept build requests on a Unix socket."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, build_daemon):
+        """Listen on socket_path, replacing a socket left behind by an earlier daemon."""
+        if os.path.exists(socket_path):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                if probe.connect_ex(socket_path) == 0:
+                    raise RuntimeError(f"Error a daemon is already listening on '{socket_path}'")
+            os.remove(socket_path)
+        super().__init__(socket_path, _UnixRequestHandler)
+        self.build_daemon = build_daemon
+
+
+class _HttpRequestHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, message_format, *args):
+        logger.debug(message_format % args)
+
+    def _send_json_lines_headers(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+
+    def _is_local_request(self):
+        """
+        Return True if the request comes from a local client, and not through a web browser.
+
+        Builds run the conf.py of the package and write where the request says, so web pages,
+        which can send simple POST requests to localhost or rebind their host name to it,
+        must not reach the daemon. Browsers always send the Origin of cross origin requests.
+        """
+        port = self.server.server_address[1]
+        if self.headers.get('Host') not in (f'127.0.0.1:{port}', f'localhost:{port}'):
+            self.send_error(403, 'Requests must be addressed to localhost')
+            return False
+        if self.headers.get('Origin') is not None:
+            self.send_error(403, 'Requests from web pages are not accepted')
+            return False
+        return True
+
+    def do_GET(self):
+        if not self._is_local_request():
+            return
+        if self.path != '/status':
+            self.send_error(404)
+            return
+        self._send_json_lines_headers()
+        self.wfile.write(json.dumps(self.server.build_daemon.status()).encode() + b'\n')
+
+    def do_POST(self):
+        if not self._is_local_request():
+            return
+        if self.path != '/build':
+            self.send_error(404)
+            return
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            self.send_error(415, 'Build requests must have the Content-Type application/json')
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            self.send_error(400, f'Invalid build request: {e}')
+            return
+        self._send_json_lines_headers()
+
+        def write(event):
+            self.wfile.write(json.dumps(event).encode() + b'\n')
+            self.wfile.flush()
+        try:
+            self.server.build_daemon.handle_request(request, write)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class HttpBuildServer(ThreadingHTTPServer):
+    """Accept build requests over HTTP, on localhost only."""
+
+    daemon_threads = True
+
+    def __init__(self, port, build_daemon):
+        """Listen on the port of localhost."""
+        super().__init__(('127.0.0.1', port), _HttpRequestHandler)
+        self.build_daemon = build_daemon
+
+
+def submit_build(socket_path, args, cwd=None, timeout=None):
+    """
+    Send a build request to a daemon on a Unix socket.
+
+    :param list args: arguments of 'rosdoc2 build'
+    :param str cwd: directory the arguments are relative to, by default the current directory
+    :return: generator of the events of the response
+    """
+    request = {'args': list(args), 'cwd': os.path.abspath(cwd or os.getcwd())}
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(socket_path)
+        connection.sendall(json.dumps(request).encode() + b'\n')
+        with connection.makefile('r') as response:
+            for line in response:
+                yield json.loads(line)
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError('Timed out waiting for the build daemon')
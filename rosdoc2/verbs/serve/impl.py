@@ -0,0 +1,90 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+import sys
+import tempfile
+import threading
+
+from .daemon import BuildDaemon, HttpBuildServer, UnixBuildServer
+
+logging.basicConfig(format='[%(name)s] [%(levelname)s] %(message)s', level=logging.INFO)
+logger = logging.getLogger('rosdoc2.serve')
+
+
+def prepare_arguments(parser):
+    """Add command-line arguments to the argparse object."""
+    parser.add_argument(
+        '--socket',
+        default=None,
+        help='path of a Unix socket to accept build requests on',
+    )
+    parser.add_argument(
+        '--http-port',
+        type=int,
+        default=None,
+        help='port on localhost to accept build requests on, with POST /build',
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='number of builds to run at the same time, defaults to os.cpu_count()',
+    )
+    parser.add_argument(
+        '--log-directory',
+        default=None,
+        help='directory for the logs of the builds, defaults to a temporary directory',
+    )
+    return parser
+
+
+def main(options):
+    """Execute the program, catching errors."""
+    try:
+        return main_impl(options)
+    except RuntimeError as e:
+        sys.exit(str(e))
+
+
+def main_impl(options):
+    """Run the daemon until it is interrupted."""
+    if options.socket is None and options.http_port is None:
+        raise RuntimeError('Error at least one of --socket and --http-port is required')
+    workers = max(1, options.workers or os.cpu_count() or 1)
+    log_directory = options.log_directory or tempfile.mkdtemp(prefix='rosdoc2_serve_')
+    build_daemon = BuildDaemon(workers, log_directory)
+    servers = []
+    try:
+        if options.socket is not None:
+            servers.append(UnixBuildServer(options.socket, build_daemon))
+            logger.info(f"Accepting build requests on '{options.socket}'")
+        if options.http_port is not None:
+            servers.append(HttpBuildServer(options.http_port, build_daemon))
+            logger.info(
+                f'Accepting build requests on http://127.0.0.1:{options.http_port}/build')
+        logger.info(f"Running {workers} workers, logging builds to '{log_directory}'")
+        for server in servers[1:]:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers[0].serve_forever()
+    except KeyboardInterrupt:
+        logger.info('Stopping')
+    finally:
+        for server in servers:
+            server.server_close()
+        if options.socket is not None and any(
+                isinstance(server, UnixBuildServer) for server in servers):
+            os.remove(options.socket)
+        build_daemon.close()
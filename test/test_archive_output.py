@@ -0,0 +1,60 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of publishing the documentation of a package as an archive."""
+
+import os
+import tarfile
+
+import pytest
+from rosdoc2.verbs.build.archive_output import check_output_format
+from rosdoc2.verbs.build.archive_output import package_output_exists
+from rosdoc2.verbs.build.archive_output import write_package_archive
+
+
+def _staging(directory, mtime):
+    (directory / '_static').mkdir(parents=True)
+    (directory / 'index.html').write_text('index')
+    (directory / '_static' / 'style.css').write_text('style')
+    for path in (directory / 'index.html', directory / '_static' / 'style.css'):
+        os.utime(path, (mtime, mtime))
+    return directory
+
+
+@pytest.mark.parametrize('output_format', ['tar', 'tar.gz'])
+def test_archives_are_reproducible(tmp_path, output_format):
+    first = _staging(tmp_path / 'first', 1000)
+    second = _staging(tmp_path / 'second', 2000)
+    first_archive = tmp_path / f'first.{output_format}'
+    second_archive = tmp_path / f'second.{output_format}'
+    assert write_package_archive(str(first), str(first_archive), 'my_pkg', output_format) == 2
+    write_package_archive(str(second), str(second_archive), 'my_pkg', output_format)
+    assert first_archive.read_bytes() == second_archive.read_bytes()
+
+    with tarfile.open(first_archive) as tar:
+        assert tar.getnames() == [
+            'my_pkg', 'my_pkg/_static', 'my_pkg/_static/style.css', 'my_pkg/index.html']
+        assert tar.extractfile('my_pkg/index.html').read() == b'index'
+    assert not package_output_exists(str(tmp_path), 'my_pkg')
+    assert package_output_exists(str(tmp_path), 'first')
+
+
+def test_zstd_requires_zstandard():
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        with pytest.raises(RuntimeError, match='zstandard'):
+            check_output_format('tar.zst')
+    else:
+        check_output_format('tar.zst')
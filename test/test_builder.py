@@ -15,9 +15,11 @@
 """testing of builder.py using pytest."""
 
 import argparse
+import json
 import logging
 import os
 import pathlib
+import tarfile
 
 import pytest
 from rosdoc2.verbs.build.impl import main_impl, prepare_arguments
@@ -36,7 +38,7 @@ def module_dir(tmp_path_factory):
     return tmp_path_factory.getbasetemp()
 
 
-def do_build_package(package_path, work_path, with_extension=False) -> None:
+def do_build_package(package_path, work_path, with_extension=False, extra_args=()) -> None:
     build_dir = work_path / 'build'
     output_dir = work_path / 'output'
     cr_dir = work_path / 'cross_references'
@@ -51,6 +53,7 @@ def do_build_package(package_path, work_path, with_extension=False) -> None:
     ]
     if with_extension:
         args.extend(['-y', str(pathlib.Path('test') / 'ex_test.yaml')])
+    args.extend(extra_args)
     options = parser.parse_args(args)
     logger.info(f'*** Building package(s) at {package_path} with options {options}')
 
@@ -115,6 +118,21 @@ def test_minimum_package(module_dir):
                     file_excludes=file_excludes,
                     links_exist=links_exist)
 
+    # The size of the output is accounted for in the metrics of the package.
+    with open(module_dir / 'build' / PKG_NAME / 'metrics.json', 'r') as f:
+        output = json.load(f)['output']
+    assert output['files'] > 0
+    assert output['bytes'] == sum(b['bytes'] for b in output['builders'].values())
+    assert output['largest_subtrees'][0]['bytes'] <= output['bytes']
+    assert any(s['path'] == '_sources' for s in output['largest_subtrees'])
+
+    # The published output has a manifest of its files.
+    with open(module_dir / 'output' / PKG_NAME / 'manifest.json', 'r') as f:
+        manifest = json.load(f)
+    assert 'index.html' in manifest['files']
+    assert manifest['files']['index.html'][0] == \
+        os.path.getsize(module_dir / 'output' / PKG_NAME / 'index.html')
+
 
 def test_full_package(module_dir):
     """Test a package with C++, python, and docs."""
@@ -151,6 +169,36 @@ def test_only_python(module_dir):
                     fragments=fragments)
 
 
+def test_lean_output_profile(tmp_path):
+    """Test that the lean output profile leaves the sources and build info out."""
+    PKG_NAME = 'only_python'
+    for directory in ('build', 'cross_references', 'output'):
+        (tmp_path / directory).mkdir()
+    do_build_package(DATAPATH / PKG_NAME, tmp_path, extra_args=['--output-profile', 'lean'])
+
+    output_dir = tmp_path / 'output' / PKG_NAME
+    assert (output_dir / 'index.html').is_file()
+    assert (output_dir / 'objects.inv').is_file()
+    assert not (output_dir / '_sources').exists()
+    assert not (output_dir / '.buildinfo').exists()
+    assert '_sources/' not in (output_dir / 'index.html').read_text()
+
+
+def test_archive_output_format(tmp_path):
+    """Test that the tar.gz output format publishes an archive instead of a directory."""
+    PKG_NAME = 'only_python'
+    for directory in ('build', 'cross_references', 'output'):
+        (tmp_path / directory).mkdir()
+    do_build_package(DATAPATH / PKG_NAME, tmp_path, extra_args=['--output-format', 'tar.gz'])
+
+    assert not (tmp_path / 'output' / PKG_NAME).exists()
+    with tarfile.open(tmp_path / 'output' / f'{PKG_NAME}.tar.gz') as tar:
+        names = tar.getnames()
+        assert f'{PKG_NAME}/index.html' in names
+        assert names == sorted(names, key=lambda name: name.split('/'))
+        assert {member.mtime for member in tar.getmembers()} == {0}
+
+
 def test_src_python(module_dir):
     PKG_NAME = 'src_python'
     do_build_package(DATAPATH / PKG_NAME, module_dir)
@@ -448,3 +496,30 @@ def test_specify_include_path(module_dir):
 
     includes = ['full c++ api']  # package has includes at some_path
     do_test_package(PKG_NAME, module_dir, includes=includes)
+
+
+def test_symlink_doc_staging(module_dir):
+    """Test staging user documentation with links rather than copies."""
+    PKG_NAME = 'false_python'
+    conf_py_path = DATAPATH / PKG_NAME / 'docs' / 'conf.py'
+    conf_py_content = conf_py_path.read_text()
+    do_build_package(DATAPATH / PKG_NAME, module_dir, extra_args=['--doc-staging', 'symlink'])
+
+    includes = [
+        'this is documentation'  # the title of included documentation
+    ]
+    links_exist = [
+        'docs/moredocs/more1.html'  # Found subdirectory in non-standard location
+    ]
+    do_test_package(PKG_NAME, module_dir, includes=includes, links_exist=links_exist)
+
+    wrapped_docs, = (module_dir / 'build' / PKG_NAME).glob('*/wrapped_sphinx_directory/docs')
+    assert (wrapped_docs / 'ros.png').is_symlink(), \
+        'documentation assets should be staged as links'
+    assert (wrapped_docs / '__conf.py').resolve() == conf_py_path.resolve(), \
+        'renamed conf.py should still refer to the user conf.py'
+    assert conf_py_path.read_text() == conf_py_content, \
+        'staging must not modify the package source'
+    image_path = module_dir / 'output' / PKG_NAME / '_images' / 'ros.png'
+    assert image_path.is_file() and not image_path.is_symlink(), \
+        f'ros logo image file exists at {image_path}'
@@ -0,0 +1,85 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the measurement of the Doxygen XML handed to breathe."""
+
+import json
+from types import SimpleNamespace
+
+from rosdoc2.verbs.build.builders.sphinx_builder import SphinxBuilder
+from rosdoc2.verbs.build.doxygen_xml_statistics import doxygen_xml_statistics
+
+INDEX_XML = """\
+<?xml version='1.0' encoding='UTF-8' standalone='no'?>
+<doxygenindex version="1.9.8" xml:lang="en-US">
+  <compound refid="classmy__pkg_1_1Foo" kind="class"><name>my_pkg::Foo</name>
+    <member refid="a1" kind="function"><name>get</name></member>
+    <member refid="a2" kind="function"><name>set</name></member>
+    <member refid="a3" kind="variable"><name>value</name></member>
+  </compound>
+  <compound refid="namespacemy__pkg" kind="namespace"><name>my_pkg</name>
+    <member refid="a4" kind="typedef"><name>Ptr</name></member>
+  </compound>
+  <compound refid="foo_8hpp" kind="file"><name>foo.hpp</name>
+  </compound>
+</doxygenindex>
+"""
+
+
+def test_doxygen_xml_statistics(tmp_path):
+    assert doxygen_xml_statistics(str(tmp_path)) is None
+    (tmp_path / 'index.xml').write_text(INDEX_XML)
+    assert doxygen_xml_statistics(str(tmp_path)) == {
+        'compounds': 3,
+        'members': 4,
+        'compound_kinds': {'class': 1, 'namespace': 1, 'file': 1},
+        'member_kinds': {'function': 2, 'variable': 1, 'typedef': 1},
+    }
+
+
+def check_workload(tmp_path, limit):
+    xml_directory = tmp_path / 'xml'
+    xml_directory.mkdir(exist_ok=True)
+    (xml_directory / 'index.xml').write_text(INDEX_XML)
+    reported = []
+    build_context = SimpleNamespace(
+        package=SimpleNamespace(name='my_pkg'),
+        tool_options=SimpleNamespace(
+            doc_build_directory=str(tmp_path / 'build'),
+            metrics_callback=lambda section, values: reported.append(section)),
+        breathe_member_limit=limit,
+        disable_breathe=False,
+        show_doxygen_html=False)
+    builder = SimpleNamespace(
+        doxygen_xml_directory=str(xml_directory), build_context=build_context)
+    SphinxBuilder.check_breathe_workload(builder)
+    metrics = json.loads((tmp_path / 'build' / 'my_pkg' / 'metrics.json').read_text())
+    assert reported == ['doxygen_xml']
+    return build_context, metrics['doxygen_xml']
+
+
+def test_breathe_member_limit(tmp_path):
+    build_context, metrics = check_workload(tmp_path, None)
+    assert not build_context.disable_breathe
+    assert metrics['members'] == 4
+    assert not metrics['breathe_disabled_by_limit']
+
+    build_context, metrics = check_workload(tmp_path, 4)
+    assert not build_context.disable_breathe
+
+    # Over the limit, the Doxygen html is shown instead.
+    build_context, metrics = check_workload(tmp_path, 3)
+    assert build_context.disable_breathe
+    assert build_context.show_doxygen_html
+    assert metrics['breathe_disabled_by_limit']
@@ -0,0 +1,36 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of locating and counting the C/C++ headers of a package."""
+
+from rosdoc2.verbs.build.find_include_directory import count_headers
+from rosdoc2.verbs.build.find_include_directory import find_include_directory
+from rosdoc2.verbs.build.package_survey import PackageSurvey
+
+
+def _touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('')
+
+
+def test_test_directories_are_excluded_by_name(tmp_path):
+    _touch(tmp_path / 'include' / 'test_msgs' / 'msg.hpp')
+    _touch(tmp_path / 'include' / 'testing_utils' / 'utils.hpp')
+    _touch(tmp_path / 'include' / 'test' / 'fixture.hpp')
+    _touch(tmp_path / 'src' / 'tests' / 'fixture.h')
+    _touch(tmp_path / 'src' / 'third_party' / 'lib.h')
+    survey = PackageSurvey(str(tmp_path))
+    assert find_include_directory(survey, ('src', 'include')) == 'include'
+    assert count_headers(survey, 'include') == 2
+    assert count_headers(survey, 'src') == 0
@@ -0,0 +1,83 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the lookup maps of Sphinx inventories."""
+
+import zlib
+
+import pytest
+from rosdoc2.verbs.build.inventory_map import InventoryMap, write_inventory_map
+
+INVENTORY_ENTRIES = """\
+my_pkg.Foo py:class 1 my_pkg.html#$ -
+my_pkg.Foo.bar py:method 1 my_pkg.html#my_pkg.Foo.bar -
+my_pkg py:module 0 my_pkg.html#module-$ -
+getting-started std:label -1 usage.html#getting-started Getting Started
+A Term std:term -1 glossary.html#term-A-Term -
+"""
+
+
+def write_objects_inv(path, entries=INVENTORY_ENTRIES):
+    with open(path, 'wb') as f:
+        f.write(
+            b'# Sphinx inventory version 2\n'
+            b'# Project: my_pkg\n'
+            b'# Version: 1.2\n'
+            b'# The remainder of this file is compressed using zlib.\n')
+        f.write(zlib.compress(entries.encode()))
+
+
+def test_lookup(tmp_path):
+    inventory_file = str(tmp_path / 'objects.inv')
+    write_objects_inv(inventory_file)
+    inventory_map = InventoryMap(write_inventory_map(inventory_file))
+    try:
+        assert inventory_map.lookup('py:class', 'my_pkg.Foo') == ('my_pkg.html#my_pkg.Foo', '-')
+        assert inventory_map.lookup('py:method', 'my_pkg.Foo.bar') == \
+            ('my_pkg.html#my_pkg.Foo.bar', '-')
+        assert inventory_map.lookup('py:module', 'my_pkg') == ('my_pkg.html#module-my_pkg', '-')
+        assert inventory_map.project == 'my_pkg'
+        assert inventory_map.version == '1.2'
+        # Labels and terms match regardless of case, other types do not.
+        assert inventory_map.lookup('std:label', 'Getting-Started') == \
+            ('usage.html#getting-started', 'Getting Started')
+        assert inventory_map.lookup('std:term', 'a term') == ('glossary.html#term-A-Term', '-')
+        assert inventory_map.lookup('py:class', 'my_pkg.foo') is None
+        # Wrong type, or not in the inventory.
+        assert inventory_map.lookup('py:function', 'my_pkg.Foo') is None
+        assert inventory_map.lookup('py:class', 'my_pkg.Bar') is None
+    finally:
+        inventory_map.close()
+
+
+def test_many_entries(tmp_path):
+    inventory_file = str(tmp_path / 'objects.inv')
+    write_objects_inv(inventory_file, ''.join(
+        f'pkg.name{i} py:function 1 api.html#$ -\n' for i in range(5000)))
+    inventory_map = InventoryMap(write_inventory_map(inventory_file))
+    try:
+        for i in range(0, 5000, 7):
+            assert inventory_map.lookup('py:function', f'pkg.name{i}') == \
+                (f'api.html#pkg.name{i}', '-')
+        assert inventory_map.lookup('py:function', 'pkg.name5000') is None
+    finally:
+        inventory_map.close()
+
+
+def test_invalid_inventory(tmp_path):
+    inventory_file = str(tmp_path / 'objects.inv')
+    with open(inventory_file, 'wb') as f:
+        f.write(b'# Sphinx inventory version 1\n# Project: x\n# Version: 1\nfoo mod foo.html\n')
+    with pytest.raises(RuntimeError):
+        write_inventory_map(inventory_file)
@@ -0,0 +1,129 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the manifests of the output directory and of the diff verb."""
+
+import json
+import os
+
+import rosdoc2.verbs.build.manifest as manifest_module
+from rosdoc2.verbs.build.manifest import diff_output_directories
+from rosdoc2.verbs.build.manifest import MANIFEST_FILENAME
+from rosdoc2.verbs.build.manifest import package_manifest, publish_package_output
+from rosdoc2.verbs.build.manifest import update_rollup
+from rosdoc2.verbs.build.manifest import write_package_manifest
+
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_package_manifest_reuses_unchanged_hashes(tmp_path, monkeypatch):
+    package = tmp_path / 'output' / 'my_pkg'
+    _write(package / 'index.html', 'index')
+    _write(package / '_static' / 'style.css', 'style')
+    manifest = write_package_manifest(str(package))
+    assert sorted(manifest['files']) == ['_static/style.css', 'index.html']
+    assert manifest['files']['index.html'][0] == len('index')
+    with open(package / MANIFEST_FILENAME, 'r') as f:
+        assert json.load(f) == manifest
+
+    # Only the modified file is hashed again.
+    hashed = []
+    file_sha256 = manifest_module._file_sha256
+    monkeypatch.setattr(
+        manifest_module, '_file_sha256', lambda path: hashed.append(path) or file_sha256(path))
+    _write(package / 'index.html', 'new index')
+    os.utime(package / 'index.html', ns=(0, 0))
+    updated = write_package_manifest(str(package))
+    assert hashed == [str(package / 'index.html')]
+    assert updated['files']['_static/style.css'] == manifest['files']['_static/style.css']
+    assert updated['digest'] != manifest['digest']
+
+
+def test_publish_keeps_unchanged_files(tmp_path, monkeypatch):
+    staging = tmp_path / 'staging'
+    package = tmp_path / 'output' / 'my_pkg'
+    _write(staging / 'index.html', 'index')
+    _write(staging / '_static' / 'style.css', 'style')
+    _write(staging / '_static' / 'same_size.js', 'aaaa')
+    _write(staging / '_static' / 'removed.js', 'removed')
+    publish_package_output(str(staging), str(package))
+    assert not os.listdir(staging)
+    mtimes = {path: path.stat().st_mtime_ns for path in package.rglob('*') if path.is_file()}
+
+    # Rebuild the package, with one file modified and one removed.
+    _write(staging / 'index.html', 'index')
+    _write(staging / '_static' / 'style.css', 'style')
+    _write(staging / '_static' / 'same_size.js', 'bbbb')
+    hashed = []
+    file_sha256 = manifest_module._file_sha256
+    monkeypatch.setattr(
+        manifest_module, '_file_sha256', lambda path: hashed.append(path) or file_sha256(path))
+    manifest = publish_package_output(str(staging), str(package))
+
+    # Every staged file is hashed once, to compare it with the published file, and the
+    # published files are not hashed again.
+    assert sorted(hashed) == sorted(
+        str(staging / relpath) for relpath in
+        ('index.html', '_static/style.css', '_static/same_size.js'))
+    assert (package / 'index.html').stat().st_mtime_ns == mtimes[package / 'index.html']
+    assert (package / '_static' / 'style.css').stat().st_mtime_ns == \
+        mtimes[package / '_static' / 'style.css']
+    assert (package / '_static' / 'same_size.js').read_text() == 'bbbb'
+    assert not (package / '_static' / 'removed.js').exists()
+    monkeypatch.setattr(manifest_module, '_file_sha256', file_sha256)
+    assert manifest == package_manifest(str(package))
+
+
+def test_rollup_and_diff(tmp_path):
+    old = tmp_path / 'old'
+    new = tmp_path / 'new'
+    for output in (old, new):
+        _write(output / 'same_pkg' / 'index.html', 'same')
+        _write(output / 'changed_pkg' / 'index.html', 'same')
+    _write(old / 'changed_pkg' / 'page.html', 'old')
+    _write(new / 'changed_pkg' / 'page.html', 'new')
+    _write(old / 'changed_pkg' / 'removed.html', 'removed')
+    _write(new / 'changed_pkg' / 'added.html', 'added')
+    _write(old / 'removed_pkg' / 'index.html', 'removed')
+    _write(new / 'added_pkg' / 'index.html', 'added')
+    for output in (old, new):
+        names = sorted(os.listdir(output))
+        for name in names:
+            write_package_manifest(str(output / name))
+        rollup = update_rollup(str(output), names)
+    assert sorted(rollup['packages']) == ['added_pkg', 'changed_pkg', 'same_pkg']
+    assert rollup['packages']['changed_pkg']['files'] == 3
+
+    assert diff_output_directories(str(old), str(new)) == {
+        'added': ['added_pkg/index.html', 'changed_pkg/added.html'],
+        'removed': ['changed_pkg/removed.html', 'removed_pkg/index.html'],
+        'changed': ['changed_pkg/page.html'],
+    }
+
+    # Removed packages are dropped from the rollup.
+    (new / 'added_pkg' / 'index.html').unlink()
+    (new / 'added_pkg' / MANIFEST_FILENAME).unlink()
+    (new / 'added_pkg').rmdir()
+    assert 'added_pkg' not in update_rollup(str(new), [])['packages']
+
+
+def test_diff_without_manifests(tmp_path):
+    _write(tmp_path / 'old' / 'my_pkg' / 'index.html', 'old')
+    _write(tmp_path / 'new' / 'my_pkg' / 'index.html', 'new')
+    assert diff_output_directories(str(tmp_path / 'old'), str(tmp_path / 'new')) == {
+        'added': [], 'removed': [], 'changed': ['my_pkg/index.html']}
+    assert not (tmp_path / 'new' / 'my_pkg' / MANIFEST_FILENAME).exists()
@@ -0,0 +1,134 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of serving the documentation with the open verb."""
+
+import gzip
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from rosdoc2.verbs.open.server import create_server
+from rosdoc2.verbs.open.server import is_loopback_address
+from rosdoc2.verbs.open.server import RELOAD_PATH
+from rosdoc2.verbs.open.server import SENDFILE_THRESHOLD
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    package = tmp_path / 'my_pkg'
+    (package / '_static').mkdir(parents=True)
+    (package / 'index.html').write_text('<html><body>Hello</body></html>')
+    (package / 'manifest.json').write_text('{}')
+    (package / '_static' / 'search.js').write_text('var search = 1;\n' * 100)
+    with gzip.open(package / '_static' / 'search.js.gz', 'wb') as f:
+        f.write(b'var search = 1;\n' * 100)
+    (package / '_static' / 'large.bin').write_bytes(
+        bytes(range(256)) * (SENDFILE_THRESHOLD // 128))
+    (tmp_path / 'not_a_package').mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def url(output_dir):
+    server = create_server(str(output_dir), 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def _get(url, headers={}):
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def test_reload(url, output_dir):
+    status, _, page = _get(f'{url}/my_pkg/')
+    assert status == 200
+    assert page.decode().startswith('<html><body>Hello<script>')
+    assert RELOAD_PATH.encode() in page
+    _, _, version = _get(f'{url}{RELOAD_PATH}?page=/my_pkg/index.html')
+    assert version.decode() == str((output_dir / 'my_pkg' / 'manifest.json').stat().st_mtime_ns)
+
+
+def test_reload_revalidation(url):
+    status, headers, _ = _get(f'{url}/my_pkg/index.html')
+    assert status == 200
+    assert 'Last-Modified' in headers
+    assert _get(f'{url}/my_pkg/index.html', {'If-None-Match': headers['ETag']})[0] == 304
+
+
+def test_without_reload(output_dir):
+    with gzip.open(output_dir / 'my_pkg' / 'index.html.gz', 'wb') as f:
+        f.write(b'<html><body>Hello</body></html>')
+    server = create_server(str(output_dir), 0, auto_reload=False)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        status, headers, page = _get(
+            f'http://127.0.0.1:{server.server_address[1]}/my_pkg/index.html',
+            {'Accept-Encoding': 'gzip'})
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(page) == b'<html><body>Hello</body></html>'
+
+
+def test_reload_only_on_loopback_by_default():
+    assert is_loopback_address('127.0.0.1')
+    assert is_loopback_address('::1')
+    assert is_loopback_address('localhost')
+    assert not is_loopback_address('0.0.0.0')
+    assert not is_loopback_address('')
+    server = create_server('.', 0, bind='0.0.0.0')
+    try:
+        assert not server.RequestHandlerClass.func.auto_reload
+    finally:
+        server.server_close()
+
+
+def test_revalidation(url):
+    status, headers, _ = _get(f'{url}/my_pkg/_static/search.js')
+    assert status == 200
+    assert headers['Cache-Control'] == 'no-cache'
+    assert headers['Vary'] == 'Accept-Encoding'
+    assert _get(f'{url}/my_pkg/_static/search.js', {'If-None-Match': headers['ETag']})[0] == 304
+    assert _get(
+        f'{url}/my_pkg/_static/search.js',
+        {'If-Modified-Since': headers['Last-Modified']})[0] == 304
+
+
+def test_precompressed_and_large_files(url, output_dir):
+    status, headers, body = _get(f'{url}/my_pkg/_static/search.js', {'Accept-Encoding': 'gzip'})
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['Content-Type'] == 'text/javascript'
+    assert gzip.decompress(body) == b'var search = 1;\n' * 100
+
+    status, headers, body = _get(f'{url}/my_pkg/_static/large.bin')
+    assert body == (output_dir / 'my_pkg' / '_static' / 'large.bin').read_bytes()
+    assert int(headers['Content-Length']) == len(body)
+
+
+def test_package_index(url):
+    status, _, page = _get(f'{url}/')
+    assert status == 200
+    assert b'<a href="my_pkg/">my_pkg</a>' in page
+    assert b'not_a_package' not in page
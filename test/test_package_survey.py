@@ -0,0 +1,56 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the survey of a package directory."""
+
+import os
+
+from rosdoc2.verbs.build.package_survey import PackageSurvey
+
+
+def _touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('')
+
+
+def test_survey_prunes_directories(tmp_path):
+    package = tmp_path / 'my_pkg'
+    _touch(package / 'COLCON_IGNORE')
+    _touch(package / 'include' / 'my_pkg' / 'foo.hpp')
+    _touch(package / 'test' / 'test_foo.cpp')
+    _touch(package / 'third_party' / 'lib' / 'lib.h')
+    _touch(package / 'doc' / 'AMENT_IGNORE')
+    _touch(package / 'doc' / 'index.rst')
+    _touch(package / 'doc' / 'guide' / 'usage.rst')
+    _touch(tmp_path / 'vendored' / 'big.h')
+    os.symlink(tmp_path / 'vendored', package / 'linked')
+
+    survey = PackageSurvey(str(package))
+    # The package is surveyed, even though colcon ignores it.
+    assert survey.files.keys() == {
+        'COLCON_IGNORE',
+        os.path.join('include', 'my_pkg', 'foo.hpp'),
+        os.path.join('doc', 'AMENT_IGNORE'),
+        os.path.join('doc', 'index.rst'),
+    }
+    assert survey.listdir('.')[0] == ['doc', 'include', 'linked']
+    assert survey.is_ignored(os.path.join('doc', 'guide'))
+    walked = [os.path.relpath(root, package) for root, _, _ in survey.walk()]
+    assert walked == ['.', 'doc', 'include', os.path.join('include', 'my_pkg')]
+
+    # Pruned directories are still found when asked for explicitly.
+    assert survey.isdir('linked')
+    assert survey.isfile(os.path.join('linked', 'big.h'))
+    assert survey.isfile(os.path.join('test', 'test_foo.cpp'))
+    assert survey.listdir(os.path.join('doc', 'guide')) == ([], ['usage.rst'])
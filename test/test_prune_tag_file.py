@@ -0,0 +1,134 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the pruning of Doxygen tag files for other packages."""
+
+import json
+import os
+from xml.etree import ElementTree
+
+import pytest
+from rosdoc2.verbs.build.collect_tag_files import collect_tag_files
+from rosdoc2.verbs.build.prune_tag_file import prune_tag_file
+
+TAG_FILE = """\
+<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>
+<tagfile doxygen_version="1.9.8" doxygen_gitid="abc &amp; def">
+  <compound kind="file">
+    <name>foo.hpp</name>
+    <path>include/my_pkg/</path>
+    <filename>foo_8hpp.html</filename>
+    <includes id="bar_8hpp" name="bar.hpp" local="yes" import="no" module="no">bar.hpp</includes>
+    <class kind="class">my_pkg::Foo</class>
+    <namespace>my_pkg</namespace>
+    <member kind="define">
+      <type></type>
+      <name>MY_PKG_MACRO</name>
+      <anchorfile>foo_8hpp.html</anchorfile>
+      <anchor>a1</anchor>
+      <arglist></arglist>
+    </member>
+  </compound>
+  <compound kind="file">
+    <name>bar.hpp</name>
+    <path>include/my_pkg/</path>
+    <filename>bar_8hpp.html</filename>
+    <class kind="class">my_pkg::Bar</class>
+  </compound>
+  <compound kind="class">
+    <name>my_pkg::Foo</name>
+    <filename>classmy__pkg_1_1Foo.html</filename>
+    <member kind="function" protection="public" static="no" virtualness="non virtual">
+      <type>int</type>
+      <name>get</name>
+      <anchorfile>classmy__pkg_1_1Foo.html</anchorfile>
+      <anchor>a2</anchor>
+      <arglist>() const</arglist>
+    </member>
+    <member kind="variable" protection="private" static="no">
+      <type>int</type>
+      <name>value_</name>
+      <anchorfile>classmy__pkg_1_1Foo.html</anchorfile>
+      <anchor>a3</anchor>
+      <arglist></arglist>
+    </member>
+  </compound>
+  <compound kind="namespace">
+    <name>my_pkg::@0</name>
+    <filename>namespacemy__pkg_1_1@0.html</filename>
+  </compound>
+  <compound kind="namespace">
+    <name>my_pkg</name>
+    <filename>namespacemy__pkg.html</filename>
+    <class kind="class">my_pkg::Foo</class>
+  </compound>
+  <compound kind="page">
+    <name>index</name>
+    <title>My Package</title>
+    <filename>index.html</filename>
+    <docanchor file="index.html">usage</docanchor>
+  </compound>
+  <compound kind="dir">
+    <name>include</name>
+    <path>include/</path>
+    <filename>dir_d44c64559bbebec7f509842c48db8b23.html</filename>
+  </compound>
+</tagfile>
+"""
+
+
+def test_prune_tag_file(tmp_path):
+    tag_file = tmp_path / 'my_pkg.tag'
+    tag_file.write_text(TAG_FILE)
+    assert prune_tag_file(str(tag_file)) == (3, 7)
+
+    root = ElementTree.parse(str(tag_file) + '.pruned').getroot()
+    assert root.get('doxygen_version') == '1.9.8'
+    assert root.get('doxygen_gitid') == 'abc & def'
+    compounds = {c.findtext('name'): c for c in root.findall('compound')}
+    assert set(compounds) == {'foo.hpp', 'my_pkg::Foo', 'my_pkg'}
+    # Files keep their members, but not the compounds they contain.
+    assert compounds['foo.hpp'].find('member/name').text == 'MY_PKG_MACRO'
+    assert compounds['foo.hpp'].find('class') is None
+    assert compounds['foo.hpp'].find('includes') is None
+    # Private members are removed.
+    assert [m.findtext('name') for m in compounds['my_pkg::Foo'].findall('member')] == ['get']
+    assert compounds['my_pkg'].findtext('class') == 'my_pkg::Foo'
+
+
+def test_invalid_tag_file(tmp_path):
+    tag_file = tmp_path / 'my_pkg.tag'
+    tag_file.write_text(TAG_FILE[:500])
+    with pytest.raises(RuntimeError):
+        prune_tag_file(str(tag_file))
+    assert not os.path.exists(str(tag_file) + '.pruned')
+    assert not os.path.exists(str(tag_file) + '.pruned.tmp')
+
+
+def test_collect_pruned_tag_file(tmp_path):
+    package_directory = tmp_path / 'my_pkg'
+    package_directory.mkdir()
+    tag_file = package_directory / 'my_pkg.tag'
+    tag_file.write_text(TAG_FILE)
+    (package_directory / 'my_pkg.tag.location.json').write_text(
+        json.dumps({'relative_tag_root': 'generated/doxygen/html'}))
+    assert collect_tag_files(str(tmp_path))['my_pkg']['tag_file'] == str(tag_file)
+
+    prune_tag_file(str(tag_file))
+    assert collect_tag_files(str(tmp_path))['my_pkg']['tag_file'] == str(tag_file) + '.pruned'
+
+    # A pruned tag file older than the tag file is not used.
+    stat = os.stat(str(tag_file))
+    os.utime(str(tag_file) + '.pruned', (stat.st_atime, stat.st_mtime - 10))
+    assert collect_tag_files(str(tmp_path))['my_pkg']['tag_file'] == str(tag_file)
@@ -0,0 +1,53 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the timeouts and process cleanup of run_subprocess."""
+
+import os
+import time
+
+import pytest
+from rosdoc2.verbs.build.run_subprocess import run_subprocess, SubprocessTimeout
+
+
+def is_running(pid):
+    """Return True if pid is a process which has not exited, ignoring zombies."""
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            # The state follows the command name, which is in parentheses.
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except (FileNotFoundError, ProcessLookupError):
+        return False
+
+
+def test_return_code(tmp_path):
+    assert run_subprocess(['sh', '-c', 'exit 3'], cwd=tmp_path, phase='test') == 3
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc'), reason='requires /proc')
+def test_timeout_stops_process_group(tmp_path):
+    pid_file = tmp_path / 'child.pid'
+    start = time.time()
+    with pytest.raises(SubprocessTimeout, match='test timed out after'):
+        run_subprocess(
+            ['sh', '-c', f'sleep 60 & echo $! > {pid_file}; wait'],
+            cwd=tmp_path, phase='test', timeout=1.0)
+    assert time.time() - start < 30
+    # The background child of the shell must not be left running. It was sent SIGKILL, but
+    # may take a moment to actually exit.
+    child_pid = int(pid_file.read_text())
+    deadline = time.time() + 10
+    while is_running(child_pid) and time.time() < deadline:
+        time.sleep(0.05)
+    assert not is_running(child_pid)
@@ -15,11 +15,22 @@
 """testing of builder.py using pytest."""
 
 import argparse
+import io
+import json
 import logging
 import pathlib
+import shutil
+import subprocess
+import sys
 
 import pytest
+from rosdoc2.verbs.merge.impl import main_impl as merge_main_impl
+from rosdoc2.verbs.merge.impl import prepare_arguments as merge_prepare_arguments
+from rosdoc2.verbs.scan import memory_monitor
 from rosdoc2.verbs.scan.impl import main_impl, prepare_arguments
+from rosdoc2.verbs.scan.journal import hash_cross_references, ScanJournal
+from rosdoc2.verbs.scan.memory_monitor import AdmissionController, MIB
+from rosdoc2.verbs.scan.progress import ProgressReporter
 
 from .utils import do_test_full_package
 
@@ -36,9 +47,9 @@ def module_dir(tmp_path_factory):
     return tmp_path_factory.getbasetemp()
 
 
-def do_scan_packages(package_path, work_path) -> None:
+def do_scan_packages(package_path, work_path, output_path=OUTPUTPATH, extra_args=[]) -> None:
     build_dir = work_path / 'scan_build'
-    output_dir = work_path / OUTPUTPATH
+    output_dir = work_path / output_path
     cr_dir = work_path / 'scan_cross_references'
 
     # Create a top level parser
@@ -48,7 +59,7 @@ def do_scan_packages(package_path, work_path) -> None:
         '-c', str(cr_dir),
         '-o', str(output_dir),
         '-d', str(build_dir),
-    ])
+    ] + extra_args)
     logger.info(f'*** scanning package(s) at {package_path} with options {options}')
 
     # run rosdoc2 on the package
@@ -67,3 +78,260 @@ def test_scan(module_dir):
             f'output directory {output_dir} should have a subdirectory {child.name}'
 
     do_test_full_package(module_dir, output_path=OUTPUTPATH)
+
+
+def test_progress_reporter(tmp_path):
+    """Test the ETA and status of the scan progress reporter, without any workers."""
+    history_path = tmp_path / 'scan_durations.json'
+    history_path.write_text(json.dumps({'a': 10.0, 'b': 30.0}))
+    progress = ProgressReporter(
+        ['a', 'b', 'c', 'd'], 2, 100.0, history_path=str(history_path), stream=io.StringIO())
+    start = progress.start_time
+
+    progress.handle_event('start', 'a', 1, start)
+    progress.handle_event('start', 'b', 2, start)
+    progress.handle_event('end', 'a', 1, start + 12.0)
+    progress.package_done('a')
+    progress.handle_event('start', 'c', 3, start + 12.0)
+
+    # b has 10s left from its history. c and d are not in the history, so are expected to
+    # take the mean of this scan, 12s, which leaves 4s for c.
+    assert progress.eta(now=start + 20.0) == pytest.approx((10.0 + 4.0 + 12.0) / 2)
+    status = progress.status_line(now=start + 20.0)
+    assert status.startswith('[1/4] 3.0 packages/min')
+    assert '#0 c 8s' in status
+    assert '#1 b 20s' in status
+    assert 'near timeout' not in status
+    assert '#1 b 1m25s (near timeout)' in progress.status_line(now=start + 85.0)
+
+    progress.stop()
+    assert json.loads(history_path.read_text()) == {'a': 12.0, 'b': 30.0}
+
+
+def test_progress_breathe_workload(tmp_path, caplog):
+    """Test that the Doxygen workload of packages feeds the estimates of the scan."""
+    progress = ProgressReporter(['a', 'b'], 2, 100.0, stream=io.StringIO())
+    start = progress.start_time
+    progress.handle_event('start', 'a', 1, start)
+    progress.handle_event('metrics', 'a', 1, start + 1.0, ('doxygen_xml', {'members': 1000}))
+    progress.handle_event('end', 'a', 1, start + 20.0)
+    progress.package_done('a')
+
+    # a took 20s for 1000 members, so b is expected to take 200s, more than the timeout.
+    progress.handle_event('start', 'b', 2, start + 20.0)
+    with caplog.at_level(logging.WARNING, logger='rosdoc2.scan'):
+        progress.handle_event(
+            'metrics', 'b', 2, start + 25.0, ('doxygen_xml', {'members': 10000}))
+    assert 'b hands 10000 Doxygen members to breathe' in caplog.text
+    assert progress.eta(now=start + 25.0) == pytest.approx((200.0 - 5.0) / 2)
+    progress.stop()
+
+
+def test_progress_header_counts(tmp_path):
+    """Test that the header counts of packages feed the estimates of the scan."""
+    progress = ProgressReporter(['a', 'b'], 1, 100.0, stream=io.StringIO())
+    start = progress.start_time
+    progress.handle_event('start', 'a', 1, start)
+    progress.handle_event('metrics', 'a', 1, start + 1.0, ('doxygen_input', {'headers': 10}))
+    progress.handle_event('end', 'a', 1, start + 20.0)
+    progress.package_done('a')
+
+    # a took 20s for 10 headers, so b with 50 headers is expected to take 100s.
+    progress.handle_event('start', 'b', 1, start + 20.0)
+    progress.handle_event('metrics', 'b', 1, start + 21.0, ('doxygen_input', {'headers': 50}))
+    assert progress.eta(now=start + 30.0) == pytest.approx(100.0 - 10.0)
+    progress.stop()
+
+
+def test_memory_admission(monkeypatch):
+    """Test that packages are held back when memory is short, and large ones run alone."""
+    monkeypatch.setattr(memory_monitor, 'available_memory', lambda: 8000 * MIB)
+    monkeypatch.setattr(memory_monitor, 'memory_pressure', lambda: 0.0)
+    monkeypatch.setattr(
+        memory_monitor, 'process_tree_rss', lambda pids: {pid: 1000 * MIB for pid in pids})
+    admission = AdmissionController(4, 1000 * MIB)
+    admission.history = {'big1': 5000 * MIB, 'big2': 5000 * MIB, 'small': 500 * MIB}
+
+    # Anything may start when nothing is running.
+    assert admission.choose(['big1', 'big2', 'small'], {}) == 0
+    # big1 will grow by another 4000 MiB, leaving 3000 MiB, so big2 must wait but small fits.
+    assert admission.choose(['big2', 'small'], {'big1': 100}) == 1
+    assert admission.choose(['big2'], {'big1': 100, 'small': 101}) is None
+
+    # Even with plenty of memory, only one large package runs at a time.
+    monkeypatch.setattr(memory_monitor, 'available_memory', lambda: 64000 * MIB)
+    admission.workers = 16
+    assert admission.choose(['big2'], {'big1': 100}) is None
+    assert admission.choose(['big2'], {'small': 101}) == 0
+
+    # No package starts under memory pressure.
+    monkeypatch.setattr(memory_monitor, 'memory_pressure', lambda: 50.0)
+    assert admission.choose(['small'], {'big1': 100}) is None
+
+
+def test_sharded_scan(tmp_path):
+    """Test that shards build disjoint sets of packages, which merge into one output."""
+    package_path = tmp_path / 'packages'
+    package_path.mkdir()
+    package_names = ['false_python', 'has_sphinx_sourcedir', 'ignore_doc', 'only_python']
+    for name in package_names:
+        (package_path / name).symlink_to(DATAPATH.resolve() / name)
+
+    for shard in ('1/2', '2/2'):
+        output_path = 'shard_' + shard.replace('/', '_of_')
+        do_scan_packages(
+            package_path, tmp_path, output_path,
+            ['--shard', shard, '--shard-exchange', str(tmp_path / 'exchange')])
+    reports = [
+        json.loads((tmp_path / output_path / 'scan_report.json').read_text())
+        for output_path in ('shard_1_of_2', 'shard_2_of_2')
+    ]
+    assert reports[0]['shards'] == ['1/2']
+    assert len(reports[0]['packages']) == 2
+    assert len(reports[1]['packages']) == 2
+    assert not set(reports[0]['packages']) & set(reports[1]['packages'])
+
+    options = merge_prepare_arguments(argparse.ArgumentParser()).parse_args([
+        '-o', str(tmp_path / 'merged'),
+        str(tmp_path / 'shard_1_of_2'),
+        str(tmp_path / 'shard_2_of_2'),
+    ])
+    merge_main_impl(options)
+    for name in package_names:
+        assert (tmp_path / 'merged' / name / 'index.html').is_file()
+    merged = json.loads((tmp_path / 'merged' / 'scan_report.json').read_text())
+    assert merged['shards'] == ['1/2', '2/2']
+    assert sorted(merged['packages']) == package_names
+    assert all(result['return_code'] == 0 for result in merged['packages'].values())
+
+
+PACKAGE_XML = """\
+<?xml version="1.0"?>
+<package format="3">
+  <name>{name}</name>
+  <version>0.0.0</version>
+  <description>{name}</description>
+  <maintainer email="maintainer@example.com">Maintainer</maintainer>
+  <license>Apache-2.0</license>
+  {depends}
+  <export>
+    <build_type>ament_python</build_type>
+  </export>
+</package>
+"""
+
+
+def _python_package(path, name, depends, code):
+    (path / name).mkdir(parents=True)
+    (path / 'package.xml').write_text(PACKAGE_XML.format(
+        name=name, depends=''.join(f'<exec_depend>{d}</exec_depend>' for d in depends)))
+    (path / 'setup.py').write_text(
+        f"from setuptools import setup\nsetup(name='{name}', packages=['{name}'])\n")
+    (path / name / '__init__.py').write_text(code)
+
+
+def test_shards_exchange_cross_references(tmp_path):
+    """Test that a package waits for, and uses, the cross references of another shard."""
+    package_path = tmp_path / 'packages'
+    _python_package(
+        package_path / 'repo_a' / 'dep_pkg', 'dep_pkg', [],
+        'class Widget:\n    """A widget."""\n')
+    _python_package(
+        package_path / 'repo_b' / 'user_pkg', 'user_pkg', ['dep_pkg'],
+        '"""Uses :py:class:`dep_pkg.Widget`."""\n')
+    exchange = tmp_path / 'exchange'
+
+    def shard_args(shard):
+        work_path = tmp_path / shard.replace('/', '_of_')
+        return [
+            'scan', '-p', str(package_path),
+            '-c', str(work_path / 'cross_references'),
+            '-o', str(work_path / 'output'),
+            '-d', str(work_path / 'build'),
+            '--shard', shard, '--shard-exchange', str(exchange),
+        ]
+    # The shard of the dependent starts first, and has to wait for the other one.
+    dependent = subprocess.Popen([
+        sys.executable, '-c', 'import sys; from rosdoc2.main import main; sys.exit(main())',
+        *shard_args('2/2')])
+    try:
+        options = prepare_arguments(argparse.ArgumentParser()).parse_args(shard_args('1/2')[1:])
+        main_impl(options)
+        assert dependent.wait(timeout=600) == 0
+    finally:
+        dependent.kill()
+
+    assert (exchange / 'dep_pkg' / 'bundle.json').is_file()
+    assert (tmp_path / '2_of_2' / 'cross_references' / 'dep_pkg' / 'objects.inv').is_file()
+    page = (tmp_path / '2_of_2' / 'output' / 'user_pkg' / 'user_pkg.html').read_text()
+    assert 'dep_pkg/dep_pkg.html#dep_pkg.Widget' in page
+
+
+def test_resume_scan(tmp_path):
+    """Test that a resumed scan only builds the packages whose inputs changed."""
+    package_path = tmp_path / 'packages'
+    for name in ('false_python', 'only_python'):
+        shutil.copytree(DATAPATH / name, package_path / name)
+
+    do_scan_packages(package_path, tmp_path)
+    journal = (tmp_path / 'scan_build' / 'scan_journal.jsonl').read_text().splitlines()
+    assert len(journal) == 2
+    assert all(json.loads(line)['cross_references'] for line in journal)
+
+    setup_py = package_path / 'only_python' / 'setup.py'
+    setup_py.write_text(setup_py.read_text() + '\n')
+    do_scan_packages(package_path, tmp_path, extra_args=['--resume'])
+    report = json.loads((tmp_path / OUTPUTPATH / 'scan_report.json').read_text())
+    assert report['packages']['false_python'].get('resumed')
+    assert not report['packages']['only_python'].get('resumed')
+    assert report['packages']['only_python']['return_code'] == 0
+    journal = (tmp_path / 'scan_build' / 'scan_journal.jsonl').read_text().splitlines()
+    assert [json.loads(line)['package'] for line in journal[2:]] == ['only_python']
+
+    # Nothing has failed, so there is nothing to retry, but the report still describes every
+    # package.
+    do_scan_packages(package_path, tmp_path, extra_args=['--retry-failed'])
+    report = json.loads((tmp_path / OUTPUTPATH / 'scan_report.json').read_text())
+    assert sorted(report['packages']) == ['false_python', 'only_python']
+    assert all(result['resumed'] for result in report['packages'].values())
+    assert all(result['return_code'] == 0 for result in report['packages'].values())
+
+    # Retry a package recorded as failed, the report keeps the result of the other one.
+    journal_path = tmp_path / 'scan_build' / 'scan_journal.jsonl'
+    failure = json.loads(journal_path.read_text().splitlines()[-1])
+    failure.update({'return_code': 1, 'message': 'failed'})
+    with open(journal_path, 'a') as f:
+        f.write(json.dumps(failure) + '\n')
+    do_scan_packages(package_path, tmp_path, extra_args=['--retry-failed'])
+    report = json.loads((tmp_path / OUTPUTPATH / 'scan_report.json').read_text())
+    assert sorted(report['packages']) == ['false_python', 'only_python']
+    assert report['packages']['false_python'].get('resumed')
+    assert not report['packages']['only_python'].get('resumed')
+    assert report['packages']['only_python']['return_code'] == 0
+
+
+def test_journal_dependency_cross_references(tmp_path):
+    """Test that a package is not up to date when the cross references of a dependency change."""
+    cross_references = tmp_path / 'cross_references'
+    output = tmp_path / 'output'
+    for name in ('dependency', 'dependent'):
+        (cross_references / name).mkdir(parents=True)
+        (cross_references / name / f'{name}.tag').write_text('tags')
+        (output / name).mkdir(parents=True)
+    journal = ScanJournal(str(tmp_path / 'journal.jsonl'))
+    journal.record(
+        'dependent', 'dependent', 0, 'OK', 'fingerprint',
+        hash_cross_references(str(cross_references), 'dependent'),
+        {'dependency': hash_cross_references(str(cross_references), 'dependency')})
+    assert journal.is_up_to_date(
+        'dependent', 'fingerprint', str(output), str(cross_references))
+
+    (cross_references / 'dependency' / 'dependency.tag').write_text('changed tags')
+    assert not ScanJournal(str(tmp_path / 'journal.jsonl')).is_up_to_date(
+        'dependent', 'fingerprint', str(output), str(cross_references))
+
+
+def test_scan_has_no_watch_option():
+    parser = prepare_arguments(argparse.ArgumentParser())
+    with pytest.raises(SystemExit):
+        parser.parse_args(['-p', str(DATAPATH), '--watch'])
@@ -0,0 +1,101 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the search index of all packages of a scan."""
+
+import json
+import os
+
+from rosdoc2.verbs.scan import search_index
+from rosdoc2.verbs.scan.search_index import shard_filename
+from rosdoc2.verbs.scan.search_index import update_search_index
+
+
+def _write_searchindex(output_dir, package, docnames, titles, terms, titleterms, root=''):
+    directory = output_dir / package / root
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / 'index.html').write_text('')
+    index = {
+        'docnames': docnames, 'titles': titles, 'terms': terms, 'titleterms': titleterms,
+        'filenames': [d + '.rst' for d in docnames], 'objects': {},
+    }
+    (directory / 'searchindex.js').write_text(f'Search.setIndex({json.dumps(index)})')
+
+
+def _read(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def test_search_index(tmp_path):
+    _write_searchindex(
+        tmp_path, 'pkg_a', ['index', 'api'], ['Package A', 'API'],
+        {'Robot': [0, 1], 'arm': 1}, {'packag': 0})
+    _write_searchindex(
+        tmp_path, 'pkg_b', ['index'], ['Package B'], {'robot': 0}, {'packag': 0},
+        root='sphinx')
+    assert update_search_index(str(tmp_path)) == ['pkg_a', 'pkg_b']
+
+    search = tmp_path / '_search'
+    index = _read(search / 'index.json')
+    assert sorted(index['packages']) == ['pkg_a', 'pkg_b']
+    assert index['shards'] == {'a': 'a.json', 'p': 'p.json', 'r': 'r.json'}
+    assert _read(search / 'shards' / 'r.json') == {'robot': {'pkg_a': [0, 1], 'pkg_b': [0]}}
+    assert _read(search / 'shards' / 'p.json') == {'packag': {'pkg_a': [-1], 'pkg_b': [-1]}}
+    assert _read(search / 'docs' / 'pkg_b.json') == [['pkg_b/sphinx/index.html', 'Package B']]
+    assert (tmp_path / 'search.html').is_file()
+
+    # Nothing is read again if nothing changed.
+    assert update_search_index(str(tmp_path)) == []
+
+    # Only the changed package is read again, and only the shards it changes are written.
+    mtime = os.stat(search / 'shards' / 'a.json').st_mtime_ns
+    _write_searchindex(
+        tmp_path, 'pkg_b', ['index'], ['Package B'], {'robots': 0}, {'packag': 0},
+        root='sphinx')
+    assert update_search_index(str(tmp_path)) == ['pkg_b']
+    assert _read(search / 'shards' / 'r.json') == {
+        'robot': {'pkg_a': [0, 1]}, 'robots': {'pkg_b': [0]}}
+    assert os.stat(search / 'shards' / 'a.json').st_mtime_ns == mtime
+
+    # Removed packages are dropped, with their shards.
+    for root, dirs, files in os.walk(tmp_path / 'pkg_a', topdown=False):
+        for name in files:
+            os.remove(os.path.join(root, name))
+        os.rmdir(root)
+    assert update_search_index(str(tmp_path)) == ['pkg_a']
+    assert not (search / 'shards' / 'a.json').exists()
+    assert not (search / 'docs' / 'pkg_a.json').exists()
+
+
+def test_large_shards_are_split(tmp_path, monkeypatch):
+    monkeypatch.setattr(search_index, 'MAX_SHARD_BYTES', 40)
+    terms = {'robot': 0, 'robotic': 0, 'rosdoc': 0, 'ro': 0, 'run': 0}
+    _write_searchindex(tmp_path, 'pkg', ['index'], ['Index'], terms, {})
+    update_search_index(str(tmp_path))
+    shards = _read(tmp_path / '_search' / 'index.json')['shards']
+    assert sorted(shards) == ['ro', 'robo', 'ros', 'ru']
+    assert _read(tmp_path / '_search' / 'shards' / 'ro.json') == {'ro': {'pkg': [0]}}
+    # The search page looks for the terms starting with 'ro' in the shards of the prefixes
+    # of 'ro', and of the longer prefixes starting with it.
+    searched = [prefix for prefix in shards if 'ro'.startswith(prefix) or prefix.startswith('ro')]
+    found = set()
+    for prefix in searched:
+        found.update(_read(tmp_path / '_search' / 'shards' / shards[prefix]))
+    assert found == {'robot', 'robotic', 'rosdoc', 'ro'}
+
+
+def test_shard_filename():
+    assert shard_filename('ab') == 'ab.json'
+    assert shard_filename('é') == 'xc3a9.json'
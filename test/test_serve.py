@@ -0,0 +1,156 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the build daemon of the serve verb."""
+
+import http.client
+import json
+import multiprocessing as mp
+import os
+import pathlib
+import signal
+import threading
+import time
+
+import pytest
+from rosdoc2.verbs.serve.daemon import BuildDaemon
+from rosdoc2.verbs.serve.daemon import HttpBuildServer
+from rosdoc2.verbs.serve.daemon import parse_build_arguments
+from rosdoc2.verbs.serve.daemon import submit_build
+from rosdoc2.verbs.serve.daemon import UnixBuildServer
+
+DATAPATH = pathlib.Path('test/packages')
+
+
+@pytest.fixture
+def build_daemon(tmp_path):
+    build_daemon = BuildDaemon(1, str(tmp_path / 'logs'))
+    yield build_daemon
+    build_daemon.close()
+
+
+@pytest.fixture
+def socket_path(tmp_path, build_daemon):
+    path = str(tmp_path / 'rosdoc2.sock')
+    server = UnixBuildServer(path, build_daemon)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield path
+    server.shutdown()
+    server.server_close()
+
+
+def _build_args(tmp_path):
+    return [
+        '-p', str(DATAPATH / 'only_python'),
+        '-c', str(tmp_path / 'cross_references'),
+        '-o', str(tmp_path / 'output'),
+        '-d', str(tmp_path / 'build'),
+    ]
+
+
+def test_identical_requests_share_a_build(build_daemon, socket_path, tmp_path):
+    args = _build_args(tmp_path)
+    # Keep the only worker busy until both requests are queued.
+    with mp.get_context('spawn').Manager() as manager:
+        gate = manager.Event()
+        build_daemon.pool.apply_async(gate.wait)
+        responses = [submit_build(socket_path, args, timeout=300) for _ in range(2)]
+        first_events = [next(response) for response in responses]
+        gate.set()
+        responses = [[first] + list(response)
+                     for first, response in zip(first_events, responses)]
+
+    for events in responses:
+        assert events[-1] == {'return_code': 0, 'message': 'OK'}
+        assert any('Moving files to final destination' in e.get('log', '') for e in events)
+    assert [events[0] for events in responses] == [
+        {'job': 1, 'deduplicated': False}, {'job': 1, 'deduplicated': True}]
+    assert (tmp_path / 'output' / 'only_python' / 'index.html').is_file()
+
+
+def test_started_build_is_not_shared(build_daemon, tmp_path):
+    args = _build_args(tmp_path)
+    job, _ = build_daemon.submit(args, os.getcwd())
+    deadline = time.monotonic() + 60
+    while job.pid is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.pid is not None
+
+    # The sources may have changed since the running build read them.
+    second, deduplicated = build_daemon.submit(args, os.getcwd())
+    assert not deduplicated
+    assert second.job_id != job.job_id
+    # Requests until the second build starts share it.
+    assert build_daemon.submit(args, os.getcwd()) == (second, True)
+    assert job.done.wait(300)
+    assert second.done.wait(300)
+    assert (job.return_code, second.return_code) == (0, 0)
+    assert build_daemon.status() == {'jobs': []}
+
+
+def test_lost_worker_fails_the_build(build_daemon, tmp_path):
+    job, _ = build_daemon.submit(_build_args(tmp_path), os.getcwd())
+    deadline = time.monotonic() + 60
+    while job.pid is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.pid is not None
+    os.kill(job.pid, signal.SIGKILL)
+
+    assert job.done.wait(60)
+    assert job.return_code == 3
+    assert 'exited without a result' in job.message
+    assert build_daemon.status() == {'jobs': []}
+    # The pool replaced the worker, so the next build runs.
+    job, deduplicated = build_daemon.submit(_build_args(tmp_path), os.getcwd())
+    assert not deduplicated
+    assert job.done.wait(300)
+    assert job.return_code == 0
+
+
+def test_invalid_request(socket_path):
+    events = list(submit_build(socket_path, ['--output-format', 'zip'], timeout=60))
+    assert events[-1]['return_code'] == 1
+    assert 'invalid build arguments' in events[-1]['message']
+
+
+def test_watch_is_not_a_build_request():
+    with pytest.raises(RuntimeError, match='invalid build arguments'):
+        parse_build_arguments(['-p', str(DATAPATH / 'only_python'), '--watch'])
+
+
+def test_http_requests_from_web_pages_are_rejected(build_daemon):
+    server = HttpBuildServer(0, build_daemon)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    body = json.dumps({'args': ['--output-format', 'zip']})
+
+    def post(headers):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        try:
+            connection.request('POST', '/build', body, headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+    try:
+        json_type = {'Content-Type': 'application/json'}
+        assert post({'Content-Type': 'text/plain'})[0] == 415
+        assert post({**json_type, 'Origin': 'http://example.com'})[0] == 403
+        assert post({**json_type, 'Host': f'attacker.example:{port}'})[0] == 403
+        status, response = post(json_type)
+        assert status == 200
+        assert json.loads(response.splitlines()[-1])['return_code'] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
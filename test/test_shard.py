@@ -0,0 +1,102 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the selection and ordering of the packages of a scan."""
+
+from catkin_pkg.package import Dependency, Package
+import pytest
+from rosdoc2.verbs.scan.shard import order_by_dependencies, ready_packages
+from rosdoc2.verbs.scan.shard import scan_dependencies, select_shard, waited_dependencies
+from rosdoc2.verbs.scan.shard_exchange import export_cross_references
+from rosdoc2.verbs.scan.shard_exchange import import_cross_references
+
+
+def _package(name, depends=()):
+    package = Package(
+        name=name, filename=f'/ws/{name}/package.xml',
+        build_depends=[Dependency(d) for d in depends])
+    for dependency in package.build_depends:
+        dependency.evaluated_condition = True
+    return package
+
+
+def test_order_by_dependencies():
+    packages = [_package('c', ['b']), _package('b', ['a', 'external']), _package('a')]
+    assert [p.name for p in order_by_dependencies(packages)] == ['a', 'b', 'c']
+
+
+def test_ready_packages():
+    a, b, c = _package('a'), _package('b', ['a']), _package('c', ['a', 'b'])
+    pending = [a, b, c]
+    dependencies = scan_dependencies(pending)
+    assert ready_packages(pending, dependencies, set(), []) == [a]
+    # A running dependency holds back its dependents.
+    assert ready_packages([b, c], dependencies, set(), [a]) == []
+    assert ready_packages([b, c], dependencies, {'a'}, []) == [b]
+    assert ready_packages([c], dependencies, {'a', 'b'}, []) == [c]
+
+
+def test_ready_packages_breaks_cycles():
+    a, b = _package('a', ['b']), _package('b', ['a'])
+    pending = order_by_dependencies([b, a])
+    dependencies = scan_dependencies(pending)
+    assert ready_packages(pending, dependencies, set(), []) == [a]
+    assert ready_packages([b], dependencies, set(), [a]) == []
+    assert ready_packages([b], dependencies, {'a'}, []) == [b]
+
+
+def test_select_shard():
+    found_packages = {
+        'repo1/a': _package('a'), 'repo1/b': _package('b', ['a']),
+        'repo2/c': _package('c'), 'repo3/d': _package('d'),
+    }
+    shards = [select_shard(found_packages, index, 2) for index in (1, 2)]
+    assert [[p.name for p in shard] for shard in shards] == [['a', 'b'], ['c', 'd']]
+
+
+def test_waited_dependencies_break_cycles():
+    a, b, c = _package('a', ['c']), _package('b', ['a']), _package('c', ['b'])
+    waited = waited_dependencies([c, b, a])
+    ordered = [p.name for p in order_by_dependencies([c, b, a])]
+    # A package only waits for the dependencies before it in the order.
+    for package in (a, b, c):
+        for name in waited[package.filename]:
+            assert ordered.index(name) < ordered.index(package.name)
+    assert sum(len(names) for names in waited.values()) == 2
+
+
+def test_ready_packages_waiting_for_other_shards():
+    a, b = _package('a', ['b']), _package('b', ['a'])
+    dependencies = scan_dependencies([a, b])
+    assert ready_packages([a, b], dependencies, set(), [], waiting=True) == []
+
+
+def test_exchange_cross_references(tmp_path):
+    exchange, exported, imported = tmp_path / 'exchange', tmp_path / 'a', tmp_path / 'b'
+    (exported / 'dep').mkdir(parents=True)
+    (exported / 'dep' / 'objects.inv').write_text('inventory')
+    assert import_cross_references(str(exchange), str(imported), 'dep', 2) is None
+
+    export_cross_references(str(exchange), str(exported), 'dep', 0, (1, 2))
+    assert import_cross_references(str(exchange), str(imported), 'dep', 2) == 0
+    assert (imported / 'dep' / 'objects.inv').read_text() == 'inventory'
+    assert not (imported / 'dep' / 'bundle.json').exists()
+
+    # A failed package is exported without its cross references.
+    export_cross_references(str(exchange), str(exported), 'dep', 1, (1, 2))
+    assert import_cross_references(str(exchange), str(imported), 'dep', 2) == 1
+    assert list((imported / 'dep').iterdir()) == []
+
+    with pytest.raises(RuntimeError):
+        import_cross_references(str(exchange), str(imported), 'dep', 3)
@@ -0,0 +1,49 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of staging user documentation with links."""
+
+import os
+
+import pytest
+from rosdoc2.verbs.build.stage_directory import stage_directory
+
+
+@pytest.mark.parametrize('mode', ['copy', 'hardlink', 'symlink'])
+def test_symlinked_directories_are_staged(tmp_path, mode):
+    source = tmp_path / 'source'
+    (source / 'real').mkdir(parents=True)
+    (source / 'real' / 'page.rst').write_text('page')
+    os.symlink(source / 'real', source / 'linked')
+    destination = tmp_path / 'destination'
+
+    stage_directory(str(source), str(destination), mode)
+
+    assert (destination / 'real' / 'page.rst').read_text() == 'page'
+    assert (destination / 'linked' / 'page.rst').read_text() == 'page'
+    assert not (destination / 'linked').is_symlink()
+
+
+@pytest.mark.parametrize('mode', ['hardlink', 'symlink'])
+def test_symlink_cycles_are_not_followed(tmp_path, mode):
+    source = tmp_path / 'source'
+    (source / 'sub').mkdir(parents=True)
+    (source / 'sub' / 'page.rst').write_text('page')
+    os.symlink(source, source / 'sub' / 'loop')
+    destination = tmp_path / 'destination'
+
+    stage_directory(str(source), str(destination), mode)
+
+    assert (destination / 'sub' / 'page.rst').read_text() == 'page'
+    assert not os.path.lexists(destination / 'sub' / 'loop')
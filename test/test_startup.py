@@ -0,0 +1,70 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Regression tests for the import cost of the command line interface."""
+
+import subprocess
+import sys
+
+import pytest
+
+# Heavy dependencies which should only be imported once a build actually runs.
+DEFERRED_MODULES = ('catkin_pkg', 'jinja2', 'rosdistro', 'setuptools', 'sphinx', 'yaml')
+
+# Generous budget in microseconds for importing rosdoc2 itself, excluding the interpreter
+# start up. Without lazy imports this was several hundred milliseconds.
+ROSDOC2_IMPORT_BUDGET_US = 100_000
+
+
+def import_times(args):
+    """
+    Run rosdoc2 with -X importtime.
+
+    :return: list of tuples of (module name, nesting depth, cumulative time in microseconds)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'rosdoc2.main'] + args,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Nested imports are indented by two spaces per level, after a single space.
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times.append((name.strip(), depth, int(cumulative)))
+    return times
+
+
+@pytest.mark.parametrize('args', [
+    ['--help'],
+    ['--version'],
+    ['build', '--help'],
+    ['default_config', '--help'],
+    ['merge', '--help'],
+    ['open', '--help'],
+    ['scan', '--help'],
+])
+def test_startup_imports(args):
+    times = import_times(args)
+    names = {name for name, _, _ in times}
+    assert 'rosdoc2.verbs.build.impl' in names
+    imported = sorted(name for name in names if name.split('.')[0] in DEFERRED_MODULES)
+    assert not imported, f'rosdoc2 {" ".join(args)} imported {imported}'
+
+    rosdoc2_time = sum(
+        cumulative for name, depth, cumulative in times
+        if depth == 0 and name.split('.')[0] == 'rosdoc2')
+    assert rosdoc2_time < ROSDOC2_IMPORT_BUDGET_US, \
+        f'importing rosdoc2 took {rosdoc2_time} us'
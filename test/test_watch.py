@@ -0,0 +1,76 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of watch mode."""
+
+import os
+import threading
+
+import rosdoc2.verbs.build.watch as watch_module
+from rosdoc2.verbs.build.watch import classify_changes
+from rosdoc2.verbs.build.watch import keep_unchanged_mtimes
+from rosdoc2.verbs.build.watch import wait_for_changes
+
+
+def test_classify_changes():
+    assert classify_changes(['doc/index.rst', 'README.md']) == {'sphinx'}
+    assert classify_changes(['msg/Foo.msg']) == {'sphinx'}
+    assert classify_changes(['doc/index.rst', 'include/my_pkg/foo.hpp']) == \
+        {'doxygen', 'sphinx'}
+    assert classify_changes(['rosdoc2.yaml']) == {'doxygen', 'sphinx'}
+
+
+def test_wait_for_changes(tmp_path):
+    (tmp_path / 'package.xml').write_text('<package/>')
+    (tmp_path / 'index.rst').write_text('old')
+    snapshot = watch_module._snapshot(str(tmp_path), [])
+
+    def edit():
+        # Bytecode written by importing the package is not a change.
+        (tmp_path / '__pycache__').mkdir()
+        (tmp_path / '__pycache__' / 'foo.cpython-311.pyc').write_text('')
+        (tmp_path / 'index.rst').write_text('new text')
+        (tmp_path / 'new.md').write_text('new')
+    threading.Timer(0.1, edit).start()
+    changes, snapshot = wait_for_changes(
+        str(tmp_path), [], snapshot, poll_interval=0.05, debounce=0.2)
+    assert changes == ['index.rst', 'new.md']
+    assert 'new.md' in snapshot
+
+
+def test_keep_unchanged_mtimes(tmp_path):
+    generated = tmp_path / 'wrapped'
+    state_path = str(tmp_path / 'watch' / 'sources.json')
+    source = tmp_path / 'source.rst'
+    source.write_text('user')
+    generated.mkdir()
+    (generated / 'same.rst').write_text('same')
+    (generated / 'changed.rst').write_text('old')
+    os.link(source, generated / 'linked.rst')
+    old_mtime = 1_000_000_000_000_000_000
+    for name in ('same.rst', 'changed.rst'):
+        os.utime(generated / name, ns=(old_mtime, old_mtime))
+    assert keep_unchanged_mtimes(str(generated), state_path) == 0
+
+    # The next build generates the directory again.
+    for name in ('same.rst', 'changed.rst', 'linked.rst'):
+        (generated / name).unlink()
+    (generated / 'same.rst').write_text('same')
+    (generated / 'changed.rst').write_text('new')
+    os.link(source, generated / 'linked.rst')
+    source_mtime = source.stat().st_mtime_ns
+    assert keep_unchanged_mtimes(str(generated), state_path) == 1
+    assert (generated / 'same.rst').stat().st_mtime_ns == old_mtime
+    assert (generated / 'changed.rst').stat().st_mtime_ns > old_mtime
+    assert source.stat().st_mtime_ns == source_mtime
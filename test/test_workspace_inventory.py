@@ -0,0 +1,115 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the merged inventory of the packages of a cross reference directory."""
+
+import json
+import os
+import shutil
+import zlib
+
+from rosdoc2.verbs.build.collect_inventory_files import collect_inventory_files
+from rosdoc2.verbs.build.inventory_map import write_inventory_map
+from rosdoc2.verbs.build.workspace_inventory import sync_workspace_inventory
+from rosdoc2.verbs.build.workspace_inventory import workspace_inventory_path
+from rosdoc2.verbs.build.workspace_inventory import WorkspaceInventory
+
+
+def write_objects_inv(path, project, entries):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write((
+            '# Sphinx inventory version 2\n'
+            f'# Project: {project}\n'
+            '# Version: 1.2\n'
+            '# The remainder of this file is compressed using zlib.\n').encode())
+        f.write(zlib.compress(entries.encode()))
+    return path
+
+
+def publish(xref_dir, package_name, entries):
+    inventory_file = write_objects_inv(
+        str(xref_dir / package_name / 'objects.inv'), package_name, entries)
+    write_inventory_map(inventory_file)
+    with open(inventory_file + '.location.json', 'w') as f:
+        json.dump({'relative_root': ''}, f)
+
+
+def sync(tmp_path):
+    return sync_workspace_inventory(
+        workspace_inventory_path(str(tmp_path / 'build')),
+        collect_inventory_files(str(tmp_path / 'xref')))
+
+
+def lookup(tmp_path, *args, **kwargs):
+    inventory = WorkspaceInventory(workspace_inventory_path(str(tmp_path / 'build')))
+    try:
+        result = inventory.lookup(*args, **kwargs)
+    finally:
+        inventory.close()
+    return result[1] if result else None
+
+
+def test_lookup(tmp_path):
+    publish(tmp_path / 'xref', 'pkg_a', (
+        'pkg_a.Foo py:class 1 pkg_a.html#$ -\n'
+        'pkg_a py:module 0 pkg_a.html#module-$ -\n'
+        'getting-started std:label -1 usage.html#getting-started Getting Started\n'))
+    publish(tmp_path / 'xref', 'pkg_b', 'pkg_b.Bar py:class 1 pkg_b.html#$ -\n')
+    assert set(sync(tmp_path)) == {'pkg_a', 'pkg_b'}
+
+    assert lookup(tmp_path, ['py:class'], 'pkg_a.Foo') == \
+        ('pkg_a', '', 'pkg_a', '1.2', 'pkg_a.html#pkg_a.Foo', '-')
+    assert lookup(tmp_path, ['py:class', 'py:exception'], 'pkg_b.Bar')[4] == \
+        'pkg_b.html#pkg_b.Bar'
+    assert lookup(tmp_path, ['py:module'], 'pkg_a')[4] == 'pkg_a.html#module-pkg_a'
+    # Labels match regardless of case, classes do not.
+    assert lookup(tmp_path, ['std:label'], 'Getting-Started')[4] == 'usage.html#getting-started'
+    assert lookup(tmp_path, ['py:class'], 'pkg_a.foo') is None
+    assert lookup(tmp_path, ['py:function'], 'pkg_a.Foo') is None
+
+
+def test_precedence(tmp_path):
+    # Published in reverse name order, which must not matter.
+    for package_name in ('pkg_c', 'pkg_b', 'pkg_a'):
+        publish(tmp_path / 'xref', package_name, f'shared std:label -1 {package_name}.html -\n')
+        sync(tmp_path)
+
+    assert lookup(tmp_path, ['std:label'], 'shared')[0] == 'pkg_a'
+    assert lookup(tmp_path, ['std:label'], 'shared', preferred_packages=['pkg_c'])[0] == 'pkg_c'
+    assert lookup(tmp_path, ['std:label'], 'shared', exclude_package='pkg_a')[0] == 'pkg_b'
+    assert lookup(tmp_path, ['std:label'], 'shared', package='pkg_b')[0] == 'pkg_b'
+
+
+def test_sync(tmp_path):
+    publish(tmp_path / 'xref', 'pkg_a', 'pkg_a.Old py:class 1 pkg_a.html#$ -\n')
+    publish(tmp_path / 'xref', 'pkg_b', 'pkg_b.Bar py:class 1 pkg_b.html#$ -\n')
+    sync(tmp_path)
+
+    # Publishing again replaces the entries of the package.
+    map_file = tmp_path / 'xref' / 'pkg_a' / 'objects.inv.map'
+    mtime_ns = map_file.stat().st_mtime_ns
+    publish(tmp_path / 'xref', 'pkg_a', 'pkg_a.New py:class 1 pkg_a.html#$ -\n')
+    os.utime(map_file, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+    # A removed package is removed from the workspace inventory.
+    shutil.rmtree(tmp_path / 'xref' / 'pkg_b')
+    # An inventory without a map is left to intersphinx.
+    write_objects_inv(str(tmp_path / 'xref' / 'pkg_c' / 'objects.inv'), 'pkg_c', '')
+    with open(tmp_path / 'xref' / 'pkg_c' / 'objects.inv.location.json', 'w') as f:
+        json.dump({'relative_root': ''}, f)
+    assert set(sync(tmp_path)) == {'pkg_a'}
+
+    assert lookup(tmp_path, ['py:class'], 'pkg_a.Old') is None
+    assert lookup(tmp_path, ['py:class'], 'pkg_a.New') is not None
+    assert lookup(tmp_path, ['py:class'], 'pkg_b.Bar') is None
@@ -0,0 +1,58 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the yaml extend file, which overrides the rosdoc2.yaml of packages."""
+
+import argparse
+import pathlib
+
+import pytest
+from rosdoc2.verbs.build.yaml_extend import apply_yaml_extend
+from rosdoc2.verbs.build.yaml_extend import load_yaml_extend, package_yaml_extend
+
+EX_TEST_YAML = str(pathlib.Path(__file__).parent / 'ex_test.yaml')
+
+
+def test_load_yaml_extend():
+    overrides = load_yaml_extend(EX_TEST_YAML)
+    assert sorted(overrides) == ['empty_doc_dir', 'invalid_python_source', 'src_alt_python']
+    assert overrides['src_alt_python'] == [{'settings': {'python_source': 'launch'}}]
+
+    with pytest.raises(ValueError):
+        load_yaml_extend(str(pathlib.Path(__file__).parent / 'does_not_exist.yaml'))
+
+
+def test_package_in_many_collections(tmp_path):
+    path = tmp_path / 'extend.yaml'
+    path.write_text(
+        'first:\n  packages:\n    pkg:\n      settings: {a: 1, b: 1}\n'
+        'second:\n  packages:\n    pkg:\n      settings: {b: 2}\n'
+        '      builders:\n        - sphinx: {user_doc_dir: docs}\n')
+    extended_objects = load_yaml_extend(str(path))['pkg']
+    settings_dict = {'a': 0}
+    builders_list = [{'doxygen': {}}, {'sphinx': {'user_doc_dir': 'doc'}}]
+    apply_yaml_extend(extended_objects, settings_dict, builders_list)
+    assert settings_dict == {'a': 1, 'b': 2}
+    assert builders_list == [{'doxygen': {}}, {'sphinx': {'user_doc_dir': 'docs'}}]
+
+
+def test_package_yaml_extend():
+    options = argparse.Namespace(yaml_extend=None)
+    assert package_yaml_extend(options, 'src_alt_python') == []
+    options.yaml_extend = EX_TEST_YAML
+    assert package_yaml_extend(options, 'src_alt_python') == [
+        {'settings': {'python_source': 'launch'}}]
+    # Overrides parsed by the scan verb are used instead of the file.
+    options.yaml_extend_overrides = {'src_alt_python': []}
+    assert package_yaml_extend(options, 'src_alt_python') == []